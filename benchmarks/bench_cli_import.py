@@ -0,0 +1,82 @@
+"""
+Startup budget check for the `mindat` console entry point.
+
+Spawns fresh interpreters and measures:
+- the median wall time of `python -c "import cli.main"` minus a bare `python -c pass`;
+- the cumulative import time of cli.main, from `-X importtime`;
+- that no heavy dependency (requests, urllib3, yaml, tqdm) or service module is imported
+  before a command runs.
+Exits non-zero when the budget is exceeded, so cron wrappers and CI can gate on it.
+
+Usage:
+  python -m benchmarks.bench_cli_import
+  python -m benchmarks.bench_cli_import --budget-ms 25 --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("requests", "urllib3", "yaml", "tqdm", "mindat.http", "mindat.services.download_service")
+
+_IMPORTTIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+
+def _wall(code: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def cumulative_import_us(module: str) -> int:
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                       cwd=ROOT, check=True, capture_output=True, text=True)
+    for m in _IMPORTTIME.finditer(r.stderr):
+        if m.group(2) == module:
+            return int(m.group(1))
+    return 0
+
+
+def loaded_heavy_modules() -> list[str]:
+    code = ("import sys, cli.main; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("bench-cli-import")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--budget-ms", type=float, default=30.0,
+                    help="Max extra startup (median) over a bare interpreter")
+    args = ap.parse_args()
+
+    base = _wall("pass", args.runs)
+    cli = _wall("import cli.main", args.runs)
+    extra_ms = (cli - base) * 1000
+    importtime_ms = cumulative_import_us("cli.main") / 1000
+    heavy = loaded_heavy_modules()
+
+    print(f"bare interpreter   {base * 1000:8.1f} ms (median of {args.runs})")
+    print(f"import cli.main    {cli * 1000:8.1f} ms  (+{extra_ms:.1f} ms, budget {args.budget_ms:.0f} ms)")
+    print(f"-X importtime      {importtime_ms:8.1f} ms cumulative for cli.main")
+    print(f"heavy modules      {', '.join(heavy) or 'none'}")
+
+    failed = extra_ms > args.budget_ms or bool(heavy)
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+End-to-end throughput benchmark for DownloadService against the fake Mindat API.
+
+For each mode (enrich on/off x json/jsonl) it runs a full country download and reports
+localities/sec, requests per endpoint, HTTP status counts and peak Python memory.
+
+Usage:
+  python -m benchmarks.bench_download
+  python -m benchmarks.bench_download --multiply 5 --latency 0.01 --rate-429 0.02 --json bench.json
+  python -m benchmarks.bench_download --latency 0.01 --stall-rate 0.01 --hedge 95   # hedged GETs vs stalls
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from mindat.api_client import MindatClient
+from mindat.config import AppConfig, Hedging, Retries
+from mindat.endpoints import MindatEndpoints
+from mindat.http import HttpSession
+from mindat.repositories.localities_repo import LocalitiesRepository
+from mindat.services.download_service import DownloadService
+
+from benchmarks.fake_mindat import DEFAULT_FIXTURE, FakeMindatServer, FakeOptions, MindatFixture
+
+MODES = [
+    ("enrich-jsonl", True, "jsonl"),
+    ("enrich-json", True, "json"),
+    ("no-enrich-jsonl", False, "jsonl"),
+]
+
+
+def run_mode(server: FakeMindatServer, country: str, enrich: bool, fmt: str, page_size: int,
+             hedge: float | None = None) -> dict:
+    cfg = AppConfig(base_url=server.base_url, page_size=page_size,
+                    retries=Retries(total=6, backoff_factor=0.0),
+                    search_strategies=[{"param": "ltype", "value": "60"}])
+    ep = MindatEndpoints(cfg.base_url, cfg.endpoints.localities,
+                         cfg.endpoints.locality_detail, cfg.endpoints.locality_minerals)
+    hedging = Hedging(enabled=True, percentile=hedge) if hedge else None
+    http = HttpSession(cfg.base_url, cfg.retries, cfg.timeouts, api_key="bench", hedging=hedging)
+    client = MindatClient(http, ep, page_size=cfg.page_size)
+    repo = LocalitiesRepository(client, cfg.search_strategies)
+
+    server.reset_counters()
+    with tempfile.TemporaryDirectory() as tmp:
+        svc = DownloadService(client, repo, Path(tmp), save_format=fmt)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        out = svc.download_country_mines(country, enrich=enrich)
+        stages = svc.timer.summary()
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if fmt == "jsonl":
+            n = sum(1 for _ in out.open(encoding="utf-8"))
+        else:
+            n = len(json.loads(out.read_text(encoding="utf-8"))["results"])
+
+    return {
+        "localities": n,
+        "seconds": round(elapsed, 3),
+        "localities_per_sec": round(n / elapsed, 1) if elapsed else None,
+        "requests": dict(server.requests),
+        "total_requests": sum(server.requests.values()),
+        "statuses": {str(k): v for k, v in server.statuses.items()},
+        "client_http": http.metrics.snapshot()["totals"],
+        "client_counters": http.metrics.snapshot()["counters"],
+        "slowest_locality_s": round(stages["slowest_localities"][0]["wall_s"], 3) if stages["slowest_localities"] else None,
+        "peak_mem_mb": round(peak / 1e6, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("bench-download")
+    ap.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    ap.add_argument("--multiply", type=int, default=1)
+    ap.add_argument("--country", default="Iran")
+    ap.add_argument("--page-size", type=int, default=100)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--page-cap", type=int, default=200)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    ap.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests that stall")
+    ap.add_argument("--stall-seconds", type=float, default=2.0)
+    ap.add_argument("--hedge", type=float, default=None, metavar="PCT",
+                    help="Enable hedged GETs at this rolling latency percentile (e.g. 95)")
+    # enrich-json rewrites the whole file per locality (quadratic); opt in explicitly
+    ap.add_argument("--modes", nargs="*", default=["enrich-jsonl", "no-enrich-jsonl"],
+                    choices=[m[0] for m in MODES])
+    ap.add_argument("--json", dest="json_out", default=None, help="Write results to this JSON file")
+    args = ap.parse_args()
+
+    opts = FakeOptions(args.latency, args.jitter, args.page_cap, args.rate_429, args.failure_rate,
+                       args.stall_rate, args.stall_seconds)
+    fixture = MindatFixture(Path(args.fixture), args.multiply)
+    results = {}
+    with FakeMindatServer(fixture, opts) as server:
+        for name, enrich, fmt in MODES:
+            if name not in args.modes:
+                continue
+            results[name] = run_mode(server, args.country, enrich, fmt, args.page_size, args.hedge)
+
+    print(f"{'mode':<18}{'locs':>8}{'sec':>9}{'locs/s':>9}{'reqs':>8}{'peak MB':>9}{'max loc s':>10}{'hedges':>8}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['localities']:>8}{r['seconds']:>9}{r['localities_per_sec']:>9}"
+              f"{r['total_requests']:>8}{r['peak_mem_mb']:>9}{r['slowest_locality_s']:>10}"
+              f"{r['client_counters'].get('hedges', 0):>8}")
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Page-size tuning benchmark: repeated country listings against the fake Mindat API.
+
+Compares static page sizes with PageSizeTuner, which starts from --initial, detects the
+server cap (--page-cap) and climbs towards the fastest size. Each listing is one "run"
+for the tuner; state persists in a temp JSON file as it would in save.dir.
+
+Usage:
+  python -m benchmarks.bench_page_size
+  python -m benchmarks.bench_page_size --multiply 3 --latency 0.02 --page-cap 250 --listings 8
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from mindat.api_client import MindatClient
+from mindat.config import AppConfig, Retries
+from mindat.endpoints import MindatEndpoints
+from mindat.http import HttpSession
+from mindat.page_tuner import PageSizeTuner
+
+from benchmarks.fake_mindat import DEFAULT_FIXTURE, FakeMindatServer, FakeOptions, MindatFixture
+
+
+def listing(server: FakeMindatServer, country: str, page_size: int, tuner: PageSizeTuner | None) -> dict:
+    cfg = AppConfig(base_url=server.base_url, retries=Retries(total=3, backoff_factor=0.0))
+    ep = MindatEndpoints(cfg.base_url, cfg.endpoints.localities,
+                         cfg.endpoints.locality_detail, cfg.endpoints.locality_minerals)
+    http = HttpSession(cfg.base_url, cfg.retries, cfg.timeouts, api_key="bench", cache_size=0)
+    client = MindatClient(http, ep, page_size=page_size, tuner=tuner)
+    size = client._page_size("localities")
+    server.reset_counters()
+    t0 = time.perf_counter()
+    n = sum(1 for _ in client.search_localities({"format": "json", "country": country}))
+    elapsed = time.perf_counter() - t0
+    return {"page_size": size, "localities": n, "requests": sum(server.requests.values()),
+            "seconds": round(elapsed, 3), "locs_per_sec": round(n / elapsed, 1)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("bench-page-size")
+    ap.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    ap.add_argument("--multiply", type=int, default=3)
+    ap.add_argument("--country", default="Iran")
+    ap.add_argument("--latency", type=float, default=0.02)
+    ap.add_argument("--page-cap", type=int, default=200)
+    ap.add_argument("--initial", type=int, default=50)
+    ap.add_argument("--static", type=int, nargs="*", default=[50, 100, 200])
+    ap.add_argument("--listings", type=int, default=8)
+    args = ap.parse_args()
+
+    opts = FakeOptions(latency=args.latency, page_cap=args.page_cap)
+    fixture = MindatFixture(Path(args.fixture), args.multiply)
+    print(f"{'run':<14}{'size':>6}{'locs':>8}{'reqs':>6}{'sec':>8}{'locs/s':>9}")
+    with FakeMindatServer(fixture, opts) as server, tempfile.TemporaryDirectory() as tmp:
+        for size in args.static:
+            r = listing(server, args.country, size, None)
+            print(f"{'static':<14}{r['page_size']:>6}{r['localities']:>8}{r['requests']:>6}"
+                  f"{r['seconds']:>8}{r['locs_per_sec']:>9}")
+        state = Path(tmp) / "page_sizes.json"
+        for i in range(args.listings):
+            tuner = PageSizeTuner(state, initial=args.initial)  # reload: one tuner per "run"
+            r = listing(server, args.country, args.initial, tuner)
+            tuner.save()
+            print(f"{f'tuned #{i + 1}':<14}{r['page_size']:>6}{r['localities']:>8}{r['requests']:>6}"
+                  f"{r['seconds']:>8}{r['locs_per_sec']:>9}")
+        print(f"learned: {tuner.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
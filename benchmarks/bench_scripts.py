@@ -0,0 +1,137 @@
+"""
+Scaling benchmark for the post-processing scripts on synthetic data (benchmarks.synthetic).
+
+For each scale it runs the pipeline the scripts form:
+  clean    scripts/clean_mindat_json.py run()                     raw enriched → flat clean
+  merge    DataMergerCleaner load + process_data + save            clean + geomaterials → merged
+  geojson  GeoJSONConverter load + convert_to_geojson + save       merged + geomaterials → GeoJSON
+Each stage runs in its own process, so the reported peak RSS (wait4 ru_maxrss) is that
+stage's alone, and its wall time excludes interpreter start-up. "growth" is the
+time ratio to the previous scale divided by the data ratio: about 1.0 is linear, and
+clearly above 1.0 (marked "!") is a complexity blowup.
+Generated inputs are kept in --data-dir and reused across runs (same seed → same data).
+
+Usage:
+  python -m benchmarks.bench_scripts
+  python -m benchmarks.bench_scripts --scales 1000 10000 100000 1000000 --json scaling.json
+  python -m benchmarks.bench_scripts --stages clean merge --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGES = ("clean", "merge", "geojson")
+
+
+def _script(name: str):
+    spec = importlib.util.spec_from_file_location(name, ROOT / "scripts" / f"{name}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def run_stage(stage: str, inp: Path, geo: Path, out: Path, workers: int) -> None:
+    """Child-process side: run one stage (its progress output goes to /dev/null)."""
+    if stage == "clean":
+        _script("clean_mindat_json").run(inp, out)
+    elif stage == "merge":
+        m = _script("merging_geomaterils_iran_mines").DataMergerCleaner()
+        if not (m.load_localities_file(str(inp)) and m.load_geomaterials_file(str(geo))):
+            raise SystemExit(1)
+        m.process_data()
+        m.save_merged_data(str(out))
+    else:
+        c = _script("to_leaflet_geojson").GeoJSONConverter()
+        if not c.load_data_files(str(inp), str(geo)):
+            raise SystemExit(1)
+        c.convert_to_geojson(workers=workers)
+        c.save_geojson(str(out))
+
+
+def measure(stage: str, inp: Path, geo: Path, out: Path, workers: int) -> dict:
+    """Run a stage in a child process; wall seconds and that child's peak RSS."""
+    result = out.with_suffix(".timing")
+    cmd = [sys.executable, "-m", "benchmarks.bench_scripts", "--_stage", stage,
+           "--_in", str(inp), "--_geo", str(geo), "--_out", str(out), "--_result", str(result),
+           "--workers", str(workers)]
+    log = out.with_suffix(".stderr")
+    with log.open("wb") as err:
+        p = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=err)
+        _, status, usage = os.wait4(p.pid, 0)  # rusage of this child only
+    p.returncode = os.waitstatus_to_exitcode(status)
+    if p.returncode != 0 or not result.exists():
+        raise RuntimeError(f"{stage} failed:\n{log.read_text(errors='replace')[-4000:]}")
+    log.unlink()
+    seconds = json.loads(result.read_text())["seconds"]
+    result.unlink()
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"seconds": round(seconds, 3), "peak_rss_mb": round(rss_mb, 1),
+            "output_mb": round(out.stat().st_size / 1e6, 1)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("bench-scripts")
+    ap.add_argument("--scales", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    ap.add_argument("--data-dir", default="benchmarks/.synthetic", help="Generated inputs (reused)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workers", type=int, default=1, help="GeoJSON process-pool workers")
+    ap.add_argument("--json", default=None, help="Write results here")
+    ap.add_argument("--_stage", choices=STAGES, help=argparse.SUPPRESS)
+    ap.add_argument("--_in", help=argparse.SUPPRESS)
+    ap.add_argument("--_geo", help=argparse.SUPPRESS)
+    ap.add_argument("--_out", help=argparse.SUPPRESS)
+    ap.add_argument("--_result", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._stage:  # child
+        t0 = time.perf_counter()
+        run_stage(args._stage, Path(args._in), Path(args._geo), Path(args._out), args.workers)
+        Path(args._result).write_text(json.dumps({"seconds": time.perf_counter() - t0}))
+        return
+
+    data_dir = Path(args.data_dir) / f"seed{args.seed}"
+    rows, prev = [], {}
+    print(f"{'scale':>9} {'stage':<8}{'sec':>9}{'µs/loc':>9}{'peak MB':>9}{'out MB':>8}{'growth':>8}")
+    for n in sorted(args.scales):
+        raw = data_dir / f"localities_{n}.json"
+        geo = data_dir / "geomaterials.json"
+        if not raw.exists() or not geo.exists():
+            generate(data_dir, n, seed=args.seed)
+        files = {"clean": (raw, data_dir / f"clean_{n}.json"),
+                 "merge": (data_dir / f"clean_{n}.json", data_dir / f"merged_{n}.json"),
+                 "geojson": (data_dir / f"merged_{n}.json", data_dir / f"map_{n}.geojson")}
+        for stage in STAGES:
+            inp, out = files[stage]
+            if stage not in args.stages:
+                if not out.exists():  # later stages need this one's output
+                    measure(stage, inp, geo, out, args.workers)
+                continue
+            r = {"scale": n, "stage": stage, **measure(stage, inp, geo, out, args.workers)}
+            r["us_per_locality"] = round(r["seconds"] / n * 1e6, 1)
+            growth = ""
+            if stage in prev:
+                pn, ps = prev[stage]
+                r["growth"] = round((r["seconds"] / max(ps, 1e-9)) / (n / pn), 2)
+                growth = f"{r['growth']:.2f}" + ("!" if r["growth"] > 1.5 else "")
+            prev[stage] = (n, r["seconds"])
+            rows.append(r)
+            print(f"{n:>9} {stage:<8}{r['seconds']:>9.2f}{r['us_per_locality']:>9.1f}"
+                  f"{r['peak_rss_mb']:>9.1f}{r['output_mb']:>8.1f}{growth:>8}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
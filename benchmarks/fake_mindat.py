@@ -0,0 +1,252 @@
+"""
+Local stand-in for the Mindat API, served from fixture data.
+
+Serves the endpoints the downloader uses, paginated like the real API
+({"count", "next", "previous", "results"}):
+  /localities/             filter by ?country=, paged by ?page_size=&page=
+  /localities/{id}/        locality detail (with geomaterials ids); parent localities too
+  /localityminerals/       ?locality=ID, paged
+  /geomaterials/           paged
+
+Fixture: a cleaned/enriched export such as mindat_data/Iran_Mine_enriched_clean.json
+(flattened "detail.*" keys are folded back into a detail record). Parent localities
+missing from the export are synthesised from each locality's "txt" path
+("Mine, District, County, Province, Iran"), keeping the real parent id for the first hop.
+
+Knobs: latency + jitter per request, stalls (rare slow responses), a server-side
+page_size cap, and injected 429 / 5xx rates so retry behaviour can be measured without touching the real API.
+
+Run standalone:
+  python -m benchmarks.fake_mindat --fixture mindat_data/Iran_Mine_enriched_clean.json --port 8765
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_FIXTURE = ROOT / "mindat_data" / "Iran_Mine_enriched_clean.json"
+
+
+@dataclass
+class FakeOptions:
+    latency: float = 0.0        # seconds added to every response
+    jitter: float = 0.0         # +/- uniform seconds on top of latency
+    page_cap: int = 200         # server-side max page_size (Mindat caps ~200)
+    rate_429: float = 0.0       # fraction of requests answered with 429
+    failure_rate: float = 0.0   # fraction of requests answered with 503
+    stall_rate: float = 0.0     # fraction of requests that stall (tail latency)
+    stall_seconds: float = 2.0  # extra delay of a stalled request
+    seed: int = 0
+
+
+class MindatFixture:
+    """Localities, details, locality minerals and geomaterials derived from one export."""
+    def __init__(self, path: Path = DEFAULT_FIXTURE, multiply: int = 1):
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        records = raw["results"] if isinstance(raw, dict) else raw
+        self.localities: list[dict] = []
+        self.details: dict[int, dict] = {}
+        self.minerals: dict[int, list[dict]] = {}
+        geomaterial_ids: set[int] = set()
+        next_lm_id = 1
+        # multiply > 1 clones the fixture under fresh ids to scale the dataset
+        for copy in range(multiply):
+            for rec in records:
+                base = {k: v for k, v in rec.items() if not k.startswith("detail.")}
+                detail = {k[len("detail."):]: v for k, v in rec.items() if k.startswith("detail.")}
+                if "id" not in base:
+                    continue
+                loc_id = base["id"] + copy * 10_000_000
+                base["id"] = loc_id
+                detail = {**base, **detail, "id": loc_id}
+                gids = [g for g in detail.get("geomaterials") or [] if isinstance(g, int)]
+                detail["geomaterials"] = gids
+                geomaterial_ids.update(gids)
+                self.localities.append(base)
+                self.details[loc_id] = detail
+                lms = []
+                for gid in gids:
+                    lms.append({"id": next_lm_id, "locality": loc_id, "geomaterial": gid})
+                    next_lm_id += 1
+                self.minerals[loc_id] = lms
+        self._add_ancestors()
+        self.geomaterials = [{"id": g, "name": f"Geomaterial {g}", "entrytype_text": "mineral"}
+                             for g in sorted(geomaterial_ids)]
+
+    def _add_ancestors(self, first_synthetic_id: int = 900_000_000):
+        path_ids: dict[str, int] = {}
+        chains = []
+        for loc in self.localities:
+            names = [p.strip() for p in (loc.get("txt") or "").split(",")][1:]
+            if loc.get("parent") and names:
+                path_ids.setdefault(", ".join(names), loc["parent"])
+                chains.append(names)
+        next_id = first_synthetic_id
+        for names in chains:
+            for i in range(len(names)):
+                path = ", ".join(names[i:])
+                if path not in path_ids:
+                    path_ids[path] = next_id; next_id += 1
+                loc_id = path_ids[path]
+                if loc_id in self.details:
+                    break  # rest of the chain already built by a sibling
+                parent = path_ids.setdefault(", ".join(names[i + 1:]), next_id) if i + 1 < len(names) else 0
+                if parent == next_id:
+                    next_id += 1
+                self.details[loc_id] = {"id": loc_id, "txt": path, "parent": parent,
+                                        "level": len(names) - i - 1, "country": names[-1], "geomaterials": []}
+
+
+class FakeMindatServer:
+    def __init__(self, fixture: MindatFixture, options: FakeOptions | None = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.fixture = fixture
+        self.options = options or FakeOptions()
+        self.requests: Counter = Counter()   # endpoint -> count
+        self.statuses: Counter = Counter()   # status -> count
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.options.seed)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMindatServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.statuses.clear()
+
+    def _page(self, path: str, qs: dict, items: list[Any]) -> dict:
+        size = min(int(qs.get("page_size", ["100"])[0]), self.options.page_cap)
+        page = int(qs.get("page", ["1"])[0])
+        start = (page - 1) * size
+        chunk = items[start:start + size]
+        nxt = None
+        if start + size < len(items):
+            q = {k: v[0] for k, v in qs.items()}
+            q.update(page=page + 1, page_size=size)
+            nxt = f"{self.base_url}{path}?{urlencode(q)}"
+        return {"count": len(items), "next": nxt, "previous": None, "results": chunk}
+
+    def route(self, path: str, qs: dict) -> tuple[int, Any]:
+        fx = self.fixture
+        parts = [p for p in path.split("/") if p]
+        if parts == ["localities"]:
+            country = qs.get("country", [None])[0]
+            items = [l for l in fx.localities if country is None or l.get("country") == country]
+            return 200, self._page(path, qs, items)
+        if len(parts) == 2 and parts[0] == "localities" and parts[1].isdigit():
+            detail = fx.details.get(int(parts[1]))
+            return (200, detail) if detail else (404, {"detail": "Not found."})
+        if parts == ["localityminerals"]:
+            loc = qs.get("locality", [""])[0]
+            items = fx.minerals.get(int(loc), []) if loc.isdigit() else []
+            return 200, self._page(path, qs, items)
+        if parts == ["geomaterials"]:
+            return 200, self._page(path, qs, fx.geomaterials)
+        return 404, {"detail": "Not found."}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = "/" + url.path.strip("/").split("/")[0] + "/"
+                if endpoint == "/localities/" and url.path.strip("/").count("/"):
+                    endpoint = "/localities/{id}/"
+                opts = server.options
+                with server._lock:
+                    server.requests[endpoint] += 1
+                    roll = server._rng.random()
+                    delay = max(0.0, opts.latency + server._rng.uniform(-opts.jitter, opts.jitter))
+                    if server._rng.random() < opts.stall_rate:
+                        delay += opts.stall_seconds
+                if delay:
+                    time.sleep(delay)
+
+                headers = {}
+                if roll < opts.rate_429:
+                    status, body = 429, {"detail": "Request was throttled."}
+                    headers["Retry-After"] = "0"
+                elif roll < opts.rate_429 + opts.failure_rate:
+                    status, body = 503, {"detail": "Service unavailable."}
+                else:
+                    status, body = server.route(url.path, parse_qs(url.query))
+                with server._lock:
+                    server.statuses[status] += 1
+
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("fake-mindat")
+    ap.add_argument("--fixture", default=str(DEFAULT_FIXTURE))
+    ap.add_argument("--multiply", type=int, default=1, help="Clone the fixture N times under new ids")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--page-cap", type=int, default=200)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    ap.add_argument("--stall-rate", type=float, default=0.0)
+    ap.add_argument("--stall-seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    opts = FakeOptions(args.latency, args.jitter, args.page_cap, args.rate_429, args.failure_rate,
+                       args.stall_rate, args.stall_seconds)
+    server = FakeMindatServer(MindatFixture(Path(args.fixture), args.multiply), opts, args.host, args.port)
+    print(f"Fake Mindat API at {server.base_url} ({len(server.fixture.localities)} localities)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
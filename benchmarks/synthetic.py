@@ -0,0 +1,223 @@
+"""
+Synthetic Mindat-shaped data for scaling the post-processing scripts past the bundled
+~1k-locality sample.
+
+Field distributions are learnt from the sample (mindat_data/Iran_Mine_enriched_clean.json):
+  - which fields a locality has: each synthetic record copies the field set of a random
+    sample record, so correlated presence/absence (coordinates, description, ...) is kept
+  - scalar/categorical values (locality_type, level, dates, discovery fields, ...) are
+    drawn from the sample's values
+  - txt is a sample locality name placed in another sample's district/province chain,
+    under a country from a weighted list of mining countries; coordinates cluster
+    around a per-country centre
+  - geomaterials per locality follow the sample's count distribution and per-geomaterial
+    popularity, with a long tail of synthetic ids up to --geomaterials
+  - elements are union of the chosen geomaterials' elements, like Mindat's own field
+
+Output mirrors the downloader: {"results": [...]} JSON (or JSONL) of enriched records with
+a nested "detail" and "locality_minerals" (the input of clean_mindat_json.py), plus a
+geomaterials file for the merge and GeoJSON scripts. Records are streamed to disk, so
+1M localities need no more memory than 1k. Same seed → same files.
+
+Usage:
+  python -m benchmarks.synthetic --localities 100000 --out-dir /tmp/synth
+  python -m benchmarks.synthetic --localities 1000000 --format jsonl --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+
+from benchmarks.fake_mindat import DEFAULT_FIXTURE
+
+# (country, weight): rough share of Mindat mine localities
+COUNTRIES = [
+    ("USA", 30), ("Canada", 8), ("Australia", 8), ("China", 6), ("Germany", 6), ("Russia", 5),
+    ("Mexico", 4), ("Chile", 3), ("Peru", 3), ("UK", 4), ("France", 3), ("Italy", 3), ("Czech Republic", 3),
+    ("Austria", 2), ("Sweden", 2), ("Norway", 2), ("Spain", 2), ("Japan", 2), ("Iran", 2), ("Brazil", 2),
+    ("South Africa", 2), ("Bolivia", 1), ("Argentina", 1), ("Kazakhstan", 1), ("Mongolia", 1), ("Turkey", 1),
+    ("Morocco", 1), ("Namibia", 1), ("India", 1), ("Pakistan", 1),
+]
+
+# common real species first (they dominate the popularity head), synthetic names after
+COMMON_MINERALS = [
+    ("Quartz", "SiO2", "O-Si"), ("Pyrite", "FeS2", "Fe-S"), ("Chalcopyrite", "CuFeS2", "Cu-Fe-S"),
+    ("Galena", "PbS", "Pb-S"), ("Sphalerite", "ZnS", "S-Zn"), ("Calcite", "CaCO3", "C-Ca-O"),
+    ("Hematite", "Fe2O3", "Fe-O"), ("Magnetite", "Fe2+Fe3+2O4", "Fe-O"), ("Malachite", "Cu2(CO3)(OH)2", "C-Cu-H-O"),
+    ("Azurite", "Cu3(CO3)2(OH)2", "C-Cu-H-O"), ("Baryte", "BaSO4", "Ba-O-S"), ("Fluorite", "CaF2", "Ca-F"),
+    ("Gypsum", "CaSO4·2H2O", "Ca-H-O-S"), ("Gold", "Au", "Au"), ("Silver", "Ag", "Ag"),
+    ("Goethite", "Fe3+O(OH)", "Fe-H-O"), ("Dolomite", "CaMg(CO3)2", "C-Ca-Mg-O"), ("Arsenopyrite", "FeAsS", "As-Fe-S"),
+    ("Chalcocite", "Cu2S", "Cu-S"), ("Bornite", "Cu5FeS4", "Cu-Fe-S"), ("Covellite", "CuS", "Cu-S"),
+    ("Cerussite", "PbCO3", "C-O-Pb"), ("Uraninite", "UO2", "O-U"), ("Halite", "NaCl", "Cl-Na"),
+    ("Muscovite", "KAl2(AlSi3O10)(OH)2", "Al-H-K-O-Si"), ("Cassiterite", "SnO2", "O-Sn"),
+    ("Molybdenite", "MoS2", "Mo-S"), ("Stibnite", "Sb2S3", "S-Sb"), ("Cinnabar", "HgS", "Hg-S"),
+    ("Chromite", "Fe2+Cr3+2O4", "Cr-Fe-O"),
+]
+ENTRY_TYPES = [("mineral", 70), ("variety", 12), ("rock", 8), ("group", 5), ("synonym", 5)]
+_SYLLABLES = ["al", "ar", "ba", "be", "ca", "co", "cu", "di", "fe", "go", "ha", "ka", "la", "ma", "mo",
+              "na", "ni", "or", "pa", "ro", "sa", "si", "ta", "ti", "ur", "va", "wo", "ze", "zi"]
+_ELEMENTS = ["O", "Si", "Fe", "S", "Cu", "Ca", "Al", "H", "Mg", "Na", "K", "Pb", "Zn", "C", "Mn", "As",
+             "Ba", "Ti", "P", "Cl", "F", "Ni", "Co", "Ag", "Au", "Bi", "Sb", "U", "Cr", "Mo", "Sn", "W"]
+
+
+class SampleModel:
+    """Empirical field distributions of the bundled sample."""
+    def __init__(self, path: Path = DEFAULT_FIXTURE):
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        records = raw["results"] if isinstance(raw, dict) else raw
+        self.templates: list[tuple[tuple[str, ...], tuple[str, ...]]] = []
+        self.values: dict[str, list] = {}
+        self.names: list[str] = []                  # first txt part (the locality itself)
+        self.settings: list[list[str]] = []         # the rest of a txt, minus the country
+        self.points: list[tuple[float, float]] = []
+        self.descriptions: list[str] = []
+        self.gm_counts: list[int] = []
+        popularity: Counter = Counter()
+        for rec in records:
+            base = tuple(k for k in rec if not k.startswith("detail."))
+            detail = tuple(k[len("detail."):] for k in rec if k.startswith("detail."))
+            self.templates.append((base, detail))
+            for k, v in rec.items():
+                key = k[len("detail."):] if k.startswith("detail.") else k
+                if key in ("id", "longid", "guid", "txt", "revtxtd", "description_short", "latitude",
+                           "longitude", "elements", "country", "parent", "geomaterials"):
+                    continue
+                if isinstance(v, (str, int, float, bool)) or v is None:
+                    self.values.setdefault(key, []).append(v)
+            parts = [p.strip() for p in str(rec.get("txt") or "").split(",")]
+            if len(parts) > 1:
+                self.names.append(parts[0]); self.settings.append(parts[1:-1])
+            if rec.get("latitude") and rec.get("longitude"):
+                self.points.append((float(rec["latitude"]), float(rec["longitude"])))
+            if rec.get("description_short"):
+                self.descriptions.append(rec["description_short"])
+            gids = [g for g in rec.get("detail.geomaterials") or rec.get("geomaterials") or [] if isinstance(g, int)]
+            self.gm_counts.append(len(gids))
+            popularity.update(gids)
+        self.popular = [g for g, _ in popularity.most_common()]
+        self.popular_weights = [n for _, n in popularity.most_common()]
+        self.names, self.settings = self.names or ["Unnamed"], self.settings or [[]]
+        self.points = self.points or [(0.0, 0.0)]
+        self.descriptions = self.descriptions or [""]
+
+
+class Generator:
+    def __init__(self, model: SampleModel, seed: int = 42, n_geomaterials: int = 6000):
+        self.m = model
+        self.rng = random.Random(seed)
+        self.countries = [c for c, _ in COUNTRIES]
+        self.country_cum = list(accumulate(w for _, w in COUNTRIES))
+        # one centre per country so coordinates cluster by country
+        self.centres = {c: (self.rng.uniform(-50, 65), self.rng.uniform(-150, 150)) for c in self.countries}
+        self.geomaterials = self._geomaterials(max(n_geomaterials, len(model.popular)))
+        self.gm_ids = [g["id"] for g in self.geomaterials]
+        # sample popularity for the ids the sample knows, Zipf-like tail for the rest
+        known = dict(zip(model.popular, model.popular_weights))
+        floor = min(model.popular_weights or [1])
+        self.gm_cum = list(accumulate(known.get(gid, floor / (1 + i / 200)) for i, gid in enumerate(self.gm_ids)))
+        self.gm_elements = {g["id"]: g["elements"].strip("-").split("-") for g in self.geomaterials}
+
+    def _geomaterials(self, n: int) -> list[dict]:
+        rng = self.rng
+        ids = list(self.m.popular)
+        next_id = max(ids, default=0) + 1
+        while len(ids) < n:
+            ids.append(next_id); next_id += 1
+        out = []
+        for i, gid in enumerate(ids):
+            if i < len(COMMON_MINERALS):
+                name, formula, elements = COMMON_MINERALS[i]
+            else:
+                name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize() + "ite"
+                els = sorted(set(rng.choices(_ELEMENTS[:20], k=rng.randint(2, 5))) | {"O"})
+                formula = "".join(f"{e}{rng.randint(1, 4) if rng.random() < 0.5 else ''}" for e in els)
+                elements = "-".join(els)
+            out.append({"id": gid, "longid": f"1:1:{gid}:{rng.randint(0, 9)}", "name": name,
+                        "entrytype_text": rng.choices([t for t, _ in ENTRY_TYPES], [w for _, w in ENTRY_TYPES])[0],
+                        "ima_formula": formula, "mindat_formula": formula,
+                        "ima_status": rng.choice(["APPROVED", "GRANDFATHERED", ""]),
+                        "elements": f"-{elements}-", "updttime": f"20{rng.randint(10, 24)}-01-01 00:00:00"})
+        return out
+
+    def locality(self, loc_id: int) -> dict:
+        rng, m = self.rng, self.m
+        base_keys, detail_keys = rng.choice(m.templates)
+        country = rng.choices(self.countries, cum_weights=self.country_cum)[0]
+        k = rng.choice(m.gm_counts)
+        gids = sorted(set(rng.choices(self.gm_ids, cum_weights=self.gm_cum, k=k))) if k else []
+        elements = sorted({e for g in gids for e in self.gm_elements[g]})
+        lat0, lon0 = self.centres[country]
+        slat, slon = rng.choice(m.points)
+        txt = ", ".join([rng.choice(m.names), *rng.choice(m.settings), country])
+        fields = {
+            "id": loc_id, "longid": f"1:2:{loc_id}:{rng.randint(0, 9)}", "guid": f"{rng.getrandbits(128):032x}",
+            "txt": txt, "revtxtd": ", ".join(reversed(txt.split(", "))), "country": country,
+            "description_short": rng.choice(m.descriptions),
+            "latitude": round(lat0 + (slat % 1) * 4 - 2 + rng.gauss(0, 0.3), 6),
+            "longitude": round(lon0 + (slon % 1) * 4 - 2 + rng.gauss(0, 0.3), 6),
+            "elements": f"-{'-'.join(elements)}-" if elements else "",
+            "parent": rng.randint(1, 10_000), "geomaterials": gids,
+        }
+
+        def pick(key):
+            if key in fields:
+                return fields[key]
+            pool = m.values.get(key)
+            return rng.choice(pool) if pool else None
+
+        rec = {key: pick(key) for key in base_keys if key != "geomaterials"}
+        rec["id"] = loc_id
+        detail = {key: pick(key) for key in ("id", *detail_keys)}
+        detail["geomaterials"] = gids
+        rec["detail"] = detail
+        rec["locality_minerals"] = [{"id": loc_id * 64 + i, "locality": loc_id, "geomaterial": g}
+                                    for i, g in enumerate(gids)]
+        return rec
+
+
+def generate(out_dir: Path, n: int, seed: int = 42, fmt: str = "json",
+             n_geomaterials: int = 6000, sample: Path = DEFAULT_FIXTURE) -> dict[str, Path]:
+    """Write localities_<n>.<fmt> (raw enriched) and geomaterials.json; returns their paths."""
+    out_dir = Path(out_dir); out_dir.mkdir(parents=True, exist_ok=True)
+    gen = Generator(SampleModel(sample), seed=seed, n_geomaterials=n_geomaterials)
+    loc_path = out_dir / f"localities_{n}.{fmt}"
+    tmp = loc_path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        if fmt == "jsonl":
+            for i in range(n):
+                f.write(json.dumps(gen.locality(1 + i), ensure_ascii=False) + "\n")
+        else:
+            f.write('{"results": [\n')
+            for i in range(n):
+                f.write((",\n" if i else "") + json.dumps(gen.locality(1 + i), ensure_ascii=False))
+            f.write("\n]}\n")
+    tmp.replace(loc_path)
+    gm_path = out_dir / "geomaterials.json"
+    gm_path.write_text(json.dumps({"results": gen.geomaterials}, ensure_ascii=False), encoding="utf-8")
+    return {"localities": loc_path, "geomaterials": gm_path}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("synthetic-mindat")
+    ap.add_argument("--localities", type=int, default=10_000)
+    ap.add_argument("--geomaterials", type=int, default=6000)
+    ap.add_argument("--out-dir", default="synthetic")
+    ap.add_argument("--format", choices=["json", "jsonl"], default="json")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--sample", default=str(DEFAULT_FIXTURE))
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    paths = generate(Path(args.out_dir), args.localities, args.seed, args.format,
+                     args.geomaterials, Path(args.sample))
+    mb = paths["localities"].stat().st_size / 1e6
+    print(f"{args.localities} localities → {paths['localities']} ({mb:.1f} MB), "
+          f"{args.geomaterials} geomaterials → {paths['geomaterials']} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Package: cli
+
+from pathlib import Path
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.utils.timing import StageTimer
+from cli.consolidate import GLOBAL_STEM
+
+def main(args):
+    """`mindat analytics` — co-occurrence / frequency / similarity queries (needs numpy + scipy)."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+    with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+        run(args, cfg, log)
+
+def _default_inputs(save_dir: Path) -> list[Path]:
+    """The consolidated global file if there is one, else every country output."""
+    for ext in ("jsonl", "json"):
+        if (save_dir / f"{GLOBAL_STEM}.{ext}").exists():
+            return [save_dir / f"{GLOBAL_STEM}.{ext}"]
+    return sorted(p for p in save_dir.glob("*_Mine_enriched.json*") if p.suffix in (".json", ".jsonl"))
+
+def run(args, cfg, log):
+    from mindat.analytics import IncidenceMatrix
+    save_dir = Path(cfg.save.dir)
+    inputs = [Path(p) for p in args.inputs] or _default_inputs(save_dir)
+    if not inputs:
+        raise SystemExit(f"analytics: no inputs in {save_dir}")
+    timer = StageTimer()
+    with timer.stage("matrix"):
+        im = IncidenceMatrix.open(inputs, None if args.no_cache else save_dir / "analytics")
+    log.info(f"Incidence matrix: {im.M.shape[0]} localities × {im.M.shape[1]} geomaterials "
+             f"({im.M.nnz} links), {len(im.elements)} elements, {len(im.countries)} countries"
+             + (f" [cache {im.cache_dir}]" if im.cache_dir else ""))
+
+    with timer.stage("queries"):
+        if args.cooccur is not None:
+            print(f"Geomaterials found with {im.name(args.cooccur)}:")
+            for gm_id, n in im.top_cooccurring(args.cooccur, args.k):
+                print(f"  {im.name(gm_id):<30} {n:>6} localities")
+        if args.similar is not None:
+            print(f"Localities most similar to {args.similar} (cosine over geomaterials):")
+            for loc_id, score in im.similar_localities(args.similar, args.k):
+                print(f"  {loc_id:>10}  {score:.3f}")
+        if args.elements_by_country:
+            for country, freq in im.element_frequency_by_country().items():
+                top = ", ".join(f"{e} {n}" for e, n in list(freq.items())[:args.k])
+                print(f"  {country or '(no country)'}: {top}")
+        if args.top or not (args.cooccur is not None or args.similar is not None or args.elements_by_country):
+            print("Most frequent geomaterials:")
+            for gm_id, n in im.mineral_frequency(args.top or args.k):
+                print(f"  {im.name(gm_id):<30} {n:>6} localities")
+    log.info(timer.report())
@@ -0,0 +1,67 @@
+# Package: cli
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, write_run_summary, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.services.build_service import BuildService
+from cli.consolidate import country_outputs
+from cli.pipe import SCRIPTS, load_script
+
+STAGE_SCRIPTS = ("clean_mindat_json", "merging_geomaterils_iran_mines", "to_leaflet_geojson")
+
+def main(args):
+    """`mindat build` — incremental clean → merge → geojson → per-mineral layers."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+    with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+        run(args, cfg, log)
+
+def stage_key(geomaterials: Path, **options) -> str:
+    """Fingerprint of everything a record's outputs depend on besides the record itself."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in STAGE_SCRIPTS:
+        h.update((SCRIPTS / f"{name}.py").read_bytes())
+    h.update(geomaterials.read_bytes())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    return h.hexdigest()
+
+def run(args, cfg, log):
+    save_dir = Path(cfg.save.dir)
+    inputs = [Path(p) for p in args.inputs] if args.inputs else country_outputs(save_dir)
+    if not inputs:
+        raise SystemExit(f"build: no inputs (looked for {save_dir}/*_Mine_enriched.json[l])")
+    geomaterials = Path(args.geomaterials)
+    if not geomaterials.exists():
+        raise SystemExit(f"build: geomaterials file not found: {geomaterials}")
+
+    # the scripts' own per-record functions are the stages (their log lines go to stderr)
+    clean_mod = load_script("clean_mindat_json")
+    merger = load_script("merging_geomaterils_iran_mines").DataMergerCleaner(log_file=sys.stderr)
+    converter = load_script("to_leaflet_geojson").GeoJSONConverter(compact=args.compact, precision=args.precision,
+                                                                  log_file=sys.stderr)
+    if not (merger.load_geomaterials_file(str(geomaterials)) and converter.load_geomaterials_file(str(geomaterials))):
+        raise SystemExit(f"build: cannot read geomaterials from {geomaterials}")
+
+    svc = BuildService(
+        out_dir=Path(args.out or save_dir / "build"),
+        clean=clean_mod.clean_record,
+        merge=lambda rec: next(merger.iter_merged((rec,)), None),
+        feature=converter.build_feature,
+        key=stage_key(geomaterials, compact=args.compact, precision=args.precision),
+        batch=args.batch,
+    )
+    try:
+        stats = svc.run(inputs, full=args.full)
+    finally:
+        svc.close()
+    write_run_summary(log, "stages", svc.timer.summary())
+    log.info(svc.timer.report())
+    log.info(f"Build: {stats['read']} records from {len(inputs)} files, {stats['rebuilt']} rebuilt"
+             + (" (full rebuild)" if stats["full"] else f", {stats['unchanged']} unchanged")
+             + f", {stats['removed']} removed; layers: {stats['layers_written']} written, "
+               f"{stats['layers_removed']} removed → {svc.out_dir}")
@@ -0,0 +1,56 @@
+# Package: cli
+
+from pathlib import Path
+from mindat.config import read_api_key
+from mindat.endpoints import MindatEndpoints
+from mindat.metrics import HttpMetrics
+from mindat.http import HttpSession
+from mindat.api_client import MindatClient
+from mindat.page_tuner import PageSizeTuner
+from mindat.utils.dlq import DeadLetterQueue
+from mindat.utils.io import JsonAccumulator, JsonlWriter
+from mindat.utils.sinks import GeoJsonSink, Sink, SqliteSink, ThreadedSink
+from mindat.repositories.hierarchy_repo import HierarchyStore, ParentResolver
+
+def build_client(cfg, metrics: HttpMetrics | None = None, tune: bool = False) -> MindatClient:
+    """config → endpoints → HTTP session → API client (shared by the commands).
+    tune: auto-tune page sizes (if cfg.adaptive_page_size); call client.tuner.save() when done."""
+    api_key = read_api_key(cfg.api_key_file)
+    ep = MindatEndpoints(
+        base_url=cfg.base_url,
+        localities=cfg.endpoints.localities,
+        locality_detail=cfg.endpoints.locality_detail,
+        locality_minerals=cfg.endpoints.locality_minerals,
+    )
+    http = HttpSession(cfg.base_url, cfg.retries, cfg.timeouts, api_key, metrics=metrics,
+                       cache_size=cfg.http_cache_size, hedging=cfg.hedging)
+    tuner = None
+    if tune and cfg.adaptive_page_size:
+        tuner = PageSizeTuner(Path(cfg.save.dir) / "page_sizes.json", initial=cfg.page_size)
+    return MindatClient(http, ep, page_size=cfg.page_size, tuner=tuner)
+
+def build_resolver(cfg, client: MindatClient) -> ParentResolver:
+    """ParentResolver over the persistent hierarchy table in save.dir."""
+    return ParentResolver(client, HierarchyStore(Path(cfg.save.dir) / cfg.save.hierarchy_file))
+
+def build_dlq(cfg) -> DeadLetterQueue | None:
+    return DeadLetterQueue(Path(cfg.save.dir) / cfg.save.dlq_file) if cfg.save.dlq_file else None
+
+SINKS = {"jsonl": JsonlWriter, "json": JsonAccumulator, "sqlite": SqliteSink, "geojson": GeoJsonSink}
+
+def build_sinks(cfg, specs: list[str], stem: str, primary: Path) -> list[Sink]:
+    """
+    "KIND[=PATH]" specs → sinks (threaded if cfg.save.sink_threads). PATH defaults to
+    <save.dir>/<stem>.<KIND>; the primary output itself cannot be a sink.
+    """
+    sinks = []
+    for spec in specs:
+        kind, _, path = spec.partition("=")
+        if kind not in SINKS:
+            raise SystemExit(f"Unknown sink {kind!r} (choose from: {', '.join(SINKS)})")
+        path = Path(path) if path else Path(cfg.save.dir) / f"{stem}.{kind}"
+        if path.resolve() == primary.resolve():
+            raise SystemExit(f"Sink {spec!r} would overwrite the primary output {primary}")
+        sink = SINKS[kind](path)
+        sinks.append(ThreadedSink(sink) if cfg.save.sink_threads else sink)
+    return sinks
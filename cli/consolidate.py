@@ -0,0 +1,40 @@
+# Package: cli
+
+from pathlib import Path
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, write_run_summary, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.services.consolidate_service import ConsolidateService
+
+GLOBAL_STEM = "Global_Mine_enriched"
+
+def country_outputs(save_dir: Path, out: Path | None = None) -> list[Path]:
+    """Every country output in save.dir (not the global file, nor *_clean / .idx / .tmp files)."""
+    return sorted(p for p in save_dir.glob("*_Mine_enriched.json*")
+                  if p.suffix in (".json", ".jsonl") and not p.name.startswith(GLOBAL_STEM)
+                  and (out is None or p.resolve() != out.resolve()))
+
+def main(args):
+    """`mindat consolidate` — merge per-country outputs into one global file (bounded memory)."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+    with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+        run(args, cfg, log)
+
+def run(args, cfg, log):
+    save_dir = Path(cfg.save.dir)
+    fmt = args.format or (Path(args.out).suffix.lstrip(".") if args.out else cfg.save.format)
+    fmt = "jsonl" if fmt == "jsonl" else "json"
+    out = Path(args.out or save_dir / f"{GLOBAL_STEM}.{fmt}")
+    inputs = [Path(p) for p in args.inputs] if args.inputs else country_outputs(save_dir, out)
+    if not inputs:
+        raise SystemExit(f"consolidate: no inputs (looked for {save_dir}/*_Mine_enriched.json[l])")
+
+    svc = ConsolidateService(run_size=args.run_size, fan_in=args.fan_in, tmp_dir=args.tmp_dir)
+    stats = svc.run(inputs, out, save_format=fmt, index=cfg.save.jsonl_index)
+    write_run_summary(log, "stages", svc.timer.summary())
+    log.info(svc.timer.report())
+    log.info(f"Consolidated {stats['read']} records from {stats['inputs']} files "
+             f"({stats['runs']} sorted runs) → {stats['written']} unique localities in {out}"
+             + (f"; {stats['no_id']} without an id dropped" if stats["no_id"] else ""))
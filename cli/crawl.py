@@ -0,0 +1,72 @@
+# Package: cli
+
+from pathlib import Path
+from tqdm import tqdm
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, write_run_summary, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.metrics import HttpMetrics
+from mindat.repositories.localities_repo import LocalitiesRepository
+from mindat.services.crawl_service import CrawlService, default_worker_id
+from mindat.workqueue.sqlite_queue import SqliteWorkQueue
+from cli.common import build_client, build_resolver
+
+def main(args):
+    """`mindat queue seed|work|export|status` — distributed crawl over a shared SQLite queue."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+    if not args.queue and not args.country:
+        raise SystemExit("queue: pass --country (default queue file) or --queue PATH")
+    stem = (args.country or Path(args.queue).stem).replace(" ", "_")
+    qpath = Path(args.queue or Path(cfg.save.dir) / f"{stem}_queue.sqlite")
+    queue = SqliteWorkQueue(qpath)
+    try:
+        with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+            run(args, cfg, log, queue, stem)
+    finally:
+        queue.close()
+
+def run(args, cfg, log, queue, stem):
+    if args.page_size: cfg.page_size = args.page_size
+
+    if args.action == "status":
+        log.info(f"Queue {queue.path}: {queue.stats()}")
+        return
+
+    if args.action == "export":
+        ext = "jsonl" if cfg.save.format == "jsonl" else "json"
+        out = Path(args.out or Path(cfg.save.dir) / f"{stem}_Mine_enriched.{ext}")
+        n = CrawlService(None, queue).export(out, cfg.save.format)
+        log.info(f"Exported {n} localities → {out} (queue: {queue.stats()})")
+        return
+
+    metrics = HttpMetrics()
+    client = build_client(cfg, metrics, tune=not args.page_size)
+    if args.action == "seed":
+        if not args.country:
+            raise SystemExit("queue seed: --country is required")
+        svc = CrawlService(client, queue, LocalitiesRepository(client, cfg.search_strategies))
+        try:
+            added = svc.seed(args.country)
+        finally:
+            if client.tuner: client.tuner.save()
+        log.info(f"Seeded {added} new localities into {queue.path} (queue: {queue.stats()})")
+        return
+
+    # work
+    worker = args.worker_id or default_worker_id()
+    svc = CrawlService(client, queue, resolver=build_resolver(cfg, client) if args.resolve_parents else None)
+    s = queue.stats()
+    bar = tqdm(unit="loc", total=s["pending"] + s["expired"])
+    try:
+        done = svc.work(worker, batch=args.batch, lease_seconds=args.lease,
+                        max_attempts=args.max_attempts, idle_exit=not args.follow,
+                        on_locality=lambda loc_id, ok: bar.update(1))
+    finally:
+        bar.close()
+        if client.tuner: client.tuner.save()
+        write_run_summary(log, "stages", svc.timer.summary())
+        write_run_summary(log, "metrics", metrics.snapshot())
+    log.info(svc.timer.report())
+    log.info(f"Worker {worker} completed {done} localities (queue: {queue.stats()})")
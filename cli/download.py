@@ -0,0 +1,125 @@
+# Package: cli
+
+import sys
+from pathlib import Path
+from tqdm import tqdm
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, write_run_summary, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.metrics import HttpMetrics, serve_prometheus
+from mindat.repositories.localities_repo import LocalitiesRepository
+from mindat.services.download_service import DownloadService, DownloadHooks, output_stem
+from mindat.utils.seen import SeenSet
+from mindat.utils.sinks import StreamSink
+from cli.common import build_client, build_dlq, build_resolver, build_sinks
+from cli.pipe import stdout_closed
+from cli.prompts import Questioner
+
+def main(args):
+    """`mindat download` — imported only when the command runs (tqdm, yaml, requests live here)."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+
+    try:
+        with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+            run(args, cfg, log)
+    except BrokenPipeError:  # --stdout reader went away: what was stored so far is kept
+        stdout_closed()
+        log.warning("stdout closed by the reader; stopped")
+        return 1
+
+def run(args, cfg, log):
+    # Inputs (asked first: a page size typed at the prompt is as fixed as --page-size)
+    if args.stdout and not args.country:
+        raise SystemExit("--stdout needs --country (a pipeline stage cannot prompt)")
+    page_size = args.page_size
+    if args.country:
+        country = args.country
+    else:
+        q = Questioner().ask()
+        country = q.country
+        page_size = page_size or q.page_size
+    if page_size: cfg.page_size = page_size
+
+    # Build endpoints + HTTP (the tuner only when no page size was given)
+    metrics = HttpMetrics()
+    if args.metrics_port:
+        serve_prometheus(metrics, args.metrics_port)
+    client = build_client(cfg, metrics, tune=not page_size)
+
+    # Repo wired with strategies from config (facts that change)
+    repo = LocalitiesRepository(client, cfg.search_strategies)
+
+    # Cross-run dedup: skip localities some earlier run already stored unchanged
+    # (enriched runs only, so a --no-enrich listing never masks a later enrichment)
+    seen = None
+    if cfg.save.seen_file and not args.no_dedup and not args.no_enrich:
+        seen = SeenSet(Path(cfg.save.dir) / cfg.save.seen_file)
+
+    # Extra outputs fed from the same pass (each record is serialised once)
+    stem = output_stem(country)
+    primary = Path(cfg.save.dir) / f"{stem}.{'jsonl' if cfg.save.format == 'jsonl' else 'json'}"
+    sinks = build_sinks(cfg, args.sink if args.sink is not None else cfg.save.sinks, stem, primary)
+    if args.stdout:  # logs and the progress bar go to stderr, so stdout carries only records
+        sinks.append(StreamSink(sys.stdout.buffer))
+
+    # Service (pure orchestration)
+    svc = DownloadService(
+        client=client,
+        repo=repo,
+        out_dir=Path(cfg.save.dir),
+        save_format=cfg.save.format,
+        checkpoint_every=cfg.save.checkpoint_every,
+        seen=seen,
+        resolver=build_resolver(cfg, client) if args.resolve_parents else None,
+        dlq=build_dlq(cfg),
+        jsonl_index=cfg.save.jsonl_index,
+        sinks=sinks,
+    )
+
+    bar = tqdm(unit="loc")
+
+    class BarHooks(DownloadHooks):
+        def on_total(self, total):
+            # listing 'count' gives tqdm a real total and ETA
+            if total:
+                bar.total = total; bar.refresh()
+        def on_locality(self, loc_id, count, seconds):
+            bar.update(1)
+        def on_skip(self, loc_id):
+            bar.update(1)
+        def on_finish(self, timer):
+            write_run_summary(log, "stages", timer.summary())
+            log.info(timer.report())
+
+    try:
+        out = svc.download_country_mines(country, enrich=not args.no_enrich, hooks=BarHooks(),
+                                         retry_failed=not args.no_retry)
+    finally:
+        bar.close()
+        if seen is not None:
+            log.info(f"Skipped {svc.skipped} localities already stored ({len(seen)} in {seen.path})")
+            seen.close()
+        if svc.dlq is not None:
+            if len(svc.dlq):
+                log.warning(f"Dead letters: {svc.dlq.counts()} still failing → `mindat retry` ({svc.dlq.path})")
+            svc.dlq.close()
+        if client.tuner is not None:
+            client.tuner.save()
+            log.info(f"Page sizes: {client.tuner.snapshot()}")
+        if svc.resolver is not None:
+            r = svc.resolver
+            log.info(f"Parents: {r.fetched} fetched, {r.cache_hits} cache hits ({len(r.store)} nodes in {r.store.path})")
+            r.store.close()
+        summary = metrics.snapshot()
+        mpath = write_run_summary(log, "metrics", summary)
+        t = summary["totals"]
+        c = summary["counters"]
+        log.info(f"HTTP: {t['requests']} requests, {t['retries']} retries, {t['bytes']:,} bytes, "
+                 f"{c.get('cache_hits', 0)} cache hits, {c.get('coalesced', 0)} coalesced, "
+                 f"{c.get('hedges', 0)} hedged ({c.get('hedge_wins', 0)} won) → {mpath}")
+    log.info(f"Saved → {out}" if out.exists() else "Nothing new to save")
+    for sink in sinks:
+        if sink.path is not None and sink.path.exists():
+            log.info(f"Sink → {sink.path}")
@@ -0,0 +1,21 @@
+# Package: cli
+
+import json
+import sys
+
+from mindat.utils.jsonl_index import JsonlReader, build_index
+
+def main(args):
+    """`mindat index FILE.jsonl` — build/repair the .idx sidecar, optionally look records up."""
+    if args.rebuild:
+        build_index(args.file)
+    with JsonlReader(args.file) as r:
+        if args.get:
+            for loc_id in args.get:
+                rec = r.get(loc_id)
+                sys.stdout.write((json.dumps(rec, ensure_ascii=False) if rec else f"# {loc_id}: not found") + "\n")
+            return
+        print(f"{args.file}: {len(r)} indexed records, {r.size:,} bytes")
+        if args.splits:
+            for start, end in r.splits(args.splits):
+                print(f"  {start}-{end}")
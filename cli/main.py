@@ -1,73 +1,155 @@
+"""
+`mindat` console entry point.
+
+Only argparse is imported at startup; each subcommand's module (and with it tqdm, yaml,
+requests and the service graph) is imported when that command actually runs.
+With no subcommand, `download` is assumed: `mindat --country Iran` still works.
+"""
 import argparse
-from pathlib import Path
+import importlib
 import sys
-from tqdm import tqdm
-
-# Ensure project root is on sys.path so 'mindat' package can be imported when running this file directly
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
-
-from mindat.config import load_config, read_api_key
-from mindat.endpoints import MindatEndpoints
-from mindat.utils.logging import setup_logger
-from mindat.http import HttpSession
-from mindat.api_client import MindatClient
-from mindat.repositories.localities_repo import LocalitiesRepository
-from mindat.services.download_service import DownloadService
-from cli.prompts import Questioner
-
-def main():
-    ap = argparse.ArgumentParser("mindat-downloader")
+
+def _common(ap):
     ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--profile", action="store_true",
+                    help="Write cProfile/tracemalloc/peak-RSS reports next to the run log")
+
+def _download_args(ap):
+    _common(ap)
     ap.add_argument("--country", default=None)
     ap.add_argument("--type", dest="ltype", default="Mine")
     ap.add_argument("--page-size", type=int, default=None)
     ap.add_argument("--no-enrich", action="store_true", help="Do not call detail/minerals endpoints")
-    args = ap.parse_args()
-
-    cfg = load_config(args.config)
-    log = setup_logger(out_dir=cfg.save.dir)
-
-    api_key = read_api_key(cfg.api_key_file)
-    if args.page_size: cfg.page_size = args.page_size
-
-    # Build endpoints + HTTP
-    ep = MindatEndpoints(
-        base_url=cfg.base_url,
-        localities=cfg.endpoints.localities,
-        locality_detail=cfg.endpoints.locality_detail,
-        locality_minerals=cfg.endpoints.locality_minerals,
-    )
-    http = HttpSession(cfg.base_url, cfg.retries, cfg.timeouts, api_key)
-    client = MindatClient(http, ep, page_size=cfg.page_size)
-
-    # Inputs
-    if args.country:
-        country = args.country
-    else:
-        q = Questioner().ask()
-        country = q.country
-        if q.page_size: client.page_size = q.page_size
-
-    # Repo wired with strategies from config (facts that change)
-    repo = LocalitiesRepository(client, cfg.search_strategies)
-
-    # Service (pure orchestration)
-    svc = DownloadService(
-        client=client,
-        repo=repo,
-        out_dir=Path(cfg.save.dir),
-        save_format=cfg.save.format,
-        checkpoint_every=cfg.save.checkpoint_every
-    )
-
-    bar = tqdm(unit="loc")
-    def tick(_): bar.update(1)
-
-    out = svc.download_country_mines(country, enrich=not args.no_enrich, progress_cb=tick)
-    bar.close()
-    log.info(f"Saved → {out}")
+    ap.add_argument("--resolve-parents", action="store_true",
+                    help="Add each locality's ancestor ids (cached in save.hierarchy_file)")
+    ap.add_argument("--no-retry", action="store_true",
+                    help="Leave failed detail/minerals calls in the dead-letter queue for `mindat retry`")
+    ap.add_argument("--no-dedup", action="store_true",
+                    help="Ignore the cross-run seen-set (save.seen_file) and fetch everything")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="Serve Prometheus text metrics at http://127.0.0.1:PORT/metrics during the run")
+    ap.add_argument("--sink", action="append", default=None, metavar="KIND[=PATH]",
+                    help="Extra output written in the same pass (sqlite, geojson, jsonl, json; repeatable; "
+                         "default path <save.dir>/<Country>_Mine_enriched.<KIND>; replaces save.sinks)")
+    ap.add_argument("--stdout", action="store_true",
+                    help="Also stream stored records as JSONL to stdout (needs --country), e.g. | mindat clean")
+
+def _queue_args(ap):
+    _common(ap)
+    ap.add_argument("action", choices=["seed", "work", "export", "status"])
+    ap.add_argument("--country", default=None, help="Country to seed; also names the default queue/output files")
+    ap.add_argument("--queue", default=None, help="Queue file (default: <save.dir>/<Country>_queue.sqlite)")
+    ap.add_argument("--page-size", type=int, default=None)
+    ap.add_argument("--batch", type=int, default=20, help="Localities claimed per lease")
+    ap.add_argument("--lease", type=float, default=300.0, help="Lease seconds (renewed after each locality)")
+    ap.add_argument("--max-attempts", type=int, default=5, help="Attempts before a locality is parked as failed")
+    ap.add_argument("--worker-id", default=None, help="Default: host:pid:random")
+    ap.add_argument("--resolve-parents", action="store_true",
+                    help="Add each locality's ancestor ids (cached in save.hierarchy_file)")
+    ap.add_argument("--follow", action="store_true", help="Keep polling for work instead of exiting when drained")
+    ap.add_argument("--out", default=None, help="Export path (default: <save.dir>/<Country>_Mine_enriched.<format>)")
+
+def _retry_args(ap):
+    _common(ap)
+    ap.add_argument("--out", default=None, help="Only retry dead letters of this output file")
+    ap.add_argument("--max-attempts", type=int, default=5, help="Skip entries that already failed this often")
+    ap.add_argument("--status", action="store_true", help="List dead letters instead of retrying")
+
+def _index_args(ap):
+    ap.add_argument("file", help="JSONL output (sidecar: FILE.idx)")
+    ap.add_argument("--get", type=int, nargs="*", metavar="ID", help="Print these records by locality id")
+    ap.add_argument("--splits", type=int, default=None, metavar="N", help="Print N record-aligned byte ranges")
+    ap.add_argument("--rebuild", action="store_true", help="Rebuild the sidecar from scratch")
+
+def _pipe_args(ap, geomaterials: bool = True):
+    """Pipeline stages read JSONL on stdin and write JSONL on stdout unless given files."""
+    _common(ap)
+    ap.add_argument("--in", dest="inp", default="-", help="Input JSON/JSONL file, or - for JSONL on stdin")
+    ap.add_argument("--out", default="-", help="Output file, or - for JSONL on stdout")
+    if geomaterials:
+        ap.add_argument("--geomaterials", default="geomaterials_data.json", help="Geomaterials JSON file")
+
+def _clean_args(ap):
+    _pipe_args(ap, geomaterials=False)
+    ap.add_argument("--prefer", choices=["nested", "top"], default="nested",
+                    help="When flattened keys collide, prefer nested or existing/top-level value")
+
+def _geojson_args(ap):
+    _pipe_args(ap)
+    ap.add_argument("--compact", action="store_true", help="No popup HTML, minified")
+    ap.add_argument("--precision", type=int, default=5, help="Coordinate decimals in compact mode (5 ≈ 1 m)")
+    ap.add_argument("--workers", type=int, default=1, help="Process-pool workers for a .geojson FeatureCollection")
+
+def _build_args(ap):
+    _common(ap)
+    ap.add_argument("inputs", nargs="*", help="Raw JSON/JSONL outputs (default: <save.dir>/*_Mine_enriched.json[l])")
+    ap.add_argument("--geomaterials", default="geomaterials_data.json", help="Geomaterials JSON file")
+    ap.add_argument("--out", default=None, help="Build directory with the state file (default: <save.dir>/build)")
+    ap.add_argument("--compact", action="store_true", help="Compact map features (no popup HTML)")
+    ap.add_argument("--precision", type=int, default=5, help="Coordinate decimals in compact mode (5 ≈ 1 m)")
+    ap.add_argument("--full", action="store_true", help="Ignore cached stage outputs and rebuild everything")
+    ap.add_argument("--batch", type=int, default=5_000, help="Changed records processed per transaction")
+
+def _consolidate_args(ap):
+    _common(ap)
+    ap.add_argument("inputs", nargs="*", help="JSON/JSONL outputs (default: <save.dir>/*_Mine_enriched.json[l])")
+    ap.add_argument("--out", default=None, help="Default: <save.dir>/Global_Mine_enriched.<format>")
+    ap.add_argument("--format", choices=["json", "jsonl"], default=None,
+                    help="Output format (default: from --out, else save.format)")
+    ap.add_argument("--run-size", type=int, default=100_000, help="Records sorted in memory per run file")
+    ap.add_argument("--fan-in", type=int, default=64, help="Run files merged at once")
+    ap.add_argument("--tmp-dir", default=None, help="Where run files go (default: system temp dir)")
+
+def _analytics_args(ap):
+    _common(ap)
+    ap.add_argument("inputs", nargs="*",
+                    help="JSON/JSONL files (default: the consolidated global file, else all country outputs)")
+    ap.add_argument("--top", type=int, default=None, metavar="N", help="N most frequent geomaterials")
+    ap.add_argument("--cooccur", type=int, default=None, metavar="GEOMATERIAL_ID",
+                    help="Geomaterials most often found at the same localities")
+    ap.add_argument("--similar", type=int, default=None, metavar="LOCALITY_ID",
+                    help="Localities with the most similar geomaterial sets")
+    ap.add_argument("--elements-by-country", action="store_true", help="Element frequency per country")
+    ap.add_argument("-k", type=int, default=10, help="Rows per answer")
+    ap.add_argument("--no-cache", action="store_true", help="Do not read/write <save.dir>/analytics/")
+
+# name -> (handler "module:function", help, argument builder)
+COMMANDS = {
+    "download": ("cli.download:main", "Search localities for a country and enrich/save them", _download_args),
+    "retry": ("cli.retry:main", "Retry dead-lettered detail/minerals calls and patch outputs in place", _retry_args),
+    "consolidate": ("cli.consolidate:main", "Merge country outputs into one global file, newest record per id",
+                    _consolidate_args),
+    "analytics": ("cli.analytics:main", "Sparse co-occurrence, frequency and similarity queries (numpy/scipy)",
+                  _analytics_args),
+    "index": ("cli.index:main", "Build/repair a JSONL id → offset index and look records up", _index_args),
+    "queue": ("cli.crawl:main", "Distributed crawl: seed a lease-based work queue, run workers, export", _queue_args),
+    "clean": ("cli.pipe:clean", "Pipeline stage: flatten and prune records (JSONL stdin → stdout)", _clean_args),
+    "merge": ("cli.pipe:merge", "Pipeline stage: attach geomaterial details (JSONL stdin → stdout)", _pipe_args),
+    "build": ("cli.build:main", "Incremental clean → merge → geojson → per-mineral layers (changed records only)",
+              _build_args),
+    "geojson": ("cli.pipe:geojson", "Pipeline stage: map features (JSONL stdin → GeoJSONSeq stdout)", _geojson_args),
+}
+DEFAULT_COMMAND = "download"
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser("mindat")
+    sub = ap.add_subparsers(dest="command", metavar="command")
+    for name, (handler, help_, add_args) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_)
+        add_args(p)
+        p.set_defaults(handler=handler)
+    return ap
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv.insert(0, DEFAULT_COMMAND)
+    args = build_parser().parse_args(argv)
+    module, func = args.handler.split(":")
+    return getattr(importlib.import_module(module), func)(args)
 
 if __name__ == "__main__":
-    main()
+    # `python cli/main.py` from a checkout: import from the project root, not from cli/
+    from pathlib import Path
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+    sys.exit(main())
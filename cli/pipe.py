@@ -0,0 +1,56 @@
+# Package: cli
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+from mindat.config import load_config
+from mindat.utils.profiling import profiled, profile_stem
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"  # the checkout's scripts/ (pip install -e .)
+
+def load_script(name: str):
+    """Import scripts/<name>.py as the top-level module <name> (as export_mbtiles.py does), so
+    process-pool workers, forked or spawned, can unpickle its functions by name."""
+    if str(SCRIPTS) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS))
+    return importlib.import_module(name)
+
+def stdout_closed():
+    """The reader of our stdout exited early (`| head`): point stdout at devnull so the exit-time flush stays silent."""
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def _stage(args, name: str, fn) -> int:
+    """Run one pipeline stage; a downstream that exits early (`| head`) ends it quietly."""
+    cfg = load_config(args.config)
+    try:
+        with profiled(profile_stem(cfg.save.dir, name), enabled=args.profile):
+            ok = fn()
+        sys.stdout.flush()
+    except BrokenPipeError:
+        stdout_closed()
+        return 1
+    return 0 if ok else 1
+
+def clean(args):
+    """`mindat clean` — flatten/prune records: JSONL stdin → JSONL stdout (or --in/--out files)."""
+    mod = load_script("clean_mindat_json")
+
+    def run():
+        n = mod.write_jsonl(mod.iter_clean(mod.open_records(args.inp), args.prefer == "nested"), args.out)
+        print(f"Cleaned {n} records", file=sys.stderr)
+        return True
+    return _stage(args, "clean", run)
+
+def merge(args):
+    """`mindat merge` — attach geomaterial details: JSONL stdin → JSONL stdout (no prompts)."""
+    mod = load_script("merging_geomaterils_iran_mines")
+    return _stage(args, "merge", lambda: mod.run(args.inp, args.geomaterials, args.out))
+
+def geojson(args):
+    """`mindat geojson` — map features: JSONL stdin → GeoJSONSeq stdout, or a .geojson/.fgb file."""
+    mod = load_script("to_leaflet_geojson")
+    return _stage(args, "geojson", lambda: mod.run(args.inp, args.geomaterials, args.out,
+                                                   compact=args.compact, workers=args.workers,
+                                                   precision=args.precision))
@@ -4,13 +4,13 @@ from dataclasses import dataclass
 class PromptResult:
     country: str
     ltype: str
-    page_size: int
+    page_size: int | None  # None: not given (config default, auto-tuned if enabled)
 
 class Questioner:
     """Interface for asking user inputs — replaceable by GUI/TUI later."""
     def ask(self) -> PromptResult:
         country = input("Country [Iran]: ").strip() or "Iran"
         ltype = input("Locality type [Mine]: ").strip() or "Mine"
-        ps = input("Page size [100]: ").strip()
-        page_size = int(ps) if ps.isdigit() else 100
+        ps = input("Page size [auto]: ").strip()
+        page_size = int(ps) if ps.isdigit() else None
         return PromptResult(country, ltype, page_size)
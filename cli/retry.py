@@ -0,0 +1,50 @@
+# Package: cli
+
+from pathlib import Path
+
+from mindat.config import load_config
+from mindat.utils.logging import setup_logger, write_run_summary, run_log_path
+from mindat.utils.profiling import profiled
+from mindat.metrics import HttpMetrics
+from mindat.services.download_service import DownloadService
+from mindat.utils.seen import SeenSet
+from cli.common import build_client, build_dlq, build_sinks
+
+def main(args):
+    """`mindat retry` — deferred pass over the dead-letter queue."""
+    cfg = load_config(args.config)
+    log = setup_logger(out_dir=cfg.save.dir)
+    dlq = build_dlq(cfg)
+    if dlq is None:
+        raise SystemExit("retry: save.dlq_file is not configured")
+    try:
+        with profiled(run_log_path(log).with_suffix(""), enabled=args.profile):
+            run(args, cfg, log, dlq)
+    finally:
+        dlq.close()
+
+def run(args, cfg, log, dlq):
+    if args.status:
+        for dl in dlq.items(args.out):
+            log.info(f"{dl['kind']:<9} {dl['loc_id']:>9}  attempts={dl['attempts']}  {dl['out_file']}  {dl['error']}")
+        log.info(f"Dead letters: {dlq.counts()}")
+        return
+    metrics = HttpMetrics()
+    client = build_client(cfg, metrics)
+    seen = SeenSet(Path(cfg.save.dir) / cfg.save.seen_file) if cfg.save.seen_file else None
+    svc = DownloadService(client, None, Path(cfg.save.dir), save_format=cfg.save.format, dlq=dlq, seen=seen)
+    fixed = failing = 0
+    try:
+        # one output at a time, with the sinks a download of it feeds (patched records are upserted)
+        for out in sorted({dl["out_file"] for dl in dlq.items(args.out)}):
+            svc.sinks = build_sinks(cfg, cfg.save.sinks, Path(out).stem, Path(out))
+            try:
+                f, n = svc.retry_dead_letters(out, max_attempts=args.max_attempts)
+            finally:
+                svc.close_sinks()
+            fixed += f; failing += n
+    finally:
+        if seen is not None:
+            seen.close()
+    write_run_summary(log, "metrics", metrics.snapshot())
+    log.info(f"Retried dead letters: {fixed} fixed and patched in place, {failing} still failing")
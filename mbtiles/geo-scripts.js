@@ -1,6 +1,7 @@
 let map;
 let layerGroups = {}; // Store all layer groups
 let esriLayers = {}; // Store raw esri layers for data loading
+let minesRefresh = null; // moveend handler of the cluster layer (replaced, not stacked, on retry)
 
 // ArcGIS Feature Server URLs (without /query for esri-leaflet)
 const FEATURE_SERVER_BASE = 'https://services.arcgis.com/v01gqwM5QqNysAAi/ArcGIS/rest/services/Iran_Geology/FeatureServer';
@@ -9,6 +10,11 @@ const PROVINCES_URL = `${FEATURE_SERVER_BASE}/1`;
 const GEOLOGY_URL = `${FEATURE_SERVER_BASE}/2`;
 const EARTHQUAKE_URL = 'https://sampleserver6.arcgisonline.com/arcgis/rest/services/Earthquakes_Since1970/MapServer/0';
 
+// Mines vector tiles served by `python scripts/export_mbtiles.py serve` (null = use GeoJSON/cluster tiles)
+const MINES_TILES_URL = null; // e.g. 'http://localhost:8081/{z}/{x}/{y}.pbf'
+// Newline-delimited GeoJSON (to_leaflet_geojson.py *.geojsonl output), rendered as it downloads
+const MINES_SEQ_URL = null; // e.g. 'iran_mines.geojsonl'
+
 // Iran boundaries for filtering earthquakes
 const iranBounds = {
     north: 39.5,
@@ -77,8 +83,8 @@ function initMap() {
     // Load all layers
     loadAllLayers();
 
-    // Load local mines GeoJSON overlay
-    loadMinesLayer();
+    // Load local mines overlay (vector tiles or precomputed cluster tiles when available)
+    loadMines();
 }
 
 // Create info panel
@@ -554,6 +560,50 @@ function addFeatureEvents(feature, layer, layerType) {
     });
 }
 
+// Expand dictionary-encoded properties written by to_leaflet_geojson.py compact mode
+function decodeCompactMines(data) {
+    const dicts = data.metadata.dictionaries || {};
+    data.features.forEach(feature => {
+        const props = feature.properties;
+        Object.keys(dicts).forEach(field => {
+            const value = props[field];
+            if (Array.isArray(value)) {
+                props[field] = value.map(i => dicts[field][i]);
+            } else if (value !== null && value !== undefined) {
+                props[field] = dicts[field][value];
+            }
+        });
+    });
+    return data;
+}
+
+// Client-side popup template (compact GeoJSON ships no HTML)
+function minePopupContent(props, coordinates) {
+    const [lng, lat] = coordinates || [props.longitude, props.latitude];
+    let html = `<div style='max-width: 300px;'><h3 style='margin: 0 0 10px 0; color: #2c3e50;'>${props.name}</h3>`;
+    if (props.country) html += `<p style='margin: 0 0 8px 0; color: #7f8c8d;'><strong>📍 ${props.country}</strong></p>`;
+    if (lat !== undefined && lng !== undefined) {
+        html += `<p style='margin: 0 0 8px 0; color: #7f8c8d; font-size: 12px;'>Lat: ${lat.toFixed(4)}, Lng: ${lng.toFixed(4)}</p>`;
+    }
+    if (props.importance_score > 0) {
+        const level = (props.importance_level || '').replace('_', ' ');
+        html += `<p style='margin: 0 0 8px 0;'><strong>⭐ Importance:</strong> ${level} (${props.importance_score} pts)</p>`;
+    }
+    const elements = props.elements || [];
+    if (elements.length) {
+        html += `<p style='margin: 0 0 8px 0;'><strong>🧪 Elements:</strong> ${elements.slice(0, 8).join(', ')}${elements.length > 8 ? ' …' : ''}</p>`;
+    }
+    const minerals = props.geomaterial_names || [];
+    if (minerals.length) {
+        html += `<p style='margin: 0 0 5px 0;'><strong>💎 Minerals (${minerals.length}):</strong> ${minerals.slice(0, 10).join(', ')}${minerals.length > 10 ? ' …' : ''}</p>`;
+    }
+    if (props.description) {
+        const desc = props.description.length > 200 ? props.description.slice(0, 200) + '...' : props.description;
+        html += `<p style='margin: 8px 0 0 0; font-size: 11px; color: #2c3e50; border-top: 1px solid #ecf0f1; padding-top: 8px;'>${desc}</p>`;
+    }
+    return html + '</div>';
+}
+
 // Load mines GeoJSON overlay
 function loadMinesLayer() {
     fetch('iran_mines.geojson')
@@ -562,7 +612,16 @@ function loadMinesLayer() {
             return res.json();
         })
         .then(data => {
+            if (data.metadata && data.metadata.compact) decodeCompactMines(data);
             layerGroups.mines = L.geoJSON(data, {
+                onEachFeature: function(feature, layer) {
+                    const props = feature.properties || {};
+                    if (props.popupContent) {
+                        layer.bindPopup(props.popupContent);
+                    } else if (props.name) {
+                        layer.bindPopup(() => minePopupContent(props, feature.geometry.coordinates));
+                    }
+                },
                 style: function(feature) {
                     const geomType = feature.geometry && feature.geometry.type;
                     if (geomType === 'Polygon' || geomType === 'MultiPolygon') {
@@ -605,6 +664,202 @@ function loadMinesLayer() {
         });
 }
 
+// Pick the cheapest mines source that is configured
+function loadMines() {
+    if (MINES_TILES_URL && L.vectorGrid) {
+        loadMinesVectorTiles(MINES_TILES_URL);
+    } else if (MINES_SEQ_URL) {
+        loadMinesSeq(MINES_SEQ_URL);
+    } else {
+        loadMinesClusterLayer();
+    }
+}
+
+// Load mines as MBTiles vector tiles; thinning per zoom is done by the exporter
+function loadMinesVectorTiles(url) {
+    const levelRadius = { very_high: 7, high: 6, medium: 5, low: 4 };
+    layerGroups.mines = L.vectorGrid.protobuf(url, {
+        interactive: true,
+        getFeatureId: f => f.properties.id,
+        vectorTileLayerStyles: {
+            mines: function(properties) {
+                return {
+                    radius: levelRadius[properties.importance_level] || 4,
+                    fill: true,
+                    fillColor: '#e85d04',
+                    color: '#000000',
+                    weight: 1,
+                    opacity: 1,
+                    fillOpacity: 0.8
+                };
+            }
+        }
+    });
+    layerGroups.mines.on('click', function(e) {
+        const p = e.layer.properties;
+        let html = `<strong>${p.name}</strong>`;
+        if (p.importance_level) html += `<br>Importance: ${p.importance_level} (${p.importance_score})`;
+        if (p.elements) html += `<br>Elements: ${p.elements}`;
+        if (p.geomaterial_names) html += `<br>Minerals: ${p.geomaterial_names}`;
+        L.popup().setLatLng(e.latlng).setContent(html).openOn(map);
+    });
+
+    const minesToggle = document.getElementById('toggle-mines');
+    if (!minesToggle || minesToggle.checked) {
+        layerGroups.mines.addTo(map);
+    }
+}
+
+// Stream a GeoJSONSeq file and add each feature as soon as its line arrives
+function loadMinesSeq(url) {
+    layerGroups.mines = L.geoJSON(null, {
+        onEachFeature: function(feature, layer) {
+            const props = feature.properties || {};
+            layer.bindPopup(() => props.popupContent || minePopupContent(props, feature.geometry.coordinates));
+        },
+        pointToLayer: function(feature, latlng) {
+            return L.circleMarker(latlng, feature.properties.markerStyle || {
+                radius: 4,
+                fillColor: '#e85d04',
+                color: '#000000',
+                weight: 1,
+                opacity: 1,
+                fillOpacity: 0.8
+            });
+        }
+    });
+    const minesToggle = document.getElementById('toggle-mines');
+    if (!minesToggle || minesToggle.checked) {
+        layerGroups.mines.addTo(map);
+    }
+
+    fetch(url)
+        .then(res => {
+            if (!res.ok || !res.body) throw new Error('Failed to fetch ' + url);
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            function pump() {
+                return reader.read().then(({ done, value }) => {
+                    buffered += done ? decoder.decode() : decoder.decode(value, { stream: true });
+                    const lines = buffered.split('\n');
+                    buffered = done ? '' : lines.pop();
+                    lines.forEach(line => {
+                        line = line.replace(/^\x1e/, '').trim();
+                        if (line) layerGroups.mines.addData(JSON.parse(line));
+                    });
+                    if (!done) return pump();
+                });
+            }
+            return pump();
+        })
+        .catch(err => {
+            console.error('Failed to stream mines:', err);
+            loadMinesClusterLayer();
+        });
+}
+
+// Load mines from the precomputed cluster index (scripts/build_cluster_index.py).
+// Only tiles intersecting the viewport are fetched; falls back to the raw GeoJSON.
+function loadMinesClusterLayer() {
+    fetch('clusters/index.json')
+        .then(res => {
+            if (!res.ok) throw new Error('No cluster index');
+            return res.json();
+        })
+        .then(index => {
+            const available = {};
+            Object.keys(index.tiles).forEach(z => {
+                available[z] = new Set(index.tiles[z].map(t => t[0] + '/' + t[1]));
+            });
+            const tileCache = {};
+            layerGroups.mines = L.layerGroup();
+
+            function tileRange(z) {
+                const n = Math.pow(2, z);
+                const b = map.getBounds();
+                const tx = lng => Math.min(n - 1, Math.max(0, Math.floor((lng + 180) / 360 * n)));
+                const ty = lat => {
+                    const s = Math.sin(lat * Math.PI / 180);
+                    const y = 0.5 - 0.25 * Math.log((1 + s) / (1 - s)) / Math.PI;
+                    return Math.min(n - 1, Math.max(0, Math.floor(y * n)));
+                };
+                return { x0: tx(b.getWest()), x1: tx(b.getEast()), y0: ty(b.getNorth()), y1: ty(b.getSouth()) };
+            }
+
+            function fetchTile(z, x, y) {
+                const key = z + '/' + x + '/' + y;
+                if (!tileCache[key]) {
+                    tileCache[key] = fetch('clusters/' + key + '.json')
+                        .then(res => res.ok ? res.json() : { features: [] })
+                        .then(tile => tile.metadata && tile.metadata.compact ? decodeCompactMines(tile) : tile)
+                        .catch(() => ({ features: [] }));
+                }
+                return tileCache[key];
+            }
+
+            function toLayer(feature) {
+                const [lng, lat] = feature.geometry.coordinates;
+                const props = feature.properties;
+                if (props.cluster) {
+                    const size = props.point_count < 100 ? 30 : (props.point_count < 1000 ? 40 : 50);
+                    const marker = L.marker([lat, lng], {
+                        icon: L.divIcon({
+                            html: `<div style="background:#e85d04;color:white;border-radius:50%;width:${size}px;height:${size}px;display:flex;align-items:center;justify-content:center;font-weight:bold;">${props.point_count_abbreviated}</div>`,
+                            className: 'custom-cluster-icon',
+                            iconSize: [size, size]
+                        })
+                    });
+                    marker.on('click', () => map.setView([lat, lng], props.expansion_zoom));
+                    return marker;
+                }
+                const marker = L.circleMarker([lat, lng], props.markerStyle || {
+                    radius: 4,
+                    fillColor: '#e85d04',
+                    color: '#000000',
+                    weight: 1,
+                    opacity: 1,
+                    fillOpacity: 0.8
+                });
+                marker.bindPopup(() => props.popupContent || minePopupContent(props, feature.geometry.coordinates));
+                return marker;
+            }
+
+            function refresh() {
+                // beyond maxZoom there are no tiles: overzoom the maxZoom ones and open their clusters
+                const overzoom = map.getZoom() > index.maxZoom;
+                const z = Math.min(index.maxZoom, Math.max(index.minZoom, map.getZoom()));
+                const r = tileRange(z);
+                const requests = [];
+                for (let x = r.x0; x <= r.x1; x++) {
+                    for (let y = r.y0; y <= r.y1; y++) {
+                        if (available[z] && available[z].has(x + '/' + y)) requests.push(fetchTile(z, x, y));
+                    }
+                }
+                Promise.all(requests).then(tiles => {
+                    layerGroups.mines.clearLayers();
+                    tiles.forEach(tile => tile.features.forEach(f => {
+                        const parts = overzoom && f.properties.leaves ? f.properties.leaves : [f];
+                        parts.forEach(p => layerGroups.mines.addLayer(toLayer(p)));
+                    }));
+                });
+            }
+
+            if (minesRefresh) map.off('moveend', minesRefresh);
+            minesRefresh = refresh;
+            map.on('moveend', minesRefresh);
+            refresh();
+
+            const minesToggle = document.getElementById('toggle-mines');
+            if (!minesToggle || minesToggle.checked) {
+                layerGroups.mines.addTo(map);
+            }
+        })
+        .catch(() => {
+            loadMinesLayer();
+        });
+}
+
 // Show loading indicator
 function showLoading(show) {
     const loadingEl = document.getElementById('loading');
@@ -646,6 +901,12 @@ function retryLoading() {
         }
     });
     
+    // Drop the cluster layer's viewport handler; loadMines() registers a new one
+    if (minesRefresh) {
+        map.off('moveend', minesRefresh);
+        minesRefresh = null;
+    }
+    
     // Reset layer variables
     layerGroups = {};
     esriLayers = {};
@@ -658,7 +919,7 @@ function retryLoading() {
     
     // Reload all layers
     loadAllLayers();
-    loadMinesLayer();
+    loadMines();
 }
 
 // Download GeoJSON data
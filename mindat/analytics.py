@@ -0,0 +1,220 @@
+"""
+Sparse analytics over downloaded/merged locality data (optional: numpy + scipy,
+`pip install mindat[analytics]`).
+
+IncidenceMatrix holds two CSR matrices built in one pass over the records:
+  M  localities × geomaterials (1 = the geomaterial is reported at the locality)
+  E  localities × elements     (1 = the element is listed for the locality)
+plus the row/column labels and each locality's country. Queries are sparse products:
+co-occurrence is MᵀM (its diagonal is each geomaterial's frequency), element frequency
+per country is Cᵀ E with C the locality × country one-hot, and "similar localities" is
+a cosine row product on the L2-normalised M. Matrices are cached with save_npz under a
+key of the source files' path/size/mtime, so a rerun over unchanged inputs only loads.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable
+from .utils.io import iter_records
+
+def _np():
+    try:
+        import numpy as np
+        import scipy.sparse as sp
+    except ImportError as e:  # optional dependency: keep the rest of the package importable
+        raise ImportError("mindat.analytics needs numpy and scipy (pip install 'mindat[analytics]')") from e
+    return np, sp
+
+def _geomaterial_ids(rec) -> list[int]:
+    """Geomaterial ids from any of this repo's record shapes (merged, clean/flat, raw enriched)."""
+    for key in ("geomaterial_ids", "geomaterials", "detail.geomaterials"):
+        v = rec.get(key)
+        if isinstance(v, list) and v:
+            break
+    else:
+        detail = rec.get("detail")
+        v = detail.get("geomaterials") if hasattr(detail, "get") else None
+        if not v:
+            v = [m.get("geomaterial") for m in rec.get("locality_minerals") or ()]
+    ids = []
+    for g in v or ():
+        g = g.get("id") if hasattr(g, "get") else g
+        if isinstance(g, int):
+            ids.append(g)
+    return ids
+
+def _elements(rec) -> list[str]:
+    s = rec.get("elements") or rec.get("detail.elements") or ""
+    return [e for e in s.strip("-").split("-") if e] if isinstance(s, str) else []
+
+def cache_key(sources: Iterable[str | Path]) -> str:
+    h = hashlib.sha1()
+    for p in sources:
+        p = Path(p).resolve(); st = p.stat()
+        h.update(f"{p}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:16]
+
+class IncidenceMatrix:
+    def __init__(self, M, E, loc_ids, gm_ids, elements, countries, row_country, names=None):
+        self.M, self.E = M, E
+        self.loc_ids, self.gm_ids = loc_ids, gm_ids
+        self.elements, self.countries, self.row_country = elements, countries, row_country
+        self.names: dict[int, str] = names or {}
+        self._row = {int(i): r for r, i in enumerate(loc_ids)}
+        self._col = {int(i): c for c, i in enumerate(gm_ids)}
+        self._cooc = None
+        self._unit = None
+        self.cache_dir: Path | None = None
+
+    @classmethod
+    def build(cls, records: Iterable) -> "IncidenceMatrix":
+        """One pass over the records; a locality id seen twice keeps its last record's row."""
+        np, sp = _np()
+        row_of: dict[int, int] = {}
+        row_country: list[str] = []         # per row, replaced when an id repeats
+        row_gms: list[list[int]] = []
+        row_els: list[list[str]] = []
+        names: dict[int, str] = {}
+        for rec in records:
+            loc_id = rec.get("id")
+            if not isinstance(loc_id, int):
+                continue
+            r = row_of.setdefault(loc_id, len(row_of))
+            c = rec.get("country") or ""
+            gms, els = list(_geomaterial_ids(rec)), list(_elements(rec))
+            if r == len(row_country):
+                row_country.append(c); row_gms.append(gms); row_els.append(els)
+            else:
+                row_country[r], row_gms[r], row_els[r] = c, gms, els
+            for g in rec.get("geomaterials_details") or ():
+                if g.get("name"):
+                    names[g["id"]] = g["name"]
+        # labels and entries only from each id's last record, so an edited locality drops what it lost
+        rows, cols, erows, ecols = [], [], [], []
+        col_of: dict[int, int] = {}
+        el_of: dict[str, int] = {}
+        country_of: dict[str, int] = {}
+        row_country = [country_of.setdefault(c, len(country_of)) for c in row_country]
+        for r, (gms, els) in enumerate(zip(row_gms, row_els)):
+            for g in gms:
+                rows.append(r); cols.append(col_of.setdefault(g, len(col_of)))
+            for e in els:
+                erows.append(r); ecols.append(el_of.setdefault(e, len(el_of)))
+        shape = (len(row_of), len(col_of))
+
+        def incidence(r, c, n_cols):
+            m = sp.csr_matrix((np.ones(len(r), dtype=np.float32), (np.asarray(r, dtype=np.int32),
+                              np.asarray(c, dtype=np.int32))), shape=(shape[0], n_cols))
+            m.sum_duplicates(); m.data[:] = 1.0  # presence, not counts
+            return m
+
+        return cls(incidence(rows, cols, shape[1]), incidence(erows, ecols, len(el_of)),
+                   np.fromiter(row_of, dtype=np.int64, count=len(row_of)),
+                   np.fromiter(col_of, dtype=np.int64, count=len(col_of)),
+                   list(el_of), list(country_of), np.asarray(row_country, dtype=np.int32), names)
+
+    # -- caching ---------------------------------------------------------------------
+    @classmethod
+    def open(cls, sources: list[str | Path], cache_dir: str | Path | None = None) -> "IncidenceMatrix":
+        """Load from cache_dir/<key>/ when the sources are unchanged, else build and cache."""
+        if cache_dir is None:
+            return cls.build(r for p in sources for r in iter_records(Path(p)))
+        folder = Path(cache_dir) / cache_key(sources)
+        if (folder / "labels.json").exists():
+            return cls.load(folder)
+        im = cls.build(r for p in sources for r in iter_records(Path(p)))
+        im.save(folder)
+        return im
+
+    def save(self, folder: str | Path):
+        np, sp = _np()
+        folder = Path(folder); folder.mkdir(parents=True, exist_ok=True)
+        sp.save_npz(folder / "geomaterials.npz", self.M)
+        sp.save_npz(folder / "elements.npz", self.E)
+        np.savez(folder / "ids.npz", loc_ids=self.loc_ids, gm_ids=self.gm_ids, row_country=self.row_country)
+        # labels last: its presence marks a complete cache entry
+        (folder / "labels.json").write_text(json.dumps(
+            {"elements": self.elements, "countries": self.countries,
+             "names": {str(k): v for k, v in self.names.items()}}, ensure_ascii=False), encoding="utf-8")
+        self.cache_dir = folder
+
+    @classmethod
+    def load(cls, folder: str | Path) -> "IncidenceMatrix":
+        np, sp = _np()
+        folder = Path(folder)
+        labels = json.loads((folder / "labels.json").read_text(encoding="utf-8"))
+        ids = np.load(folder / "ids.npz")
+        im = cls(sp.load_npz(folder / "geomaterials.npz").tocsr(), sp.load_npz(folder / "elements.npz").tocsr(),
+                 ids["loc_ids"], ids["gm_ids"], labels["elements"], labels["countries"], ids["row_country"],
+                 {int(k): v for k, v in labels["names"].items()})
+        im.cache_dir = folder
+        return im
+
+    # -- queries ---------------------------------------------------------------------
+    def cooccurrence(self):
+        """Geomaterial × geomaterial counts of shared localities (MᵀM, CSR); cached."""
+        if self._cooc is None:
+            np, sp = _np()
+            path = self.cache_dir / "cooccurrence.npz" if self.cache_dir else None
+            if path and path.exists():
+                self._cooc = sp.load_npz(path).tocsr()
+            else:
+                self._cooc = (self.M.T @ self.M).tocsr()
+                if path:
+                    sp.save_npz(path, self._cooc)
+        return self._cooc
+
+    def mineral_frequency(self, top: int | None = None) -> list[tuple[int, int]]:
+        """(geomaterial id, number of localities), most frequent first."""
+        np, _ = _np()
+        freq = np.asarray(self.M.sum(axis=0)).ravel()
+        order = np.argsort(-freq, kind="stable")[:top]
+        return [(int(self.gm_ids[c]), int(freq[c])) for c in order]
+
+    def top_cooccurring(self, gm_id: int, k: int = 10) -> list[tuple[int, int]]:
+        """Geomaterials found most often at the same localities as gm_id: (id, shared localities)."""
+        np, _ = _np()
+        c = self._col.get(gm_id)
+        if c is None:
+            return []
+        row = self.cooccurrence().getrow(c)
+        mask = row.indices != c
+        idx, val = row.indices[mask], row.data[mask]
+        order = np.argsort(-val, kind="stable")[:k]
+        return [(int(self.gm_ids[idx[i]]), int(val[i])) for i in order]
+
+    def element_frequency_by_country(self) -> dict[str, dict[str, int]]:
+        """country → {element: number of localities listing it}, from one (C ᵀ E) product."""
+        np, sp = _np()
+        n = len(self.row_country)
+        C = sp.csr_matrix((np.ones(n, dtype=np.float32), (np.arange(n), self.row_country)),
+                          shape=(n, len(self.countries)))
+        F = (C.T @ self.E).tocsr()
+        out = {}
+        for ci, country in enumerate(self.countries):
+            row = F.getrow(ci)
+            order = np.argsort(-row.data, kind="stable")
+            out[country] = {self.elements[row.indices[i]]: int(row.data[i]) for i in order}
+        return out
+
+    def similar_localities(self, loc_id: int, k: int = 10) -> list[tuple[int, float]]:
+        """Localities with the most similar geomaterial sets (cosine), best first."""
+        np, sp = _np()
+        r = self._row.get(loc_id)
+        if r is None:
+            return []
+        if self._unit is None:
+            norms = np.sqrt(np.asarray(self.M.multiply(self.M).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            self._unit = sp.diags(1.0 / norms) @ self.M
+        sims = np.asarray((self._unit @ self._unit.getrow(r).T).todense()).ravel()
+        sims[r] = -1.0
+        k = min(k, len(sims) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(int(self.loc_ids[i]), round(float(sims[i]), 4)) for i in top if sims[i] > 0]
+
+    def name(self, gm_id: int) -> str:
+        return self.names.get(gm_id, str(gm_id))
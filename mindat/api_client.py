@@ -1,6 +1,9 @@
-from typing import Iterator
+import time
+from typing import Callable, Iterator
 from .endpoints import MindatEndpoints
 from .http import HttpSession
+from .models import Locality, LocalityMineral
+from .page_tuner import PageSizeTuner
 
 def _extract_page(data: dict) -> tuple[list[dict], int | None, str | None]:
     if isinstance(data, list):
@@ -12,41 +15,58 @@ def _extract_page(data: dict) -> tuple[list[dict], int | None, str | None]:
     return [], None, None
 
 class MindatClient:
-    """Thin, testable wrapper over Mindat endpoints (no CLI/UI here)."""
-    def __init__(self, http: HttpSession, ep: MindatEndpoints, page_size: int):
+    """
+    Thin, testable wrapper over Mindat endpoints (no CLI/UI here).
+    Responses are decoded into slotted records (mindat.models), which also read like dicts.
+    """
+    def __init__(self, http: HttpSession, ep: MindatEndpoints, page_size: int,
+                 tuner: PageSizeTuner | None = None):
         self.http, self.ep, self.page_size = http, ep, page_size
+        self.tuner = tuner  # when set, page sizes are auto-tuned per endpoint instead of page_size
 
-    def search_localities(self, base_params: dict) -> Iterator[dict]:
-        """Yield all localities by following 'next'; trust results more than count."""
+    def _page_size(self, endpoint: str) -> int:
+        return self.tuner.size_for(endpoint) if self.tuner else self.page_size
+
+    def _get_page(self, endpoint: str, size: int, url: str, params: dict | None = None):
+        t0 = time.perf_counter()
+        page = self.http.get_json(url, params)
+        results, count, next_url = _extract_page(page)
+        if self.tuner:
+            self.tuner.observe(endpoint, size, len(results), time.perf_counter() - t0, bool(next_url))
+        return results, count, next_url
+
+    def search_localities(self, base_params: dict,
+                          on_count: Callable[[int | None], None] | None = None) -> Iterator[Locality]:
+        """Yield all localities by following 'next'; trust results more than count.
+        on_count receives the listing's reported total (if any) once the first page arrives."""
         url = self.ep.url_localities()
         params = dict(base_params)
-        params["page_size"] = self.page_size
-        page = self.http.get_json(url, params)
-        results, _, next_url = _extract_page(page)
+        params["page_size"] = size = self._page_size("localities")
+        results, count, next_url = self._get_page("localities", size, url, params)
+        if on_count and results:
+            on_count(count)
         for item in results:
-            yield item
+            yield Locality.from_dict(item)
         while next_url:
-            page = self.http.get_json(next_url)
-            results, _, next_url = _extract_page(page)
+            results, _, next_url = self._get_page("localities", size, next_url)
             for item in results:
-                yield item
+                yield Locality.from_dict(item)
 
-    def get_locality_detail(self, loc_id: int, expand_geomaterials: bool = True) -> dict:
+    def get_locality_detail(self, loc_id: int, expand_geomaterials: bool = True) -> Locality:
         url = self.ep.url_locality_detail(loc_id)
         params = {"format": "json"}
         if expand_geomaterials:
             params["expand"] = "geomaterials"
-        return self.http.get_json(url, params)
+        return Locality.from_dict(self.http.get_json(url, params))
 
-    def list_locality_minerals(self, loc_id: int, page_size: int | None = None) -> list[dict]:
+    def list_locality_minerals(self, loc_id: int, page_size: int | None = None) -> list[LocalityMineral]:
         url = self.ep.url_locality_minerals()
-        params = {"format": "json", "locality": loc_id, "page_size": page_size or self.page_size}
-        out: list[dict] = []
-        page = self.http.get_json(url, params)
-        results, _, next_url = _extract_page(page)
-        out.extend(results)
+        size = page_size or self._page_size("localityminerals")
+        params = {"format": "json", "locality": loc_id, "page_size": size}
+        out: list[LocalityMineral] = []
+        results, _, next_url = self._get_page("localityminerals", size, url, params)
+        out.extend(map(LocalityMineral.from_dict, results))
         while next_url:
-            page = self.http.get_json(next_url)
-            results, _, next_url = _extract_page(page)
-            out.extend(results)
+            results, _, next_url = self._get_page("localityminerals", size, next_url)
+            out.extend(map(LocalityMineral.from_dict, results))
         return out
@@ -13,6 +13,14 @@ class Retries:
     backoff_factor: float = 1.2
     status_forcelist: list[int] = field(default_factory=lambda: [429, 500, 502, 503, 504])
 
+@dataclass
+class Hedging:
+    enabled: bool = False
+    percentile: float = 95.0   # duplicate a GET once it runs longer than this rolling percentile
+    max_extra: float = 0.05    # hedged requests may add at most this fraction of extra load
+    min_samples: int = 20      # per endpoint, before any hedging
+    min_delay: float = 0.05    # never hedge sooner than this (seconds)
+
 @dataclass
 class Endpoints:
     localities: str = "/localities/"
@@ -24,6 +32,12 @@ class SaveCfg:
     dir: str = "mindat_data"
     format: str = "json"
     checkpoint_every: int = 1
+    seen_file: str | None = "seen.sqlite"  # under dir; null disables cross-run dedup
+    hierarchy_file: str = "hierarchy.sqlite"  # under dir; parent cache for --resolve-parents
+    jsonl_index: bool = True  # format=jsonl: keep an <file>.idx sidecar (id → offset, length)
+    dlq_file: str | None = "dead_letters.sqlite"  # under dir; failed detail/minerals calls (null: old behaviour)
+    sinks: list[str] = field(default_factory=list)  # extra outputs of a download: "KIND[=PATH]" (see --sink)
+    sink_threads: bool = True  # each extra sink writes on its own thread
 
 @dataclass
 class AppConfig:
@@ -31,7 +45,10 @@ class AppConfig:
     api_key_file: str = "api_key.txt"
     timeouts: Timeouts = field(default_factory=Timeouts)
     retries: Retries = field(default_factory=Retries)
+    hedging: Hedging = field(default_factory=Hedging)
     page_size: int = 100
+    http_cache_size: int = 256  # in-run LRU of identical GET responses (0 = off)
+    adaptive_page_size: bool = True  # tune page_size per endpoint (start: page_size), kept in save.dir/page_sizes.json
     endpoints: Endpoints = field(default_factory=Endpoints)
     search_strategies: list[dict] = field(default_factory=list)
     save: SaveCfg = field(default_factory=SaveCfg)
@@ -43,7 +60,7 @@ def load_config(path: str | Path) -> AppConfig:
         # shallow merge for simplicity
         for k, v in raw.items():
             if hasattr(cfg, k):
-                if isinstance(getattr(cfg, k), (Timeouts, Retries, Endpoints, SaveCfg)):
+                if isinstance(getattr(cfg, k), (Timeouts, Retries, Hedging, Endpoints, SaveCfg)):
                     nested = getattr(cfg, k)
                     for nk, nv in v.items():
                         setattr(nested, nk, nv)
@@ -1,11 +1,53 @@
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from .errors import MindatAuthError, MindatHTTPError, MindatJSONError
+from .metrics import HttpMetrics, endpoint_label
+
+class _LatencyWindow:
+    """Last `size` successful latencies of one endpoint; the percentile is refreshed every few samples."""
+    def __init__(self, percentile: float, size: int = 200, refresh: int = 16):
+        self.samples: deque = deque(maxlen=size)
+        self.percentile, self.refresh = percentile, refresh
+        self.threshold: float | None = None
+        self._since = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self._since += 1
+        if self._since >= self.refresh or self.threshold is None:
+            vals = sorted(self.samples)
+            self.threshold = vals[min(len(vals) - 1, int(len(vals) * self.percentile / 100))]
+            self._since = 0
 
 class HttpSession:
-    def __init__(self, connect_to: str, retries, timeouts, api_key: str):
+    """
+    requests.Session with retries, auth and JSON validation.
+    Identical concurrent GETs (same URL + params) share one network call (single-flight),
+    and successful response bodies are kept in a bounded in-run LRU (cache_size entries,
+    0 disables). Each caller gets its own parsed copy, so results can be mutated freely.
+    With hedging enabled, a GET still running after its endpoint's rolling percentile gets
+    one duplicate and the first answer wins, within a max_extra share of extra requests.
+    """
+    def __init__(self, connect_to: str, retries, timeouts, api_key: str,
+                 metrics: HttpMetrics | None = None, cache_size: int = 256, hedging=None):
         self.base = connect_to
+        self.metrics = metrics or HttpMetrics()
+        self.cache_size = cache_size
+        self.hedging = hedging if hedging is not None and hedging.enabled else None
+        if self.hedging:
+            self._latency = defaultdict(lambda: _LatencyWindow(self.hedging.percentile))
+            self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="mindat-hedge")
+            self._fetches = 0
+            self._hedges = 0
+        self._cache: OrderedDict = OrderedDict()  # key -> (body bytes, url)
+        self._inflight: dict = {}                 # key -> Future of (body bytes, url)
+        self._lock = threading.Lock()
         self.session = requests.Session()
         retry = Retry(
             total=retries.total,
@@ -26,7 +68,88 @@ class HttpSession:
         self.timeout = (timeouts.connect, timeouts.read)
 
     def get_json(self, url: str, params: dict | None = None) -> dict:
-        r = self.session.get(url, params=params or {}, timeout=self.timeout)
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self.metrics.incr("cache_hits")
+            else:
+                fut = self._inflight.get(key)
+                leader = fut is None
+                if leader:
+                    fut = self._inflight[key] = Future()
+                    self.metrics.incr("cache_misses")
+                else:
+                    self.metrics.incr("coalesced")
+        if hit is None:
+            if not leader:
+                hit = fut.result()  # re-raises the leader's error
+            else:
+                try:
+                    hit = self._fetch_hedged(url, params) if self.hedging else self._fetch(url, params)
+                except BaseException as e:
+                    with self._lock:
+                        del self._inflight[key]
+                    fut.set_exception(e)
+                    raise
+                with self._lock:
+                    del self._inflight[key]
+                    if self.cache_size:
+                        self._cache[key] = hit
+                        if len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+                fut.set_result(hit)
+        body, final_url = hit
+        try:
+            return json.loads(body)
+        except Exception as e:
+            raise MindatJSONError(f"JSON parse error: {e} @ {final_url}") from e
+
+    def _fetch_hedged(self, url: str, params: dict | None) -> tuple[bytes, str]:
+        endpoint = endpoint_label(url, self.base)
+        h = self.hedging
+        with self._lock:
+            self._fetches += 1
+            window = self._latency[endpoint]
+            delay = window.threshold if len(window.samples) >= h.min_samples else None
+        primary = self._pool.submit(self._fetch, url, params, window)
+        if delay is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=max(delay, h.min_delay))
+        if done:
+            return primary.result()
+        with self._lock:
+            allowed = self._hedges + 1 <= h.max_extra * self._fetches
+            if allowed:
+                self._hedges += 1
+        if not allowed:
+            self.metrics.incr("hedges_over_budget")
+            return primary.result()
+        self.metrics.incr("hedges")
+        hedge = self._pool.submit(self._fetch, url, params, window)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            ok = [f for f in done if f.exception() is None]
+            if ok:
+                if ok[0] is hedge:
+                    self.metrics.incr("hedge_wins")
+                return ok[0].result()  # the loser keeps running and is discarded
+            if not pending:
+                return done.pop().result()  # both failed: raise
+
+    def _fetch(self, url: str, params: dict | None, window: _LatencyWindow | None = None) -> tuple[bytes, str]:
+        endpoint = endpoint_label(url, self.base)
+        t0 = time.perf_counter()
+        try:
+            r = self.session.get(url, params=params or {}, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.metrics.record(endpoint, type(e).__name__, time.perf_counter() - t0)
+            raise
+        history = getattr(getattr(r.raw, "retries", None), "history", ()) or ()
+        self.metrics.record(endpoint, r.status_code, time.perf_counter() - t0,
+                            nbytes=len(r.content), retries=len(history))
         if r.status_code in (401, 403):
             raise MindatAuthError(f"Unauthorized: {r.status_code} {r.url}")
         if r.status_code != 200:
@@ -34,7 +157,7 @@ class HttpSession:
         ctype = (r.headers.get("Content-Type") or "").lower()
         if "application/json" not in ctype:
             raise MindatJSONError(f"Non-JSON body from {r.url}")
-        try:
-            return r.json()
-        except Exception as e:
-            raise MindatJSONError(f"JSON parse error: {e} @ {r.url}") from e
+        if window is not None:
+            with self._lock:
+                window.add(time.perf_counter() - t0)
+        return r.content, r.url
@@ -0,0 +1,159 @@
+import json
+import re
+import threading
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Prometheus-style latency buckets (seconds)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(url: str, base: str = "") -> str:
+    """'https://api.mindat.org/v1/localities/2011/?x=1' -> '/localities/{id}/'"""
+    path = urlparse(url).path
+    base_path = urlparse(base).path.rstrip("/")
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return _ID_SEGMENT.sub("/{id}", path) or "/"
+
+
+def _percentile(sorted_vals: list[float], q: float) -> float | None:
+    if not sorted_vals:
+        return None
+    k = min(len(sorted_vals) - 1, max(0, round(q / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+class _EndpointStats:
+    def __init__(self, max_samples: int):
+        self.requests = 0
+        self.retries = 0
+        self.backoffs = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.statuses: Counter = Counter()
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples: deque = deque(maxlen=max_samples)
+
+
+class HttpMetrics:
+    """
+    In-process HTTP metrics: per-endpoint request counts, latency histogram and percentiles,
+    urllib3 retry/backoff counts, response bytes and status-code distribution. Thread-safe.
+    """
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointStats] = defaultdict(lambda: _EndpointStats(self.max_samples))
+        self.counters: Counter = Counter()  # session-wide events: cache_hits, cache_misses, coalesced, ...
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, endpoint: str, status: int | str, seconds: float,
+               nbytes: int = 0, retries: int = 0):
+        with self._lock:
+            s = self._endpoints[endpoint]
+            s.requests += 1
+            s.retries += retries
+            # urllib3 sleeps before every retry after the first consecutive one
+            s.backoffs += max(0, retries - 1)
+            s.bytes += nbytes
+            s.latency_sum += seconds
+            s.statuses[str(status)] += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    s.buckets[i] += 1
+                    break
+            else:
+                s.buckets[-1] += 1
+            s.samples.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for ep, s in sorted(self._endpoints.items()):
+                lat = sorted(s.samples)
+                out[ep] = {
+                    "requests": s.requests,
+                    "retries": s.retries,
+                    "backoffs": s.backoffs,
+                    "bytes": s.bytes,
+                    "statuses": dict(s.statuses),
+                    "latency_s": {
+                        "mean": s.latency_sum / s.requests if s.requests else None,
+                        "p50": _percentile(lat, 50),
+                        "p90": _percentile(lat, 90),
+                        "p99": _percentile(lat, 99),
+                        "max": lat[-1] if lat else None,
+                    },
+                    "histogram": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], s.buckets)),
+                }
+            totals = {
+                "requests": sum(v["requests"] for v in out.values()),
+                "retries": sum(v["retries"] for v in out.values()),
+                "bytes": sum(v["bytes"] for v in out.values()),
+            }
+            return {"totals": totals, "counters": dict(self.counters), "endpoints": out}
+
+    def write_json(self, path: Path):
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP mindat_http_requests_total HTTP requests by endpoint and status.",
+            "# TYPE mindat_http_requests_total counter",
+        ]
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for ep, s in items:
+                for status, n in sorted(s.statuses.items()):
+                    lines.append(f'mindat_http_requests_total{{endpoint="{ep}",status="{status}"}} {n}')
+            for name, attr, help_ in (
+                ("mindat_http_retries_total", "retries", "urllib3 retries by endpoint."),
+                ("mindat_http_backoffs_total", "backoffs", "Backoff sleeps by endpoint."),
+                ("mindat_http_response_bytes_total", "bytes", "Response body bytes by endpoint."),
+            ):
+                lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+                for ep, s in items:
+                    lines.append(f'{name}{{endpoint="{ep}"}} {getattr(s, attr)}')
+            lines += ["# HELP mindat_http_request_duration_seconds Request latency including retries.",
+                      "# TYPE mindat_http_request_duration_seconds histogram"]
+            for ep, s in items:
+                cumulative = 0
+                for bound, n in zip(list(LATENCY_BUCKETS) + ["+Inf"], s.buckets):
+                    cumulative += n
+                    lines.append(f'mindat_http_request_duration_seconds_bucket{{endpoint="{ep}",le="{bound}"}} {cumulative}')
+                lines.append(f'mindat_http_request_duration_seconds_sum{{endpoint="{ep}"}} {s.latency_sum}')
+                lines.append(f'mindat_http_request_duration_seconds_count{{endpoint="{ep}"}} {s.requests}')
+            for name, n in sorted(self.counters.items()):
+                lines += [f"# TYPE mindat_http_{name}_total counter", f"mindat_http_{name}_total {n}"]
+        return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(metrics: HttpMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Expose metrics.to_prometheus() at http://host:port/metrics on a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_response(404); self.end_headers()
+                return
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,186 @@
+"""
+Slotted record types for the core Mindat entities.
+
+Known API fields live in __slots__ (no per-record __dict__), anything else the API sends
+goes to `extra`, so decode → encode round-trips every field, in the original key order
+(kept as one shared tuple per distinct layout). Keys of `extra` and short, highly
+repeated string values (country, type labels, ...) are interned, so 100k records share
+one copy of each. Records keep the read side of the dict interface (get, [],
+in, keys/items) plus item assignment, so code written against the raw JSON dicts works
+unchanged; json.dumps(..., default=json_default) encodes them.
+"""
+import sys
+from typing import Any, Iterator
+
+_intern = sys.intern
+_LAYOUTS: dict[tuple, tuple] = {}  # key order → the one shared tuple for it
+
+def _layout(keys: tuple) -> tuple:
+    return _LAYOUTS.setdefault(keys, keys)
+
+class Record:
+    __slots__ = ("extra", "_keys")
+    FIELDS: tuple[str, ...] = ()
+    INTERNED: frozenset = frozenset()   # fields whose string values are interned
+
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        cls._fields = frozenset(cls.FIELDS)
+        cls._setters = {f: getattr(cls, f).__set__ for f in cls.FIELDS}
+        cls._getters = {f: getattr(cls, f).__get__ for f in cls.FIELDS}
+
+    def __init__(self, **fields):
+        self.extra, self._keys = None, ()
+        for k, v in fields.items():
+            self[k] = v
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Record":
+        """Decode one API object (unknown keys kept in extra)."""
+        self = cls.__new__(cls)
+        extra = None
+        setters, interned = cls._setters, cls.INTERNED
+        for k, v in d.items():
+            set_ = setters.get(k)
+            if set_ is None:
+                if extra is None:
+                    extra = {}
+                extra[_intern(k)] = v
+                continue
+            if k in interned and type(v) is str:
+                v = _intern(v)
+            set_(self, cls._decode_field(k, v))
+        self.extra, self._keys = extra, _layout(tuple(d))
+        return self
+
+    @classmethod
+    def _decode_field(cls, name: str, value):
+        return value
+
+    def _present(self) -> Iterator[tuple[str, Any]]:
+        getters, extra = self._getters, self.extra or {}
+        for k in self._keys:
+            get = getters.get(k)
+            if get is None:
+                yield k, extra[k]
+            else:
+                yield k, get(self)
+
+    def to_dict(self) -> dict:
+        """Encode back to plain JSON types (nested records included)."""
+        return {k: plain(v) for k, v in self._present()}
+
+    # -- dict-style access ------------------------------------------------------------
+    def get(self, key: str, default=None):
+        if key in self._fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                return default
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        set_ = self._setters.get(key)
+        if set_ is not None:
+            set_(self, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            key = _intern(key)
+            self.extra[key] = value
+        if key not in self._keys:
+            self._keys = _layout(self._keys + (key,))
+
+    def __setattr__(self, name: str, value):
+        if name in self._setters:
+            self[name] = value  # keeps the key order up to date for encoding
+        else:
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        return self._keys, self.extra, {k: v for k, v in self._present() if k in self._setters}
+
+    def __setstate__(self, state):
+        keys, extra, fields = state
+        object.__setattr__(self, "_keys", keys)
+        object.__setattr__(self, "extra", extra)
+        for k, v in fields.items():
+            self._setters[k](self, v)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> list[str]:
+        return [k for k, _ in self._present()]
+
+    def items(self) -> list[tuple[str, Any]]:
+        return list(self._present())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.get('id')!r})"
+
+_MISSING = object()
+
+def plain(v):
+    """A value with any records in it (directly or in a list) encoded as dicts."""
+    if isinstance(v, Record):
+        return v.to_dict()
+    if type(v) is list:
+        return [plain(x) for x in v]
+    return v
+
+def json_default(obj):
+    """`default=` hook for json.dumps: records encode as their dict form."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class Geomaterial(Record):
+    """A mineral/rock/... entry (geomaterials endpoint, or expanded inside a locality)."""
+    FIELDS = ("id", "longid", "guid", "name", "updttime", "mindat_formula", "ima_formula",
+              "ima_status", "ima_notes", "entrytype", "entrytype_text", "elements", "sigelements",
+              "varietyof", "synid", "groupid", "description_short")
+    INTERNED = frozenset({"entrytype_text", "ima_status", "elements", "sigelements"})
+    __slots__ = FIELDS
+
+class LocalityMineral(Record):
+    """One row of the localityminerals endpoint (locality id ↔ geomaterial id)."""
+    FIELDS = ("id", "locality", "geomaterial", "mineral_name", "status", "type")
+    INTERNED = frozenset({"mineral_name", "status", "type"})
+    __slots__ = FIELDS
+
+class Locality(Record):
+    """
+    A locality as listed by the API, plus what the pipeline adds: detail (the detail
+    endpoint's record, itself a Locality), locality_minerals and ancestors.
+    geomaterials holds ids, or Geomaterial records when the API expands them.
+    """
+    FIELDS = ("id", "longid", "guid", "locality_type", "txt", "revtxtd", "description_short",
+              "latitude", "longitude", "dateadd", "datemodify", "elements", "country", "parent",
+              "discovered_before", "discovery_year_type", "level", "timestamp", "geomaterials",
+              "detail", "locality_minerals", "ancestors")
+    INTERNED = frozenset({"country", "discovery_year_type"})
+    __slots__ = FIELDS
+
+    @classmethod
+    def _decode_field(cls, name: str, value):
+        if name == "detail" and isinstance(value, dict):
+            return Locality.from_dict(value)
+        if name == "locality_minerals" and type(value) is list:
+            return [LocalityMineral.from_dict(m) if isinstance(m, dict) else m for m in value]
+        if name == "geomaterials" and type(value) is list:
+            return [Geomaterial.from_dict(g) if isinstance(g, dict) else g for g in value]
+        return value
@@ -0,0 +1,77 @@
+import json
+import threading
+from pathlib import Path
+from .utils.io import AtomicWriter
+
+class PageSizeTuner:
+    """
+    Per-endpoint page_size auto-tuning, remembered across runs in a small JSON file.
+
+    Only full pages (ones with a 'next' link) are measured: a short full page reveals the
+    server's effective cap, and items/sec (EWMA) is kept per size. Once the current size
+    has min_samples, the tuner tries the next size up (x growth, bounded by the cap) and
+    otherwise settles on the best measured size, so it climbs until throughput stops
+    improving or the cap is reached.
+    A listing keeps one size for all of its pages ('next' links pin page/page_size), so
+    each new listing, or run, picks up the latest choice.
+    """
+    def __init__(self, path: str | Path | None = None, initial: int = 100,
+                 min_size: int = 10, max_size: int = 1000, growth: float = 1.5,
+                 min_samples: int = 2, alpha: float = 0.3):
+        self.path = Path(path) if path else None
+        self.initial, self.min_size, self.max_size = initial, min_size, max_size
+        self.growth, self.min_samples, self.alpha = growth, min_samples, alpha
+        self._lock = threading.Lock()
+        self.state: dict[str, dict] = {}
+        if self.path and self.path.exists():
+            try:
+                self.state = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self.state = {}
+
+    def _ep(self, endpoint: str) -> dict:
+        return self.state.setdefault(endpoint, {"cap": None, "current": self.initial, "ips": {}, "n": {}})
+
+    def _limit(self, st: dict) -> int:
+        return min(st["cap"] or self.max_size, self.max_size)
+
+    def size_for(self, endpoint: str) -> int:
+        with self._lock:
+            st = self._ep(endpoint)
+            return max(self.min_size, min(st["current"], self._limit(st)))
+
+    def observe(self, endpoint: str, requested: int, got: int, seconds: float, has_next: bool):
+        if not has_next or got <= 0 or seconds <= 0:
+            return  # last/only page: says nothing about cap or throughput
+        with self._lock:
+            st = self._ep(endpoint)
+            if got < requested:
+                st["cap"] = min(got, st["cap"] or got)
+            key = str(got)
+            ips = got / seconds
+            prev = st["ips"].get(key)
+            st["ips"][key] = ips if prev is None else prev + self.alpha * (ips - prev)
+            st["n"][key] = st["n"].get(key, 0) + 1
+            self._choose(st, got)
+
+    def _choose(self, st: dict, size: int):
+        if st["n"].get(str(size), 0) < self.min_samples:
+            st["current"] = size
+            return
+        up = min(int(size * self.growth), self._limit(st))
+        if up > size and str(up) not in st["ips"]:
+            st["current"] = up
+            return
+        limit = self._limit(st)
+        measured = {int(k): v for k, v in st["ips"].items() if int(k) <= limit}
+        st["current"] = max(measured, key=measured.get)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {ep: {"cap": st["cap"], "page_size": st["current"]} for ep, st in self.state.items()}
+
+    def save(self):
+        if self.path:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                AtomicWriter(self.path).write_json(self.state)
@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from ..api_client import MindatClient
+from ..errors import MindatHTTPError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hierarchy (
+    id     INTEGER PRIMARY KEY,
+    parent INTEGER,
+    txt    TEXT,
+    level  INTEGER
+);
+CREATE INDEX IF NOT EXISTS hierarchy_parent ON hierarchy(parent);
+"""
+
+def _parent_of(rec: dict) -> int | None:
+    p = rec.get("parent")
+    return int(p) if p else None  # Mindat uses 0/null at the top
+
+class HierarchyStore:
+    """
+    Compact locality hierarchy table (id, parent, txt, level) in SQLite, shared across runs.
+    Doubles as the persistent parent cache and as the rollup index:
+    subtree(id) lists every locality stored under an ancestor.
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, loc_id: int) -> tuple | None:
+        with self._lock:
+            return self.db.execute("SELECT id, parent, txt, level FROM hierarchy WHERE id = ?",
+                                   (loc_id,)).fetchone()
+
+    def put(self, rec: dict) -> tuple:
+        row = (int(rec["id"]), _parent_of(rec), rec.get("txt"), rec.get("level"))
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO hierarchy VALUES (?, ?, ?, ?)", row)
+            self.db.commit()
+        return row
+
+    def subtree(self, ancestor_id: int) -> list[int]:
+        """Ids of all stored localities below ancestor_id (e.g. every mine under a province)."""
+        with self._lock:
+            rows = self.db.execute(
+                "WITH RECURSIVE sub(id) AS (SELECT id FROM hierarchy WHERE parent = ?"
+                " UNION SELECT h.id FROM hierarchy h JOIN sub ON h.parent = sub.id)"
+                " SELECT id FROM sub", (ancestor_id,)).fetchall()
+        return [r[0] for r in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM hierarchy").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+class ParentResolver:
+    """
+    Resolves a locality's ancestor chain via the locality detail endpoint.
+    Lookups go memo → HierarchyStore → API; concurrent requests for the same ancestor
+    share one in-flight fetch, so each ancestor is fetched at most once (and not at all
+    once it is in the store).
+    """
+    def __init__(self, client: MindatClient, store: HierarchyStore, max_depth: int = 20):
+        self.client, self.store, self.max_depth = client, store, max_depth
+        self._memo: dict[int, tuple | None] = {}
+        self._inflight: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.fetched = 0
+        self.cache_hits = 0
+
+    def node(self, loc_id: int) -> tuple | None:
+        with self._lock:
+            if loc_id in self._memo:
+                self.cache_hits += 1
+                return self._memo[loc_id]
+            fut = self._inflight.get(loc_id)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[loc_id] = Future()
+        if not owner:
+            return fut.result()
+        try:
+            row = self.store.get(loc_id)
+            if row is not None:
+                self.cache_hits += 1
+            else:
+                try:
+                    rec = self.client.get_locality_detail(loc_id, expand_geomaterials=False)
+                    self.fetched += 1
+                    row = self.store.put(rec)
+                except MindatHTTPError:
+                    row = None  # missing ancestor: the chain stops here (not persisted)
+            with self._lock:
+                self._memo[loc_id] = row
+                del self._inflight[loc_id]
+            fut.set_result(row)
+            return row
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[loc_id]
+            fut.set_exception(e)
+            raise
+
+    def ancestors(self, loc: dict) -> list[int]:
+        """Ancestor ids, nearest first; the locality itself is recorded in the store too."""
+        self.store.put(loc)
+        chain, parent = [], _parent_of(loc)
+        while parent and len(chain) < self.max_depth and parent not in chain:
+            chain.append(parent)
+            row = self.node(parent)
+            parent = row[1] if row else None
+        return chain
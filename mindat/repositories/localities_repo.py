@@ -1,4 +1,4 @@
-from typing import Iterator
+from typing import Callable, Iterator
 from ..api_client import MindatClient
 
 class LocalitiesRepository:
@@ -10,16 +10,18 @@ class LocalitiesRepository:
         self.client = client
         self.strategies = search_strategies
 
-    def iter_mines_in_country(self, country: str) -> Iterator[dict]:
+    def iter_mines_in_country(self, country: str,
+                              on_count: Callable[[int | None], None] | None = None) -> Iterator[dict]:
         """
         Try configured strategies in order until we get at least one result, then stream all.
         Strategies come from config.yaml (e.g., ltype=60, txt=Mine, etc.)
+        on_count gets the listing total of the strategy that produced results.
         """
         base = {"format": "json", "country": country}
         seen_any = False
         for strat in self.strategies:
             params = base | {strat["param"]: strat["value"]}
-            gen = self.client.search_localities(params)
+            gen = self.client.search_localities(params, on_count=on_count)
             # try first item to confirm
             first = None
             try:
@@ -0,0 +1,204 @@
+# Package: services
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+from ..models import json_default
+from ..utils.io import AtomicWriter, iter_records
+from ..utils.timing import StageTimer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta    (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, hash TEXT NOT NULL,
+                                    merged TEXT, feature TEXT);   -- stage outputs (JSON), NULL: none
+CREATE TABLE IF NOT EXISTS members (gm_id INTEGER, loc_id INTEGER, PRIMARY KEY (gm_id, loc_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS members_loc ON members(loc_id);
+CREATE TABLE IF NOT EXISTS layers  (gm_id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS dirty   (gm_id INTEGER PRIMARY KEY);  -- layer files still to rewrite
+"""
+
+def record_hash(rec) -> str:
+    """Content hash of a raw record (key order does not matter)."""
+    raw = json.dumps(rec, ensure_ascii=False, sort_keys=True, default=json_default)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+class BuildService:
+    """
+    Incremental clean → merge → geojson → per-mineral layers over raw enriched records.
+
+    The state file keeps, per locality id, the content hash of its raw record and what
+    each stage made of it (merged record, map feature, geomaterial layers it belongs to).
+    A build streams the inputs, hashes every record and runs the stages only for new or
+    changed ones; ids no longer in the inputs are dropped. The map files are re-emitted
+    from the stored outputs, and only the layers that gained, lost or changed a feature
+    are rewritten. key fingerprints the stage code and shared inputs (geomaterials file,
+    options): when it changes, everything is rebuilt.
+
+    The stages are plain callables, so the scripts' own functions do the work:
+      clean(raw) -> record, merge(record) -> record | None, feature(record) -> dict | None
+    Outputs in out_dir: merged.jsonl, map.geojson and layers/<geomaterial id>.geojson
+    (plus layers/index.json); all are written atomically.
+    """
+    def __init__(self, out_dir: str | Path, clean: Callable, merge: Callable, feature: Callable,
+                 key: str = "", batch: int = 5_000, state_file: str = "build.sqlite"):
+        self.out_dir = Path(out_dir); (self.out_dir / "layers").mkdir(parents=True, exist_ok=True)
+        self.clean, self.merge, self.feature = clean, merge, feature
+        self.key, self.batch = key, batch
+        self.db = sqlite3.connect(str(self.out_dir / state_file), timeout=30.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.timer = StageTimer()
+        self.stats = {"read": 0, "no_id": 0, "unchanged": 0, "rebuilt": 0, "removed": 0,
+                      "layers_written": 0, "layers_removed": 0, "full": False}
+
+    def close(self):
+        self.db.close()
+
+    def _meta(self, key: str, value: str | None = None) -> str | None:
+        if value is not None:
+            self.db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+            return value
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def run(self, inputs: Iterable[str | Path], full: bool = False) -> dict:
+        with self.db:
+            if full or self._meta("key") != self.key:
+                # stage code or shared inputs changed: nothing stored can be trusted
+                self.stats["full"] = True
+                self.db.execute("INSERT OR IGNORE INTO dirty(gm_id) SELECT gm_id FROM layers")
+                self.db.execute("DELETE FROM records"); self.db.execute("DELETE FROM members")
+                self._meta("key", self.key); self._meta("outputs", "stale")
+        stored = dict(self.db.execute("SELECT id, hash FROM records"))
+        latest: dict[int, str] = {}
+        pending: dict[int, tuple[str, dict]] = {}
+        with self.timer.stage("scan"):
+            for path in inputs:
+                for rec in iter_records(path):
+                    self.stats["read"] += 1
+                    loc_id = rec.get("id")
+                    if not isinstance(loc_id, int):
+                        self.stats["no_id"] += 1
+                        continue
+                    with self.timer.stage("hash"):
+                        h = record_hash(rec)
+                    latest[loc_id] = h  # the last record of an id wins (edits appended to JSONL)
+                    if stored.get(loc_id) == h:
+                        pending.pop(loc_id, None)
+                        continue
+                    pending[loc_id] = (h, rec)
+                    if len(pending) >= self.batch:
+                        self._rebuild(pending, stored); pending = {}
+            self._rebuild(pending, stored)
+        gone = [i for i in stored if i not in latest]
+        if gone:
+            with self.db:
+                self._forget(gone)
+                self._meta("outputs", "stale")
+            self.stats["removed"] = len(gone)
+        self.stats["unchanged"] = max(0, len(latest) - self.stats["rebuilt"])
+        if self._meta("outputs") != "fresh" or not (self.out_dir / "map.geojson").exists():
+            with self.timer.stage("write"):
+                self._write_outputs()
+        return dict(self.stats)
+
+    # -- stages ------------------------------------------------------------------------
+    def _rebuild(self, pending: dict, stored: dict):
+        """Run the stages for changed records and store their outputs (one transaction)."""
+        if not pending:
+            return
+        rows, members, names = [], [], {}
+        for loc_id, (h, rec) in pending.items():
+            with self.timer.stage("clean"):
+                cleaned = self.clean(rec)
+            with self.timer.stage("merge"):
+                merged = self.merge(cleaned)
+            feature = None
+            if merged is not None:
+                with self.timer.stage("geojson"):
+                    feature = self.feature(merged)
+                for gm in merged.get("geomaterials_details") or ():
+                    names[gm["id"]] = gm.get("name")
+                members += [(g, loc_id) for g in merged.get("geomaterial_ids") or () if isinstance(g, int)]
+            rows.append((loc_id, h, _dumps(merged), _dumps(feature)))
+            stored[loc_id] = h
+        with self.timer.stage("store"), self.db:
+            self._forget(list(pending), keep_records=True)
+            self.db.executemany("INSERT OR REPLACE INTO records(id, hash, merged, feature) VALUES (?, ?, ?, ?)", rows)
+            self.db.executemany("INSERT OR IGNORE INTO members(gm_id, loc_id) VALUES (?, ?)", members)
+            self.db.executemany("INSERT OR IGNORE INTO dirty(gm_id) VALUES (?)", ((g,) for g, _ in members))
+            self.db.executemany("INSERT OR IGNORE INTO layers(gm_id) VALUES (?)", ((g,) for g, _ in members))
+            self.db.executemany("INSERT OR REPLACE INTO layers(gm_id, name) VALUES (?, ?)", names.items())
+            self._meta("outputs", "stale")
+        self.stats["rebuilt"] += len(rows)
+
+    def _forget(self, ids: list[int], keep_records: bool = False):
+        """Drop ids' layer memberships (marking those layers dirty) and, unless keep_records, their rows."""
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            self.db.execute(f"INSERT OR IGNORE INTO dirty(gm_id) SELECT gm_id FROM members WHERE loc_id IN ({marks})", chunk)
+            self.db.execute(f"DELETE FROM members WHERE loc_id IN ({marks})", chunk)
+            if not keep_records:
+                self.db.execute(f"DELETE FROM records WHERE id IN ({marks})", chunk)
+
+    # -- outputs -----------------------------------------------------------------------
+    def _write_outputs(self):
+        self._write_lines(self.out_dir / "merged.jsonl", "SELECT merged FROM records WHERE merged IS NOT NULL ORDER BY id")
+        self._write_collection(self.out_dir / "map.geojson",
+                               "SELECT feature FROM records WHERE feature IS NOT NULL ORDER BY id", ())
+        layers = self.out_dir / "layers"
+        for (gm_id,) in self.db.execute("SELECT gm_id FROM dirty").fetchall():
+            path = layers / f"{gm_id}.geojson"
+            n = self._write_collection(path, "SELECT r.feature FROM members m JOIN records r ON r.id = m.loc_id"
+                                             " WHERE m.gm_id = ? AND r.feature IS NOT NULL ORDER BY m.loc_id",
+                                       (gm_id,), name=self._layer_name(gm_id))
+            if n:
+                self.stats["layers_written"] += 1
+            elif path.exists():  # nothing left on the map for this geomaterial
+                path.unlink()
+                self.stats["layers_removed"] += 1
+        index = {str(g): {"name": name, "features": n} for g, name, n in self.db.execute(
+            "SELECT l.gm_id, l.name, COUNT(r.id) FROM layers l JOIN members m ON m.gm_id = l.gm_id"
+            " JOIN records r ON r.id = m.loc_id AND r.feature IS NOT NULL GROUP BY l.gm_id ORDER BY l.gm_id")}
+        AtomicWriter(layers / "index.json").write_text(json.dumps(index, ensure_ascii=False, indent=1))
+        with self.db:
+            self.db.execute("DELETE FROM dirty")
+            self.db.execute("DELETE FROM layers WHERE gm_id NOT IN (SELECT gm_id FROM members)")
+            self._meta("outputs", "fresh")
+
+    def _layer_name(self, gm_id: int) -> str | None:
+        row = self.db.execute("SELECT name FROM layers WHERE gm_id = ?", (gm_id,)).fetchone()
+        return row[0] if row else None
+
+    def _write_lines(self, path: Path, sql: str, params=()) -> int:
+        tmp, n = path.with_name(path.name + ".tmp"), 0
+        with tmp.open("w", encoding="utf-8") as f:
+            for (raw,) in self.db.execute(sql, params):
+                f.write(raw + "\n"); n += 1
+        tmp.replace(path)
+        return n
+
+    def _write_collection(self, path: Path, sql: str, params, name: str | None = None) -> int:
+        """Stored features → a FeatureCollection, one feature per line (not written when empty)."""
+        tmp, n = path.with_name(path.name + ".tmp"), 0
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write('{"type": "FeatureCollection", "features": [')
+            for (raw,) in self.db.execute(sql, params):
+                f.write((",\n" if n else "\n") + raw); n += 1
+            meta = {"generated": datetime.now().isoformat(), "total_features": n}
+            if name is not None:
+                meta["name"] = name
+            f.write('\n], "metadata": ' + json.dumps(meta, ensure_ascii=False) + "}\n")
+        if n or name is None:  # the map itself is written even when empty
+            tmp.replace(path)
+        else:
+            tmp.unlink()
+        return n
+
+def _dumps(obj) -> str | None:
+    return None if obj is None else json.dumps(obj, ensure_ascii=False, default=json_default)
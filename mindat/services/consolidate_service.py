@@ -0,0 +1,124 @@
+# Package: services
+
+import heapq
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+from ..utils.io import iter_records
+from ..utils.jsonl_index import build_index, index_path
+from ..utils.timing import StageTimer
+
+# run-file line: "<id>\t<datemodify>\t<seq>\t<record json>"; sorting by (id, datemodify, seq)
+# puts the record to keep last in each id group (newest edit, then latest input)
+_Key = tuple[int, str, int]
+
+def _parse(line: str) -> tuple[_Key, str]:
+    loc_id, dm, seq, raw = line.split("\t", 3)
+    return (int(loc_id), dm, int(seq)), raw
+
+def _newest(lines: Iterable[tuple[_Key, str]]) -> Iterator[tuple[_Key, str]]:
+    """Keep the last entry of each run of equal ids in (id, datemodify, seq) order."""
+    prev = None
+    for entry in lines:
+        if prev is not None and prev[0][0] != entry[0][0]:
+            yield prev
+        prev = entry
+    if prev is not None:
+        yield prev
+
+class ConsolidateService:
+    """
+    Merge any number of per-country outputs (JSON or JSONL) into one global file, unique by
+    locality id, keeping the newest datemodify on collisions (ties: the later input wins).
+
+    External merge sort, so memory is bounded by run_size records whatever the total:
+    inputs are streamed (io.iter_records), cut into sorted and de-duplicated run files,
+    which are k-way merged at most fan_in at a time, and the result is streamed out.
+    Records without an integer id cannot be matched and are dropped (counted).
+    """
+    def __init__(self, run_size: int = 100_000, fan_in: int = 64, tmp_dir: str | Path | None = None):
+        self.run_size, self.fan_in = run_size, max(2, fan_in)
+        self.tmp_dir = tmp_dir
+        self.timer = StageTimer()
+        self.stats = {"inputs": 0, "read": 0, "no_id": 0, "runs": 0, "written": 0}
+
+    def run(self, inputs: Iterable[str | Path], out_path: str | Path, save_format: str = "json",
+            index: bool = False) -> dict:
+        out_path = Path(out_path); out_path.parent.mkdir(parents=True, exist_ok=True)
+        work = Path(tempfile.mkdtemp(prefix="consolidate-", dir=self.tmp_dir))
+        try:
+            with self.timer.stage("split"):
+                runs = self._split(inputs, work)
+            with self.timer.stage("merge"):
+                while len(runs) > self.fan_in:
+                    runs = [self._merge_to(runs[i:i + self.fan_in], work / f"m{len(runs)}_{i}.run")
+                            for i in range(0, len(runs), self.fan_in)]
+            with self.timer.stage("write"):
+                self._write(runs, out_path, save_format)
+            if save_format == "jsonl" and (index or index_path(out_path).exists()):
+                with self.timer.stage("index"):  # a sidecar from an earlier file would be stale
+                    build_index(out_path)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        return dict(self.stats)
+
+    def _split(self, inputs, work: Path) -> list[Path]:
+        runs, buf, seq = [], [], 0
+        for path in inputs:
+            self.stats["inputs"] += 1
+            for rec in iter_records(path):
+                self.stats["read"] += 1
+                loc_id = rec.get("id")
+                if not isinstance(loc_id, int):
+                    self.stats["no_id"] += 1
+                    continue
+                dm = str(rec.get("datemodify") or "").replace("\t", " ")
+                buf.append(((loc_id, dm, seq), json.dumps(rec, ensure_ascii=False))); seq += 1
+                if len(buf) >= self.run_size:
+                    runs.append(self._flush(buf, work / f"r{len(runs)}.run")); buf = []
+        if buf:
+            runs.append(self._flush(buf, work / f"r{len(runs)}.run"))
+        self.stats["runs"] = len(runs)
+        return runs
+
+    def _flush(self, buf: list, path: Path) -> Path:
+        buf.sort(key=lambda e: e[0])
+        with path.open("w", encoding="utf-8") as f:
+            for (loc_id, dm, seq), raw in _newest(buf):
+                f.write(f"{loc_id}\t{dm}\t{seq}\t{raw}\n")
+        return path
+
+    def _merged(self, runs: list[Path]) -> Iterator[tuple[_Key, str]]:
+        files = [p.open(encoding="utf-8") for p in runs]
+        try:
+            streams = [(_parse(line.rstrip("\n")) for line in f) for f in files]
+            yield from _newest(heapq.merge(*streams, key=lambda e: e[0]))
+        finally:
+            for f in files:
+                f.close()
+
+    def _merge_to(self, runs: list[Path], path: Path) -> Path:
+        with path.open("w", encoding="utf-8") as f:
+            for (loc_id, dm, seq), raw in self._merged(runs):
+                f.write(f"{loc_id}\t{dm}\t{seq}\t{raw}\n")
+        for p in runs:
+            p.unlink()
+        return path
+
+    def _write(self, runs: list[Path], out_path: Path, save_format: str):
+        """Stream the final merge into out_path atomically (same layout as the download outputs)."""
+        tmp = out_path.with_suffix(".tmp")
+        n = 0
+        with tmp.open("w", encoding="utf-8") as f:
+            if save_format == "jsonl":
+                for _, raw in self._merged(runs):
+                    f.write(raw + "\n"); n += 1
+            else:
+                f.write('{"results": [')
+                for _, raw in self._merged(runs):
+                    f.write((",\n" if n else "\n") + raw); n += 1
+                f.write("\n]}\n")
+        tmp.replace(out_path)
+        self.stats["written"] = n
@@ -0,0 +1,85 @@
+# Package: services
+
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+from ..api_client import MindatClient
+from ..repositories.localities_repo import LocalitiesRepository
+from ..repositories.hierarchy_repo import ParentResolver
+from ..utils.io import AtomicWriter, JsonlWriter
+from ..utils.timing import StageTimer
+from ..workqueue.base import WorkQueue
+from .download_service import enrich_locality
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class CrawlService:
+    """
+    Distributed mode: seed a shared WorkQueue from the listing pass, let any number of
+    workers claim leased batches and enrich them, then export the queue's results.
+    """
+    def __init__(self, client: MindatClient, queue: WorkQueue,
+                 repo: LocalitiesRepository | None = None, resolver: ParentResolver | None = None):
+        self.client, self.queue, self.repo = client, queue, repo
+        self.resolver = resolver
+        self.timer = StageTimer()
+
+    def seed(self, country: str, on_total: Callable[[int | None], None] | None = None) -> int:
+        """Enqueue the country's listing; already-queued ids are left alone."""
+        return self.queue.put(self.repo.iter_mines_in_country(country, on_count=on_total))
+
+    def work(self, worker: str | None = None, batch: int = 20, lease_seconds: float = 300.0,
+             max_attempts: int = 5, idle_exit: bool = True, poll_seconds: float = 5.0,
+             on_locality: Callable[[int, bool], None] | None = None) -> int:
+        """
+        Claim → enrich → complete until the queue is drained (or forever with idle_exit=False).
+        The lease is renewed after every locality, so lease_seconds only needs to cover one
+        enrichment. Returns the number of localities this worker completed.
+        """
+        worker = worker or default_worker_id()
+        done = 0
+        while True:
+            tasks = self.queue.claim(worker, batch, lease_seconds, max_attempts)
+            if not tasks:
+                if idle_exit and not self.queue.stats()["leased"]:
+                    return done
+                time.sleep(poll_seconds)  # others still hold leases that may expire
+                continue
+            pending = [t.id for t in tasks]
+            for task in tasks:
+                t0 = time.perf_counter()
+                try:
+                    item = enrich_locality(self.client, task.payload, self.timer)
+                    if self.resolver is not None:
+                        with self.timer.stage("parents"):
+                            item["ancestors"] = self.resolver.ancestors(task.payload)
+                except Exception as e:
+                    self.queue.fail(worker, task.id, f"{type(e).__name__}: {e}", max_attempts)
+                    ok = False
+                else:
+                    # False means our lease expired and someone else owns it now: drop our copy
+                    ok = self.queue.complete(worker, task.id, item)
+                    done += ok
+                self.timer.add_locality(task.id, time.perf_counter() - t0)
+                pending.remove(task.id)
+                self.queue.extend(worker, pending, lease_seconds)
+                if on_locality: on_locality(task.id, ok)
+
+    def export(self, out_path: Path, save_format: str = "json") -> int:
+        """Write completed results (id order) as {"results": [...]} JSON or JSONL."""
+        out_path = Path(out_path); out_path.parent.mkdir(parents=True, exist_ok=True)
+        n = 0
+        if save_format == "jsonl":
+            tmp = out_path.with_suffix(".tmp"); tmp.unlink(missing_ok=True)
+            writer = JsonlWriter(tmp)
+            for item in self.queue.results():
+                writer.write_one(item); n += 1
+            tmp.replace(out_path)
+        else:
+            results = list(self.queue.results()); n = len(results)
+            AtomicWriter(out_path).write_json({"results": results})
+        return n
@@ -1,52 +1,212 @@
+# Package: services
+
+import json
+import time
 from pathlib import Path
 from typing import Callable
 from ..api_client import MindatClient
+from ..models import Locality, json_default
 from ..repositories.localities_repo import LocalitiesRepository
-from ..utils.io import JsonAccumulator, JsonlWriter
+from ..repositories.hierarchy_repo import ParentResolver
+from ..utils.dlq import DeadLetterQueue
+from ..utils.io import JsonAccumulator, JsonlWriter, patch_records
+from ..utils.seen import SeenSet
+from ..utils.sinks import Sink
+from ..utils.timing import NULL_TIMER, StageTimer
+
+def enrich_locality(client: MindatClient, loc: Locality | dict, timer=NULL_TIMER,
+                    on_error: Callable[[str, Exception], None] | None = None) -> Locality:
+    """
+    Raw locality + Mindat detail (geomaterials expanded) + locality minerals list.
+    The listing's Locality is enriched in place (a plain dict, e.g. a queue payload, is
+    decoded first), so no per-record copy is made.
+    With on_error, a failed call is reported as on_error("detail" | "minerals", exc) and its
+    field left out, so the caller can dead-letter it and keep going; without it, a detail
+    failure raises and a minerals failure is ignored.
+    """
+    item = loc if isinstance(loc, Locality) else Locality.from_dict(loc)
+    # Mindat enrichment only — no text interpretation
+    for kind, field, call in (
+        ("detail", "detail", lambda: client.get_locality_detail(loc["id"], expand_geomaterials=True)),
+        # optional: also fetch explicit locality minerals list (purely endpoint-based)
+        ("minerals", "locality_minerals", lambda: client.list_locality_minerals(loc["id"])),
+    ):
+        try:
+            with timer.stage(kind):
+                item[field] = call()
+        except Exception as e:
+            if on_error is not None:
+                on_error(kind, e)
+            elif kind == "detail":
+                raise
+    return item
+
+def output_stem(country: str) -> str:
+    return f"{country.replace(' ', '_')}_Mine_enriched"
+
+class DownloadHooks:
+    """
+    Callbacks fired by DownloadService; override what you need (all default to no-ops).
+    Stage/CPU timings are available from the StageTimer passed to on_finish.
+    """
+    def on_total(self, total: int | None): ...
+    def on_locality(self, loc_id, count: int, seconds: float): ...
+    def on_skip(self, loc_id): ...
+    def on_finish(self, timer: StageTimer): ...
 
 class DownloadService:
     """
     Orchestrates: search → (optional) enrich → save.
     No CLI here; CLI supplies callbacks for progress if needed.
+    Each stored record is serialised once; the line goes to the primary output and then
+    to every extra sink (SQLite, GeoJSON, ... see mindat.utils.sinks), so one crawl pass
+    produces all artifacts. Sinks are closed when the run ends.
     """
     def __init__(self, client: MindatClient, repo: LocalitiesRepository,
-                 out_dir: Path, save_format: str = "json", checkpoint_every: int = 1):
+                 out_dir: Path, save_format: str = "json", checkpoint_every: int = 1,
+                 seen: SeenSet | None = None, resolver: ParentResolver | None = None,
+                 dlq: DeadLetterQueue | None = None, jsonl_index: bool = False,
+                 sinks: list[Sink] | None = None):
         self.client, self.repo = client, repo
+        self.resolver = resolver  # optional: adds "ancestors" (parent chain ids, nearest first)
+        self.dlq = dlq  # optional: failed detail/minerals calls are parked here and retried later
+        self.jsonl_index = jsonl_index
+        self.sinks = list(sinks or [])  # only records the primary output stored reach these
+        self.seen = seen  # localities stored by any earlier run are not fetched again
         self.out_dir = Path(out_dir); self.out_dir.mkdir(parents=True, exist_ok=True)
         self.save_format = save_format
         self.checkpoint_every = checkpoint_every
+        self.timer = StageTimer()
+        self.skipped = 0
 
-    def _writer(self, filename: str):
+    def _writer(self, filename: str) -> Sink:
         p = self.out_dir / filename
         if self.save_format == "jsonl":
-            return "jsonl", JsonlWriter(p)
-        return "json", JsonAccumulator(p)
+            return JsonlWriter(p, timer=self.timer, seen=self.seen, index=self.jsonl_index)
+        return JsonAccumulator(p, timer=self.timer, seen=self.seen)
 
     def download_country_mines(self, country: str,
                                enrich: bool = True,
-                               progress_cb: Callable[[int], None] | None = None) -> Path:
-        fname = f"{country.replace(' ', '_')}_Mine_enriched.{ 'jsonl' if self.save_format=='jsonl' else 'json' }"
-        mode, writer = self._writer(fname)
+                               progress_cb: Callable[[int], None] | None = None,
+                               hooks: DownloadHooks | None = None,
+                               retry_failed: bool = True) -> Path:
+        hooks = hooks or DownloadHooks()
+        self.timer = timer = StageTimer()
+        fname = f"{output_stem(country)}.{ 'jsonl' if self.save_format=='jsonl' else 'json' }"
+        writer = self._writer(fname)
+        out_path = self.out_dir / fname
+        self.skipped = 0
+        try:
+            self._crawl(country, enrich, writer, out_path, progress_cb, hooks)
+            if self.dlq is not None and retry_failed:
+                with timer.stage("retry"):
+                    self.retry_dead_letters(out_path)  # before the sinks close: they get the patched records
+        finally:
+            with timer.stage("sinks"):
+                self.close_sinks()
+        hooks.on_finish(timer)
+        return out_path
+
+    def close_sinks(self):
+        """Close every extra sink (a threaded one drains its queue first); the first error is raised."""
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                error = error or e
+        self.sinks = []
+        if error is not None:
+            raise error
+
+    def _crawl(self, country: str, enrich: bool, writer: Sink, out_path: Path,
+               progress_cb: Callable[[int], None] | None, hooks: DownloadHooks) -> int:
+        timer = self.timer
         count = 0
+        complete = []  # enriched without failures: older dead letters for them are obsolete
 
-        for loc in self.repo.iter_mines_in_country(country):
-            item = dict(loc)  # raw locality
+        localities = self.repo.iter_mines_in_country(country, on_count=hooks.on_total)
+        while True:
+            with timer.stage("list"):
+                loc = next(localities, None)
+            if loc is None:
+                break
+            if self.seen is not None and self.seen.is_current(loc.get("id"), loc.get("datemodify")):
+                self.skipped += 1
+                hooks.on_skip(loc.get("id"))
+                continue
+            t0 = time.perf_counter()
+            failed = []
             if enrich:
-                # Mindat enrichment only — no text interpretation
-                detail = self.client.get_locality_detail(loc["id"], expand_geomaterials=True)
-                item["detail"] = detail
-                # optional: also fetch explicit locality minerals list (purely endpoint-based)
-                try:
-                    mins = self.client.list_locality_minerals(loc["id"])
-                    item["locality_minerals"] = mins
-                except Exception:
-                    pass
-
-            # persist
-            if mode == "jsonl":
-                writer.write_one(item)
+                on_error = None
+                if self.dlq is not None:
+                    def on_error(kind, e, loc_id=loc["id"]):
+                        self.dlq.push(loc_id, kind, out_path, f"{type(e).__name__}: {e}")
+                        failed.append(kind)
+                item = enrich_locality(self.client, loc, timer, on_error)
             else:
-                writer.append_and_save(item)
+                item = loc
+            if self.resolver is not None:
+                with timer.stage("parents"):
+                    item["ancestors"] = self.resolver.ancestors(loc)
+
+            # persist: serialise once, primary output first, then the extra sinks
+            with timer.stage("serialize"):
+                line = json.dumps(item, ensure_ascii=False, default=json_default).encode("utf-8")
+            if writer.write(item, line) and self.sinks:
+                with timer.stage("sinks"):
+                    for sink in self.sinks:
+                        sink.write(item, line)
+            if failed and self.seen is not None:
+                # the writer marked it seen, but it has open dead letters: fetch it again next run
+                self.seen.discard(loc["id"])
+            elif enrich and self.dlq is not None:
+                complete.append(loc["id"])
             count += 1
+            elapsed = time.perf_counter() - t0
+            timer.add_locality(loc.get("id"), elapsed)
+            hooks.on_locality(loc.get("id"), count, elapsed)
             if progress_cb: progress_cb(count)
-        return self.out_dir / fname
+        if complete:
+            self.dlq.resolve_all(complete, out_path)
+        return count
+
+    def retry_dead_letters(self, out_file: Path | None = None, max_attempts: int = 5) -> tuple[int, int]:
+        """
+        Deferred retry pass: re-run each dead-lettered call (all outputs, or just out_file)
+        that has fewer than max_attempts, patch successes into the output in place and
+        remove them from the queue. Patched records go to the extra sinks again (they
+        upsert by id), and a record with no dead letters left is marked seen, so the next
+        run does not enrich and append it once more. Returns (fixed, still_failing).
+        """
+        patches: dict[str, dict] = {}
+        fixed = 0
+        for dl in self.dlq.items(out_file, max_attempts):
+            loc_id, kind = dl["loc_id"], dl["kind"]
+            try:
+                if kind == "detail":
+                    patch = {"detail": self.client.get_locality_detail(loc_id, expand_geomaterials=True)}
+                else:
+                    patch = {"locality_minerals": self.client.list_locality_minerals(loc_id)}
+            except Exception as e:
+                self.dlq.push(loc_id, kind, dl["out_file"], f"{type(e).__name__}: {e}")
+                continue
+            patches.setdefault(dl["out_file"], {}).setdefault(loc_id, {}).update(patch)
+        for path, by_id in patches.items():
+            patched = []
+            patch_records(Path(path), by_id, patched.append)
+            for loc_id, patch in by_id.items():
+                for kind, field in (("detail", "detail"), ("minerals", "locality_minerals")):
+                    if field in patch:
+                        self.dlq.resolve(loc_id, kind, path)
+                        fixed += 1
+            still_open = {dl["loc_id"] for dl in self.dlq.items(path)}
+            for rec in patched:
+                if self.sinks:
+                    line = json.dumps(rec, ensure_ascii=False, default=json_default).encode("utf-8")
+                    with self.timer.stage("sinks"):
+                        for sink in self.sinks:
+                            sink.write(rec, line)
+                if self.seen is not None and rec.get("id") not in still_open:
+                    self.seen.add(rec.get("id"), rec.get("datemodify"))
+        return fixed, len(self.dlq.items(out_file))
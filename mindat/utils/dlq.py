@@ -0,0 +1,66 @@
+import sqlite3
+import time
+from pathlib import Path
+
+def _key(out_file) -> str:
+    return str(Path(out_file).resolve())  # absolute, so `mindat retry` works from any cwd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    loc_id       INTEGER NOT NULL,
+    kind         TEXT NOT NULL,      -- detail | minerals
+    out_file     TEXT NOT NULL,      -- output the record lives in (patched by the retry pass)
+    error        TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 1,
+    first_failed REAL,
+    last_failed  REAL,
+    PRIMARY KEY (loc_id, kind, out_file)
+);
+"""
+
+class DeadLetterQueue:
+    """Persisted failed enrichment calls (one row per locality + call kind + output file)."""
+    def __init__(self, path: str | Path):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=30.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def push(self, loc_id, kind: str, out_file: str | Path, error: str):
+        now = time.time()
+        self.db.execute(
+            "INSERT INTO dead_letters(loc_id, kind, out_file, error, first_failed, last_failed)"
+            " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(loc_id, kind, out_file) DO UPDATE SET"
+            " attempts = attempts + 1, error = excluded.error, last_failed = excluded.last_failed",
+            (int(loc_id), kind, _key(out_file), error, now, now))
+        self.db.commit()
+
+    def resolve(self, loc_id, kind: str, out_file: str | Path):
+        self.db.execute("DELETE FROM dead_letters WHERE loc_id = ? AND kind = ? AND out_file = ?",
+                        (int(loc_id), kind, _key(out_file)))
+        self.db.commit()
+
+    def resolve_all(self, loc_ids, out_file: str | Path):
+        """Drop every dead letter of these localities in out_file (e.g. re-fetched in full since)."""
+        key = _key(out_file)
+        self.db.executemany("DELETE FROM dead_letters WHERE loc_id = ? AND out_file = ?",
+                            ((int(i), key) for i in loc_ids))
+        self.db.commit()
+
+    def items(self, out_file: str | Path | None = None, max_attempts: int | None = None) -> list[dict]:
+        sql, args = "SELECT loc_id, kind, out_file, error, attempts FROM dead_letters WHERE 1=1", []
+        if out_file is not None:
+            sql += " AND out_file = ?"; args.append(_key(out_file))
+        if max_attempts is not None:
+            sql += " AND attempts < ?"; args.append(max_attempts)
+        rows = self.db.execute(sql + " ORDER BY out_file, loc_id", args).fetchall()
+        return [dict(zip(("loc_id", "kind", "out_file", "error", "attempts"), r)) for r in rows]
+
+    def counts(self) -> dict[str, int]:
+        return dict(self.db.execute("SELECT kind, COUNT(*) FROM dead_letters GROUP BY kind").fetchall())
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+
+    def close(self):
+        self.db.close()
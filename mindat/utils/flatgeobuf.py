@@ -0,0 +1,292 @@
+# Package: utils
+
+import json
+import math
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any
+
+MAGIC = b"fgb\x03fgb\x00"
+
+# FlatGeobuf enums (subset)
+GEOM_POINT = 1
+COL_BOOL, COL_LONG, COL_DOUBLE, COL_STRING, COL_JSON = 2, 7, 10, 11, 12
+
+
+# --- Minimal forward-writing flatbuffer encoder ----------------------------------------
+# Tables are laid out as [vtable][table][children...]; every uoffset points forward,
+# which the format allows and keeps the encoder a single recursive pass.
+
+class _Vec:
+    def __init__(self, fmt: str, items: list):
+        self.fmt, self.items = fmt, items
+
+class _Str:
+    def __init__(self, s: str):
+        self.data = s.encode("utf-8")
+
+class _TableVec:
+    def __init__(self, tables: list):
+        self.tables = tables
+
+_SCALAR = {"B": 1, "H": 2, "i": 4, "I": 4, "Q": 8, "d": 8, "?": 1}
+
+
+def _pad(buf: bytearray, align: int, extra: int = 0):
+    while (len(buf) + extra) % align:
+        buf.append(0)
+
+
+def _write_child(buf: bytearray, child) -> int:
+    """Append a string/vector/table and return its absolute position."""
+    if isinstance(child, dict):
+        return _write_table(buf, child)
+    if isinstance(child, _Str):
+        _pad(buf, 4)
+        pos = len(buf)
+        buf += struct.pack("<I", len(child.data)) + child.data + b"\x00"
+        return pos
+    if isinstance(child, _Vec):
+        size = _SCALAR[child.fmt]
+        _pad(buf, max(size, 4), extra=4)
+        pos = len(buf)
+        buf += struct.pack(f"<I{len(child.items)}{child.fmt}", len(child.items), *child.items)
+        return pos
+    if isinstance(child, _TableVec):
+        _pad(buf, 4)
+        pos = len(buf)
+        buf += struct.pack("<I", len(child.tables)) + b"\x00" * (4 * len(child.tables))
+        for i, t in enumerate(child.tables):
+            slot = pos + 4 + 4 * i
+            tpos = _write_table(buf, t)
+            struct.pack_into("<I", buf, slot, tpos - slot)
+        return pos
+    raise TypeError(child)
+
+
+def _write_table(buf: bytearray, fields: dict) -> int:
+    """fields: {field_id: (fmt, value)} for scalars or {field_id: child} for offsets."""
+    n = (max(fields) + 1) if fields else 0
+    # lay out inline fields after the 4-byte soffset, biggest first to minimise padding
+    layout, cursor = {}, 4
+    for fid in sorted(fields, key=lambda f: -(_SCALAR[fields[f][0]] if isinstance(fields[f], tuple) else 4)):
+        size = _SCALAR[fields[fid][0]] if isinstance(fields[fid], tuple) else 4
+        cursor = (cursor + size - 1) // size * size
+        layout[fid] = cursor
+        cursor += size
+    table_size = cursor
+
+    _pad(buf, 2)
+    vt_pos = len(buf)
+    buf += struct.pack(f"<HH{n}H", 4 + 2 * n, table_size, *[layout.get(i, 0) for i in range(n)])
+    _pad(buf, 8)
+    t_pos = len(buf)
+    buf += b"\x00" * table_size
+    struct.pack_into("<i", buf, t_pos, t_pos - vt_pos)
+
+    children = []
+    for fid, v in fields.items():
+        if isinstance(v, tuple):
+            struct.pack_into("<" + v[0], buf, t_pos + layout[fid], v[1])
+        else:
+            children.append((t_pos + layout[fid], v))
+    for slot, child in children:
+        cpos = _write_child(buf, child)
+        struct.pack_into("<I", buf, slot, cpos - slot)
+    return t_pos
+
+
+def _finish(root: dict) -> bytes:
+    buf = bytearray(b"\x00\x00\x00\x00")
+    pos = _write_table(buf, root)
+    struct.pack_into("<I", buf, 0, pos)
+    return bytes(buf)
+
+
+# --- Packed Hilbert R-tree -------------------------------------------------------------
+
+def _hilbert(x: int, y: int) -> int:
+    a = x ^ y
+    b = 0xFFFF ^ a
+    c = 0xFFFF ^ (x | y)
+    d = x & (y ^ 0xFFFF)
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 2)) ^ (b & (b >> 2))
+    B = (a & (b >> 2)) ^ (b & ((a ^ b) >> 2))
+    C ^= (a & (c >> 2)) ^ (b & (d >> 2))
+    D ^= (b & (c >> 2)) ^ ((a ^ b) & (d >> 2))
+    a, b, c, d = A, B, C, D
+    A = (a & (a >> 4)) ^ (b & (b >> 4))
+    B = (a & (b >> 4)) ^ (b & ((a ^ b) >> 4))
+    C ^= (a & (c >> 4)) ^ (b & (d >> 4))
+    D ^= (b & (c >> 4)) ^ ((a ^ b) & (d >> 4))
+    a, b, c, d = A, B, C, D
+    C ^= (a & (c >> 8)) ^ (b & (d >> 8))
+    D ^= (b & (c >> 8)) ^ ((a ^ b) & (d >> 8))
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+    i0 = x ^ y
+    i1 = b | (0xFFFF ^ (i0 | a))
+
+    def spread(v: int) -> int:
+        v = (v | (v << 8)) & 0x00FF00FF
+        v = (v | (v << 4)) & 0x0F0F0F0F
+        v = (v | (v << 2)) & 0x33333333
+        return (v | (v << 1)) & 0x55555555
+
+    return ((spread(i1) << 1) | spread(i0)) & 0xFFFFFFFF
+
+
+def _level_bounds(num_items: int, node_size: int) -> list[tuple[int, int]]:
+    # do-while, as in the reference packedrtree: at least one level above the leaves,
+    # so a single feature gets a root node too (2 nodes)
+    n, counts = num_items, [num_items]
+    while True:
+        n = math.ceil(n / node_size)
+        counts.append(n)
+        if n == 1:
+            break
+    total = sum(counts)
+    bounds, end = [], total
+    for c in counts:
+        bounds.append((end - c, end))
+        end -= c
+    return bounds
+
+
+class FlatGeobufWriter:
+    """
+    Streaming FlatGeobuf writer for point features with a packed Hilbert R-tree index.
+    Features are encoded as they arrive and spooled to a temp file; close() sorts them
+    along the Hilbert curve and writes header + index + features. Memory stays O(bbox per feature).
+    """
+    def __init__(self, out_path: Path, name: str = "features", node_size: int = 16):
+        self.out_path, self.name, self.node_size = Path(out_path), name, node_size
+        self.columns: list[tuple[str, int]] | None = None
+        self._col_index: dict[str, int] = {}
+        self._spool = tempfile.TemporaryFile()
+        self._entries: list[tuple[float, float, int, int]] = []  # x, y, spool offset, size
+
+    @staticmethod
+    def _column_type(v: Any) -> int:
+        if v is None:
+            return COL_STRING  # unknown type: non-string values are stored as JSON text
+        if isinstance(v, bool):
+            return COL_BOOL
+        if isinstance(v, int):
+            return COL_LONG
+        if isinstance(v, float):
+            return COL_DOUBLE
+        if isinstance(v, str):
+            return COL_STRING
+        return COL_JSON
+
+    def _encode_properties(self, props: dict) -> bytes:
+        out = bytearray()
+        for k, v in props.items():
+            idx = self._col_index.get(k)
+            if idx is None or v is None:
+                continue
+            ctype = self.columns[idx][1]
+            if ctype == COL_BOOL:
+                out += struct.pack("<HB", idx, bool(v))
+            elif ctype == COL_LONG and isinstance(v, int):
+                out += struct.pack("<Hq", idx, v)
+            elif ctype == COL_DOUBLE and isinstance(v, (int, float)):
+                out += struct.pack("<Hd", idx, float(v))
+            elif ctype in (COL_STRING, COL_JSON):
+                data = (v if isinstance(v, str) and ctype == COL_STRING
+                        else json.dumps(v, ensure_ascii=False)).encode("utf-8")
+                out += struct.pack("<HI", idx, len(data)) + data
+        return bytes(out)
+
+    def write_one(self, feature: dict):
+        geom = feature.get("geometry") or {}
+        if geom.get("type") != "Point":
+            return
+        x, y = (float(c) for c in geom["coordinates"][:2])
+        props = feature.get("properties") or {}
+        if self.columns is None:
+            # schema is fixed by the first feature; later unknown keys are dropped
+            self.columns = [(k, self._column_type(v)) for k, v in props.items()]
+            self._col_index = {k: i for i, (k, _) in enumerate(self.columns)}
+        fb = _finish({
+            0: {1: _Vec("d", [x, y]), 6: ("B", GEOM_POINT)},
+            1: _Vec("B", list(self._encode_properties(props))),
+        })
+        offset = self._spool.tell()
+        self._spool.write(struct.pack("<I", len(fb)) + fb)
+        self._entries.append((x, y, offset, len(fb) + 4))
+
+    def close(self):
+        entries = self._entries
+        if entries:
+            min_x = min(e[0] for e in entries); max_x = max(e[0] for e in entries)
+            min_y = min(e[1] for e in entries); max_y = max(e[1] for e in entries)
+            w, h = (max_x - min_x) or 1.0, (max_y - min_y) or 1.0
+            entries.sort(key=lambda e: _hilbert(int(0xFFFF * (e[0] - min_x) / w),
+                                                int(0xFFFF * (e[1] - min_y) / h)))
+            envelope = [min_x, min_y, max_x, max_y]
+        else:
+            envelope = []
+        node_size = self.node_size if entries else 0
+
+        header = {
+            0: _Str(self.name),
+            2: ("B", GEOM_POINT),
+            7: _TableVec([{0: _Str(name), 1: ("B", ctype)} for name, ctype in (self.columns or [])]),
+            8: ("Q", len(entries)),
+            9: ("H", node_size),
+            10: {1: ("i", 4326)},
+        }
+        if envelope:
+            header[1] = _Vec("d", envelope)
+        header_fb = _finish(header)
+
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.out_path.open("wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header_fb)) + header_fb)
+            if entries:
+                f.write(self._index(entries))
+                for _, _, offset, size in entries:
+                    self._spool.seek(offset)
+                    f.write(self._spool.read(size))
+        self._spool.close()
+
+    def _index(self, entries) -> bytes:
+        bounds = _level_bounds(len(entries), self.node_size)
+        total = bounds[0][1]
+        nodes: list[list] = [None] * total
+        leaf_start = bounds[0][0]
+        feature_offset = 0
+        for i, (x, y, _, size) in enumerate(entries):
+            nodes[leaf_start + i] = [x, y, x, y, feature_offset]
+            feature_offset += size
+        for level in range(len(bounds) - 1):
+            start, end = bounds[level]
+            parent = bounds[level + 1][0]
+            pos = start
+            while pos < end:
+                node = [math.inf, math.inf, -math.inf, -math.inf, pos]
+                for _ in range(self.node_size):
+                    if pos >= end:
+                        break
+                    c = nodes[pos]
+                    node[0] = min(node[0], c[0]); node[1] = min(node[1], c[1])
+                    node[2] = max(node[2], c[2]); node[3] = max(node[3], c[3])
+                    pos += 1
+                nodes[parent] = node
+                parent += 1
+        return b"".join(struct.pack("<ddddQ", *n) for n in nodes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,38 +1,257 @@
 import json
+import sys
 from pathlib import Path
-from typing import Iterable, Any
+from typing import Callable, Iterable, Iterator, Any
+from ..models import json_default, plain
+from .jsonl_index import append_entry, build_index, index_path
+from .sinks import Sink
+from .timing import NULL_TIMER
 
 class AtomicWriter:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, timer=NULL_TIMER):
         self.path = path
+        self.timer = timer
 
     def write_json(self, obj: Any):
-        tmp = self.path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
-        tmp.replace(self.path)
-
-class JsonAccumulator:
-    """Keeps a growing list in memory and writes full JSON after each append."""
-    def __init__(self, out_path: Path):
-        self.out_path = out_path
-        self.data = {"results": []}
+        with self.timer.stage("serialize"):
+            text = json.dumps(obj, ensure_ascii=False, indent=2, default=json_default)
+        self.write_text(text)
+
+    def write_text(self, text: str):
+        with self.timer.stage("write"):
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            tmp.replace(self.path)
+
+def _results_text(blocks: list[str]) -> str:
+    """{"results": [...]} with one compact record (serialized block) per line."""
+    return '{"results": [\n' + ",\n".join(blocks) + "\n]}\n"
+
+class JsonAccumulator(Sink):
+    """
+    Keeps a growing {"results": [...]} output and rewrites the full JSON after each append.
+    Records are held as their serialized lines (plus id → position and datemodify), so
+    each append encodes only the new record, or nothing when the caller passes its line;
+    the file has one compact record per line, like a consolidated output.
+    Records are unique by id: an existing file is de-duplicated on load (last wins), and
+    appending a known id replaces it, or is a no-op if its line is unchanged.
+    """
+    def __init__(self, out_path: Path, timer=NULL_TIMER, seen=None):
+        self.out_path = self.path = out_path
+        self.seen = seen
+        self.blocks: list[str] = []
+        self.index: dict = {}
         if out_path.exists():
             try:
-                self.data = json.loads(out_path.read_text(encoding="utf-8"))
+                data = json.loads(out_path.read_text(encoding="utf-8"))
             except Exception:
-                self.data = {"results": []}
-        self.writer = AtomicWriter(out_path)
+                data = {"results": []}
+            for rec in data["results"]:
+                self._put(rec, self._block(rec))
+        self.writer = AtomicWriter(out_path, timer)
+
+    @staticmethod
+    def _block(item, line: bytes | None = None) -> str:
+        return line.decode("utf-8") if line is not None else json.dumps(item, ensure_ascii=False, default=json_default)
+
+    def _put(self, item, block: str):
+        key = item.get("id")
+        pos = self.index.get(key)
+        if pos is None:
+            self.index[key] = len(self.blocks)
+            self.blocks.append(block)
+        else:
+            self.blocks[pos] = block
 
-    def append_and_save(self, item: dict):
-        self.data["results"].append(item)
-        self.writer.write_json(self.data)
+    def append_and_save(self, item, line: bytes | None = None) -> bool:
+        key = item.get("id")
+        pos = self.index.get(key)
+        with self.writer.timer.stage("serialize"):
+            block = self._block(item, line)
+        # same line: nothing to write (a re-fetch after dead-lettered calls differs, so it replaces)
+        if pos is not None and self.blocks[pos] == block:
+            if self.seen is not None:  # e.g. a file written before the seen-set existed
+                self.seen.add(key, item.get("datemodify"))
+            return False
+        with self.writer.timer.stage("serialize"):
+            self._put(item, block)
+            text = _results_text(self.blocks)
+        self.writer.write_text(text)
+        if self.seen is not None:
+            self.seen.add(key, item.get("datemodify"))
+        return True
 
-class JsonlWriter:
-    """Stream each item as a JSON line (scale-friendly)."""
-    def __init__(self, out_path: Path):
-        self.out_path = out_path
+    write = append_and_save
+
+class JsonlWriter(Sink):
+    """
+    Stream each item as a JSON line (scale-friendly).
+    With a SeenSet, items already stored with the same datemodify are skipped; an edited
+    locality is appended again (readers keep the last line per id).
+    With index=True, an <file>.idx sidecar of id → (offset, length) is appended as well
+    (see mindat.utils.jsonl_index.JsonlReader for random access).
+    """
+    def __init__(self, out_path: Path, timer=NULL_TIMER, seen=None, index: bool = False):
+        self.out_path = self.path = out_path
         self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.timer = timer
+        self.seen = seen
+        self.index = index
+
+    def write_one(self, item: dict, line: bytes | None = None) -> bool:
+        """line: the item already serialised (no newline), e.g. by DownloadService."""
+        if self.seen is not None and self.seen.is_current(item.get("id"), item.get("datemodify")):
+            return False
+        if line is None:
+            with self.timer.stage("serialize"):
+                line = json.dumps(item, ensure_ascii=False, default=json_default).encode("utf-8")
+        with self.timer.stage("write"):
+            with self.out_path.open("ab") as f:
+                offset = f.tell()
+                f.write(line + b"\n")
+            if self.index:
+                append_entry(self.out_path, item.get("id"), offset, len(line))
+        if self.seen is not None:
+            self.seen.add(item.get("id"), item.get("datemodify"))
+        return True
+
+    write = write_one
+
+def patch_records(path: Path, patches: dict, on_patched: Callable[[dict], None] | None = None) -> int:
+    """
+    Merge patches ({id: {field: value}}) into the records of a JSON ({"results": [...]})
+    or JSONL output, rewriting the file atomically. Returns the number of records patched;
+    on_patched gets each patched record once the file is in place.
+    """
+    path = Path(path)
+    if not patches or not path.exists():
+        return 0
+    patches = {k: {f: plain(v) for f, v in p.items()} for k, p in patches.items() if p}
+    done = []
+    if path.suffix == ".jsonl":
+        tmp = path.with_suffix(".tmp")
+        try:
+            with path.open(encoding="utf-8") as src, tmp.open("w", encoding="utf-8") as dst:
+                for line in src:
+                    if line.strip():
+                        rec = json.loads(line)
+                        patch = patches.get(rec.get("id"))
+                        if patch:
+                            rec.update(patch); done.append(rec)
+                            line = json.dumps(rec, ensure_ascii=False, default=json_default) + "\n"
+                    dst.write(line)
+            tmp.replace(path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        if index_path(path).exists():
+            build_index(path)  # offsets moved
+    else:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        records = data["results"] if isinstance(data, dict) else data
+        for rec in records:
+            patch = patches.get(rec.get("id"))
+            if patch:
+                rec.update(patch); done.append(rec)
+        # the layout JsonAccumulator writes (and reloads), one compact record per line
+        blocks = [json.dumps(rec, ensure_ascii=False, default=json_default) for rec in records]
+        AtomicWriter(path).write_text(_results_text(blocks) if isinstance(data, dict)
+                                      else "[\n" + ",\n".join(blocks) + "\n]\n")
+    if on_patched is not None:
+        for rec in done:
+            on_patched(rec)
+    return len(done)
+
+class _JsonStream:
+    """Incremental decoding of one JSON document read in chunks (keeps only the unread tail)."""
+    def __init__(self, f, chunk: int):
+        self.f, self.chunk = f, chunk
+        self.buf, self.pos = "", 0
+        self.dec = json.JSONDecoder()
+
+    def _more(self) -> bool:
+        data = self.f.read(self.chunk)
+        self.buf, self.pos = self.buf[self.pos:] + data, 0
+        return bool(data)
+
+    def peek(self, skip: str = " \t\r\n") -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError(f"{self.f.name}: unexpected end of JSON")
+
+    def value(self) -> Any:
+        while True:
+            try:
+                obj, end = self.dec.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            if end == len(self.buf) and self._more():
+                continue  # a number may go on in the next chunk
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator[Any]:
+        """Items of the array at the cursor."""
+        self.pos += 1
+        while self.peek(" \t\r\n,") != "]":
+            yield self.value()
+        self.pos += 1
+
+def iter_jsonl(f) -> Iterator[dict]:
+    """Records of an open JSONL stream (text or binary, e.g. sys.stdin.buffer), a line at a time."""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def iter_records(path: Path, chunk: int = 1 << 20) -> Iterator[dict]:
+    """
+    Stream the records of a JSON ({"results": [...]} or a bare list) or JSONL output
+    without loading the whole file; memory is bounded by the largest single record.
+    """
+    path = Path(path)
+    with path.open(encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            yield from iter_jsonl(f)
+            return
+        js = _JsonStream(f, chunk)
+        if js.peek() == "[":
+            yield from js.items()
+            return
+        js.pos += 1  # {"results": [...], ...}: other keys are decoded and dropped
+        while js.peek(" \t\r\n,") != "}":
+            key = js.value()
+            js.peek(" \t\r\n:")
+            if key == "results":
+                yield from js.items()
+                return
+            js.value()
+
+def open_records(path: str | Path) -> Iterator[dict]:
+    """Records of a JSON/JSONL file, or of JSONL on stdin for "-" (pipeline stages)."""
+    if str(path) == "-":
+        return iter_jsonl(sys.stdin.buffer)
+    return iter_records(Path(path))
 
-    def write_one(self, item: dict):
-        with self.out_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+def write_jsonl(records: Iterable, path: str | Path) -> int:
+    """
+    Write records as JSON lines to a file, or to stdout for "-", as they arrive, so the
+    next stage of a pipe starts while this one is still running. Returns the count.
+    """
+    n = 0
+    f = sys.stdout.buffer if str(path) == "-" else Path(path).open("wb")
+    try:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False, default=json_default).encode("utf-8") + b"\n")
+            n += 1
+    finally:
+        if f is sys.stdout.buffer:
+            f.flush()
+        else:
+            f.close()
+    return n
@@ -0,0 +1,218 @@
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# sidecar header: magic, data bytes covered by the entries, the data file's mtime (ns) when
+# the header was written, first/last WINDOW bytes of the covered span
+HEADER = struct.Struct("<4sQq32s32s")
+MAGIC = b"JIX1"
+WINDOW = 32
+# sidecar entry: locality id, byte offset, byte length (newline excluded)
+ENTRY = struct.Struct("<qQI")
+
+def index_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".idx")
+
+def _header(buf, covered: int, mtime_ns: int) -> bytes:
+    """Header for buf[:covered]; a rewrite of the file changes its size, mtime or edge bytes."""
+    return HEADER.pack(MAGIC, covered, mtime_ns, bytes(buf[:min(WINDOW, covered)]),
+                       bytes(buf[max(0, covered - WINDOW):covered]))
+
+def _file_header(path: Path, covered: int) -> bytes:
+    with path.open("rb") as f:
+        head = f.read(min(WINDOW, covered))
+        f.seek(max(0, covered - WINDOW))
+        tail = f.read(min(WINDOW, covered))
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+    return HEADER.pack(MAGIC, covered, mtime_ns, head, tail)
+
+def append_entry(path: str | Path, loc_id, offset: int, length: int):
+    """
+    Called by JsonlWriter after each line of path: appends the entry (non-integer ids are
+    not indexed) and moves the header to the new end. Lines between the header's covered
+    end and offset (appended with the index off, or by another writer) are scanned in
+    first; entries past the covered end (a crash between the two writes) are dropped.
+    A missing, old-format or rewritten sidecar is rebuilt instead.
+    """
+    path = Path(path)
+    try:
+        f = index_path(path).open("r+b")
+    except FileNotFoundError:
+        build_index(path); return
+    with f:
+        raw = f.read(HEADER.size)
+        current = len(raw) == HEADER.size and raw.startswith(MAGIC)
+        if current:
+            _, covered, _, head, tail = HEADER.unpack(raw)
+            current = covered <= offset and HEADER.unpack(_file_header(path, covered))[3:] == (head, tail)
+        if current:
+            end = f.seek(0, 2)
+            while end > HEADER.size:
+                f.seek(end - ENTRY.size)
+                _, off, n = ENTRY.unpack(f.read(ENTRY.size))
+                if off + n + 1 <= covered:
+                    break
+                end -= ENTRY.size
+            f.truncate(end); f.seek(end)
+            if covered < offset:
+                with path.open("rb") as data, mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    f.write(b"".join(ENTRY.pack(*e) for e in _scan(buf, covered, offset)))
+            if isinstance(loc_id, int):
+                f.write(ENTRY.pack(loc_id, offset, length))
+            f.seek(0)
+            f.write(_file_header(path, offset + length + 1))
+    if not current:
+        build_index(path)
+
+def _scan(buf, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+    """(id, offset, length) for each record in buf[start:end]."""
+    pos = start
+    while pos < end:
+        nl = buf.find(b"\n", pos, end)
+        stop = end if nl < 0 else nl
+        if stop > pos:
+            try:
+                loc_id = json.loads(buf[pos:stop]).get("id")
+            except ValueError:
+                loc_id = None  # torn last line from a crash: not indexed
+            if isinstance(loc_id, int):
+                yield loc_id, pos, stop - pos
+        pos = stop + 1
+
+def build_index(path: str | Path) -> int:
+    """(Re)build the sidecar for an existing JSONL file; returns the number of entries."""
+    path = Path(path)
+    n = 0
+    tmp = index_path(path).with_name(index_path(path).name + ".tmp")
+    with path.open("rb") as f, tmp.open("wb") as out:
+        size = path.stat().st_size
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        out.write(_header(buf, size, os.fstat(f.fileno()).st_mtime_ns))
+        for loc_id, off, length in _scan(buf, 0, size):
+            out.write(ENTRY.pack(loc_id, off, length)); n += 1
+        if size:
+            buf.close()
+    tmp.replace(index_path(path))
+    return n
+
+class JsonlReader:
+    """
+    Random access into a JSONL file through its .idx sidecar and mmap:
+    get(id) is a dict lookup plus one ranged read (last line wins for repeated ids).
+    The sidecar header records how much of the file the entries cover, the file's mtime
+    and that span's first and last bytes: a partial sidecar is completed by scanning only
+    the uncovered tail, and one that no longer matches the file (rewritten) is rebuilt. splits(n)/iter_range() let parallel workers share a file on record
+    boundaries (no index needed).
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._f = self.path.open("rb")
+        st = os.fstat(self._f.fileno())
+        self.size, self._mtime_ns = st.st_size, st.st_mtime_ns
+        self.buf = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offsets: dict[int, tuple[int, int]] = {}
+        self._load_index()
+
+    def _load_index(self):
+        idx = index_path(self.path)
+        raw = idx.read_bytes() if idx.exists() else b""
+        loaded = self._read_entries(raw)
+        if loaded is None:
+            # missing, old-format, or the file was rewritten under the index: start over
+            self.offsets.clear()
+            build_index(self.path)
+            raw = idx.read_bytes()
+            loaded = self._read_entries(raw)
+        covered, kept, mtime_ns = loaded
+        if covered < self.size or len(raw) != HEADER.size + kept * ENTRY.size or mtime_ns != self._mtime_ns:
+            # lines appended after the last index write: re-index only that tail
+            with idx.open("r+b") as out:
+                out.truncate(HEADER.size + kept * ENTRY.size)
+                out.seek(0, 2)
+                for loc_id, off, length in _scan(self.buf, covered, self.size):
+                    self.offsets[loc_id] = (off, length)
+                    out.write(ENTRY.pack(loc_id, off, length))
+                out.seek(0)
+                out.write(_header(self.buf, self.size, self._mtime_ns))
+
+    def _read_entries(self, raw: bytes) -> tuple[int, int, int] | None:
+        """
+        Load the entries the header vouches for: (bytes covered, entries kept, header mtime),
+        or None when the sidecar cannot be trusted.
+        """
+        if len(raw) < HEADER.size or not raw.startswith(MAGIC):
+            return None
+        _, covered, mtime_ns, _, _ = HEADER.unpack_from(raw)
+        if covered > self.size or raw[:HEADER.size] != _header(self.buf, covered, mtime_ns):
+            return None
+        n = (len(raw) - HEADER.size) // ENTRY.size
+        spans = []
+        for loc_id, off, length in ENTRY.iter_unpack(raw[HEADER.size:HEADER.size + n * ENTRY.size]):
+            if off + length + 1 > covered:
+                break  # written after the header was last moved (crash between the two writes)
+            spans.append((loc_id, off, length))
+        if mtime_ns != self._mtime_ns:
+            # modified since the header was written: besides an append, the edges could
+            # have survived a rewrite, so every span must still be exactly one line
+            buf = self.buf
+            if any(buf[off:off + 1] != b"{" or buf[off + length:off + length + 1] != b"\n"
+                   for _, off, length in spans):
+                return None
+        for loc_id, off, length in spans:
+            self.offsets[loc_id] = (off, length)
+        return covered, len(spans), mtime_ns
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, loc_id) -> bool:
+        return loc_id in self.offsets
+
+    def ids(self) -> Iterable[int]:
+        return self.offsets.keys()
+
+    def get_raw(self, loc_id: int) -> bytes | None:
+        span = self.offsets.get(loc_id)
+        return None if span is None else self.buf[span[0]:span[0] + span[1]]
+
+    def get(self, loc_id: int) -> dict | None:
+        raw = self.get_raw(loc_id)
+        return None if raw is None else json.loads(raw)
+
+    def get_many(self, ids: Iterable[int]) -> dict[int, dict]:
+        """Ranged reads in file order (sequential I/O on large files)."""
+        spans = sorted((self.offsets[i], i) for i in ids if i in self.offsets)
+        return {i: json.loads(self.buf[off:off + length]) for (off, length), i in spans}
+
+    def splits(self, n: int) -> list[tuple[int, int]]:
+        """n byte ranges covering the file, each starting and ending on a record boundary."""
+        cuts = [0]
+        for k in range(1, n):
+            nl = self.buf.find(b"\n", max(cuts[-1], self.size * k // n))
+            cuts.append(self.size if nl < 0 else nl + 1)
+        cuts.append(self.size)
+        return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+    def iter_range(self, start: int, end: int) -> Iterator[dict]:
+        pos = start
+        while pos < end:
+            nl = self.buf.find(b"\n", pos, end)
+            stop = end if nl < 0 else nl
+            if stop > pos:
+                yield json.loads(self.buf[pos:stop])
+            pos = stop + 1
+
+    def close(self):
+        if self.size:
+            self.buf.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,3 +1,4 @@
+import json
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -13,3 +14,19 @@ def setup_logger(name="mindat", out_dir="mindat_data") -> logging.Logger:
     ch = logging.StreamHandler()
     ch.setFormatter(fmt); log.addHandler(ch)
     return log
+
+def run_log_path(log: logging.Logger) -> Path | None:
+    """Path of the run_*.log file attached by setup_logger, if any."""
+    for h in log.handlers:
+        if isinstance(h, logging.FileHandler):
+            return Path(h.baseFilename)
+    return None
+
+def write_run_summary(log: logging.Logger, suffix: str, obj) -> Path | None:
+    """Write obj as JSON next to the run log, e.g. run_20250101_120000.metrics.json"""
+    p = run_log_path(log)
+    if p is None:
+        return None
+    out = p.with_suffix(f".{suffix}.json")
+    out.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+    return out
@@ -0,0 +1,81 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def profile_stem(out_dir: str | Path, name: str) -> Path:
+    """out_dir/profile_{name}_{timestamp} — report base name for scripts without a run log."""
+    return Path(out_dir) / f"profile_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+@contextmanager
+def profiled(stem: str | Path, enabled: bool = True, top: int = 30):
+    """
+    Profile the enclosed block with cProfile and tracemalloc and write
+    <stem>.prof (load with pstats/snakeviz) and <stem>.profile.txt
+    (top functions by cumulative time, allocation sites that grew most over the
+    block, peak RSS). Allocations are a diff of snapshots taken at entry and exit,
+    so memory that was allocated before the block or freed within it is left out.
+    """
+    if not enabled:
+        yield None
+        return
+    stem = Path(stem); stem.parent.mkdir(parents=True, exist_ok=True)
+    prof = cProfile.Profile()
+    tracemalloc.start(10)
+    start = _snapshot()
+    t0 = time.perf_counter()
+    prof.enable()
+    try:
+        yield stem
+    finally:
+        prof.disable()
+        wall = time.perf_counter() - t0
+        growth = _snapshot().compare_to(start, "lineno")  # biggest change first
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        prof_path = stem.parent / f"{stem.name}.prof"
+        txt_path = stem.parent / f"{stem.name}.profile.txt"
+        prof.dump_stats(str(prof_path))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).strip_dirs().sort_stats("cumulative").print_stats(top)
+        rss = peak_rss_mb()
+        lines = [
+            f"Profile: {stem.name}",
+            f"Wall time: {wall:.2f}s",
+            f"Peak RSS: {rss:.1f} MB" if rss is not None else "Peak RSS: n/a",
+            f"Peak traced Python memory: {traced_peak / 1e6:.1f} MB",
+            "",
+            f"Top {top} allocation sites by growth during the run (tracemalloc, exit vs entry):",
+        ]
+        for stat in growth[:top]:
+            lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB  {stat.count_diff:+8} blocks"
+                         f"  (now {stat.size / 1024:.1f} KiB)  {stat.traceback}")
+        lines += ["", "cProfile (cumulative):", buf.getvalue()]
+        txt_path.write_text("\n".join(lines), encoding="utf-8")
+        print(f"Profile written → {txt_path} ({prof_path.name})", file=sys.stderr)
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+def profile_context(enabled: bool, out_dir: str | Path, name: str):
+    """profiled() under profile_stem(out_dir, name) — the scripts' --profile/--profile-dir; no-op unless enabled."""
+    return profiled(profile_stem(out_dir, name), enabled=enabled)
@@ -0,0 +1,40 @@
+import sqlite3
+from pathlib import Path
+
+class SeenSet:
+    """
+    Persistent set of stored localities: id → datemodify in one SQLite table (a single
+    integer-keyed B-tree row per locality, shared by all runs and countries).
+    A locality is current when it was stored with the same datemodify; a different
+    datemodify means Mindat edited it since, so it is fetched and stored again.
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=30.0)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (id INTEGER PRIMARY KEY, datemodify TEXT)")
+        self.db.commit()
+
+    def is_current(self, loc_id, datemodify: str | None = None) -> bool:
+        row = self.db.execute("SELECT datemodify FROM seen WHERE id = ?", (int(loc_id),)).fetchone()
+        return row is not None and (datemodify is None or row[0] == datemodify)
+
+    def add(self, loc_id, datemodify: str | None = None):
+        # committed per item: callers mark only after the record is on disk
+        self.db.execute("INSERT OR REPLACE INTO seen(id, datemodify) VALUES (?, ?)", (int(loc_id), datemodify))
+        self.db.commit()
+
+    def discard(self, loc_id):
+        """Forget a locality, so the next run fetches it again (e.g. some of its calls failed)."""
+        self.db.execute("DELETE FROM seen WHERE id = ?", (int(loc_id),))
+        self.db.commit()
+
+    def __contains__(self, loc_id) -> bool:
+        return self.is_current(loc_id)
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        self.db.close()
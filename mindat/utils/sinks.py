@@ -0,0 +1,165 @@
+import json
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+
+class Sink:
+    """
+    One output of a download run. DownloadService serialises each record once and hands
+    every sink the record and that JSON line (UTF-8 bytes, no newline), so extra artifacts
+    come out of the same crawl pass instead of a re-read of the output afterwards.
+    write() returns whether the record was stored; close() finishes the artifact.
+    """
+    path: Path | None = None
+
+    def write(self, item, line: bytes) -> bool:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class ThreadedSink(Sink):
+    """
+    Runs another sink on its own writer thread behind a bounded queue, so a slow sink
+    overlaps with the crawl and back-pressures it only when maxsize records are pending.
+    The first error in the writer is re-raised by the next write() or by close().
+    """
+    _STOP = object()
+
+    def __init__(self, sink: Sink, maxsize: int = 1024):
+        self.sink, self.path = sink, sink.path
+        self.error: BaseException | None = None
+        self._q: queue.Queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name=f"sink-{type(sink).__name__}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._q.get()
+            if job is self._STOP:
+                break
+            if self.error is None:
+                try:
+                    self.sink.write(*job)
+                except BaseException as e:
+                    self.error = e
+        try:
+            self.sink.close()  # on this thread too: sqlite connections are per thread
+        except BaseException as e:
+            self.error = self.error or e
+
+    def write(self, item, line: bytes) -> bool:
+        if self.error is not None:
+            raise self.error
+        self._q.put((item, line))
+        return True
+
+    def close(self):
+        self._q.put(self._STOP)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+class StreamSink(Sink):
+    """JSON lines to a binary stream, e.g. sys.stdout.buffer for `mindat download --stdout | mindat clean`."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, item, line: bytes) -> bool:
+        self.stream.write(line + b"\n")
+        return True
+
+    def close(self):
+        self.stream.flush()
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS localities (
+    id          INTEGER PRIMARY KEY,
+    txt         TEXT,
+    country     TEXT,
+    latitude    REAL,
+    longitude   REAL,
+    datemodify  TEXT,
+    record      TEXT NOT NULL      -- the full JSON line
+);
+CREATE INDEX IF NOT EXISTS localities_country ON localities(country);
+"""
+
+class SqliteSink(Sink):
+    """Upserts each record into a queryable SQLite table (WAL, batched commits)."""
+    def __init__(self, path: str | Path, commit_every: int = 500):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self._db = None  # opened by the thread that writes
+        self._pending = 0
+
+    def write(self, item, line: bytes) -> bool:
+        if self._db is None:
+            self._db = sqlite3.connect(str(self.path), timeout=30.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SQLITE_SCHEMA)
+        self._db.execute(
+            "INSERT OR REPLACE INTO localities(id, txt, country, latitude, longitude, datemodify, record)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (item.get("id"), item.get("txt"), item.get("country"), item.get("latitude"),
+             item.get("longitude"), item.get("datemodify"), line.decode("utf-8")))
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._db.commit(); self._pending = 0
+        return True
+
+    def close(self):
+        if self._db is not None:
+            self._db.commit(); self._db.close(); self._db = None
+
+class GeoJsonSink(Sink):
+    """
+    A point FeatureCollection for the map (localities without coordinates are left out).
+    Features are upserted by id, like SqliteSink rows: those of an existing file are kept
+    unless replaced, so a run that skips unchanged records (seen-set) keeps them, and a
+    record written again (e.g. patched by the dead-letter retry) replaces its feature.
+    Written to <path>.tmp on close and renamed, so a crashed run never leaves a truncated file.
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._features = self._load(self.path)  # id → feature, previous file first
+        self._closed = False
+
+    @staticmethod
+    def _load(path: Path) -> dict:
+        if not path.exists():
+            return {}
+        try:
+            features = json.loads(path.read_text(encoding="utf-8")).get("features") or []
+        except (ValueError, AttributeError):
+            return {}
+        return {f.get("properties", {}).get("id"): f for f in features}
+
+    def write(self, item, line: bytes) -> bool:
+        lat, lon = item.get("latitude"), item.get("longitude")
+        if not lat or not lon:
+            self._features.pop(item.get("id"), None)  # no longer mappable
+            return False
+        elements = item.get("elements") or ""
+        detail = item.get("detail")
+        gms = (detail.get("geomaterials") if detail is not None else None) or item.get("geomaterials") or []
+        feature = {"type": "Feature",
+                   "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+                   "properties": {"id": item.get("id"), "longid": item.get("longid"), "name": item.get("txt"),
+                                  "country": item.get("country"),
+                                  "elements": [e for e in elements.strip("-").split("-") if e],
+                                  "geomaterial_count": len(gms), "date_modified": item.get("datemodify")}}
+        self._features[item.get("id")] = feature
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write('{"type": "FeatureCollection", "features": [')
+            f.write(",".join("\n" + json.dumps(ft, ensure_ascii=False) for ft in self._features.values()))
+            f.write("\n]}\n")
+        tmp.replace(self.path)
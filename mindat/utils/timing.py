@@ -0,0 +1,79 @@
+import heapq
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+class StageTimer:
+    """
+    Accumulates wall and CPU time per pipeline stage and per locality.
+    Use `with timer.stage("detail"): ...`; nested stages are counted in both.
+    """
+    def __init__(self, keep_slowest: int = 10):
+        self.wall: dict[str, float] = defaultdict(float)
+        self.cpu: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self.keep_slowest = keep_slowest
+        self._slowest: list[tuple[float, object]] = []  # min-heap of (wall, locality id)
+        self.localities = 0
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.wall[name] += time.perf_counter() - w0
+            self.cpu[name] += time.thread_time() - c0
+            self.calls[name] += 1
+
+    def add_locality(self, loc_id, seconds: float):
+        self.localities += 1
+        item = (seconds, loc_id)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> list[tuple[float, object]]:
+        return sorted(self._slowest, reverse=True)
+
+    def dominant(self) -> str | None:
+        return max(self.wall, key=self.wall.get) if self.wall else None
+
+    def summary(self) -> dict:
+        total = time.perf_counter() - self.started
+        return {
+            "total_wall_s": total,
+            "localities": self.localities,
+            "stages": {
+                k: {"wall_s": self.wall[k], "cpu_s": self.cpu[k], "calls": self.calls[k],
+                    "share": self.wall[k] / total if total else 0.0}
+                for k in sorted(self.wall, key=self.wall.get, reverse=True)
+            },
+            "dominant_stage": self.dominant(),
+            "slowest_localities": [{"id": i, "wall_s": s} for s, i in self.slowest()],
+        }
+
+    def report(self) -> str:
+        s = self.summary()
+        lines = [f"Stage breakdown ({s['localities']} localities, {s['total_wall_s']:.1f}s wall):",
+                 f"  {'stage':<12}{'wall s':>10}{'cpu s':>10}{'calls':>8}{'share':>8}"]
+        for name, st in s["stages"].items():
+            lines.append(f"  {name:<12}{st['wall_s']:>10.2f}{st['cpu_s']:>10.2f}{st['calls']:>8}{st['share']:>8.0%}")
+        if s["dominant_stage"]:
+            lines.append(f"  dominant stage: {s['dominant_stage']}")
+        if s["slowest_localities"]:
+            lines.append("  slowest localities: " + ", ".join(
+                f"{x['id']} ({x['wall_s']:.2f}s)" for x in s["slowest_localities"]))
+        return "\n".join(lines)
+
+class NullTimer:
+    """Drop-in for StageTimer when timing is not wanted."""
+    def stage(self, name: str):
+        return nullcontext()
+
+    def add_locality(self, loc_id, seconds: float):
+        pass
+
+NULL_TIMER = NullTimer()
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+@dataclass
+class Task:
+    id: int
+    payload: dict
+    attempts: int
+
+class WorkQueue:
+    """
+    Lease-based work queue of localities (pluggable backend; see SqliteWorkQueue).
+
+    Contract:
+    - put() is idempotent per id, so re-seeding never duplicates work.
+    - claim() hands out up to n tasks that are pending or whose lease expired, leased to `worker`.
+      With max_attempts, an expired task that already had that many attempts (e.g. one
+      that crashes every worker) is parked as failed instead of handed out again.
+    - complete() stores the result and acks in one step, and only if `worker` still holds
+      the lease; a worker whose lease expired and was re-claimed gets False and must drop it.
+    - fail() releases the task for another attempt, or parks it as failed after max_attempts.
+    """
+    def put(self, items: Iterable[dict]) -> int:
+        raise NotImplementedError
+
+    def claim(self, worker: str, n: int, lease_seconds: float, max_attempts: int | None = None) -> list[Task]:
+        raise NotImplementedError
+
+    def extend(self, worker: str, task_ids: list[int], lease_seconds: float) -> int:
+        raise NotImplementedError
+
+    def complete(self, worker: str, task_id: int, result: dict) -> bool:
+        raise NotImplementedError
+
+    def fail(self, worker: str, task_id: int, error: str, max_attempts: int) -> bool:
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, int]:
+        raise NotImplementedError
+
+    def results(self) -> Iterator[dict]:
+        raise NotImplementedError
+
+    def close(self): ...
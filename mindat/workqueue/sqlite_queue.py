@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+from ..models import json_default
+from .base import Task, WorkQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id            INTEGER PRIMARY KEY,
+    payload       TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+    lease_owner   TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result        TEXT,
+    error         TEXT,
+    updated       REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks(state, lease_expires);
+"""
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    WorkQueue on a single SQLite file (WAL). Any number of local processes can share it;
+    SQLite's file lock serialises claims, and BEGIN IMMEDIATE makes claim atomic.
+    For several machines, put the file on storage with working POSIX locks or plug in another backend.
+    """
+    def __init__(self, path: str | Path, busy_timeout: float = 30.0):
+        self.path = Path(path); self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=busy_timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def _tx(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def put(self, items: Iterable[dict], batch: int = 500) -> int:
+        added, rows = 0, []
+        for it in items:
+            rows.append((int(it["id"]), json.dumps(it, ensure_ascii=False, default=json_default), time.time()))
+            if len(rows) >= batch:
+                added += self._insert(rows); rows = []
+        if rows:
+            added += self._insert(rows)
+        return added
+
+    def _insert(self, rows) -> int:
+        db = self._tx()
+        try:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tasks(id, payload, updated) VALUES (?, ?, ?)", rows)
+            db.execute("COMMIT")
+            return db.total_changes - before
+        except BaseException:
+            db.execute("ROLLBACK"); raise
+
+    def claim(self, worker: str, n: int, lease_seconds: float, max_attempts: int | None = None) -> list[Task]:
+        now = time.time()
+        db = self._tx()
+        try:
+            if max_attempts is not None:
+                # an expired lease that used up its attempts: the task keeps killing workers, park it
+                db.execute(
+                    "UPDATE tasks SET state = 'failed', error = COALESCE(error, 'lease expired'),"
+                    " lease_owner = NULL, lease_expires = NULL, updated = ?"
+                    " WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                    (now, now, max_attempts))
+            # other expired leases are simply claimable again: a crashed worker's batch is re-queued here
+            rows = db.execute(
+                "SELECT id, payload, attempts FROM tasks"
+                " WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?)"
+                " ORDER BY id LIMIT ?", (now, n)).fetchall()
+            db.executemany(
+                "UPDATE tasks SET state = 'leased', lease_owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated = ? WHERE id = ?",
+                [(worker, now + lease_seconds, now, r[0]) for r in rows])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK"); raise
+        return [Task(r[0], json.loads(r[1]), r[2] + 1) for r in rows]
+
+    def extend(self, worker: str, task_ids: list[int], lease_seconds: float) -> int:
+        now = time.time()
+        cur = self.db.executemany(
+            "UPDATE tasks SET lease_expires = ?, updated = ?"
+            " WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            [(now + lease_seconds, now, i, worker) for i in task_ids])
+        return cur.rowcount
+
+    def complete(self, worker: str, task_id: int, result: dict) -> bool:
+        cur = self.db.execute(
+            "UPDATE tasks SET state = 'done', result = ?, error = NULL, lease_owner = NULL,"
+            " lease_expires = NULL, updated = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (json.dumps(result, ensure_ascii=False, default=json_default), time.time(), task_id, worker))
+        return cur.rowcount == 1
+
+    def fail(self, worker: str, task_id: int, error: str, max_attempts: int) -> bool:
+        cur = self.db.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " error = ?, lease_owner = NULL, lease_expires = NULL, updated = ?"
+            " WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (max_attempts, error, time.time(), task_id, worker))
+        return cur.rowcount == 1
+
+    def stats(self) -> dict[str, int]:
+        now = time.time()
+        out = {"pending": 0, "leased": 0, "expired": 0, "done": 0, "failed": 0}
+        for state, expired, n in self.db.execute(
+                "SELECT state, state = 'leased' AND lease_expires < ?, COUNT(*) FROM tasks GROUP BY 1, 2", (now,)):
+            out["expired" if expired else state] += n
+        return out
+
+    def results(self) -> Iterator[dict]:
+        for (text,) in self.db.execute("SELECT result FROM tasks WHERE state = 'done' ORDER BY id"):
+            yield json.loads(text)
+
+    def close(self):
+        self.db.close()
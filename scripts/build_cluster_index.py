@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Precompute a zoom-level point-cluster index for the Leaflet mines map.
+
+Reads a GeoJSON FeatureCollection produced by to_leaflet_geojson.py and builds a
+hierarchical cluster tree (the same greedy radius clustering supercluster does),
+then writes one small JSON file per zoom/tile so the page only fetches what is visible:
+
+  <out>/index.json          zoom range, radius, bounds and the list of non-empty tiles
+  <out>/{z}/{x}/{y}.json    FeatureCollection of clusters and single points in that tile
+
+Zooms minZoom..maxZoom hold clusters and single points. No tiles are written above maxZoom:
+the page overzooms the maxZoom tiles, where each cluster also lists its points ("leaves"),
+so they can be shown there without a tile per point.
+Compact input (to_leaflet_geojson.py --compact) is decoded first, so tiles hold plain strings.
+
+Usage examples:
+  python scripts/build_cluster_index.py \
+    --in scripts/iran_mines.geojson \
+    --out mbtiles/clusters
+
+Options:
+  --min-zoom / --max-zoom   Zoom range to cluster (default 0..16)
+  --radius                  Cluster radius in pixels (default 40)
+  --extent                  Tile extent the radius is relative to (default 512)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Properties kept on single points in cluster tiles; the rest stays in the source GeoJSON.
+POINT_PROPERTIES = (
+    "id", "name", "country", "locality_type", "element_count", "geomaterial_count",
+    "importance_score", "importance_level", "popupContent", "markerStyle",
+)
+# Kept as well when a point has no popupContent (compact input): the page builds its popup from them.
+POPUP_PROPERTIES = ("elements", "geomaterial_names", "description")
+
+
+def lng_x(lng: float) -> float:
+    return lng / 360.0 + 0.5
+
+
+def lat_y(lat: float) -> float:
+    s = math.sin(lat * math.pi / 180.0)
+    y = 0.5 - 0.25 * math.log((1 + s) / (1 - s)) / math.pi
+    return min(max(y, 0.0), 1.0)
+
+
+def x_lng(x: float) -> float:
+    return (x - 0.5) * 360.0
+
+
+def y_lat(y: float) -> float:
+    y2 = (180.0 - y * 360.0) * math.pi / 180.0
+    return 360.0 * math.atan(math.exp(y2)) / math.pi - 90.0
+
+
+class _Node:
+    """A point or cluster at one zoom level, in projected [0, 1] coordinates."""
+    __slots__ = ("x", "y", "count", "id", "props", "zoom", "expansion_zoom", "leaves")
+
+    def __init__(self, x: float, y: float, count: int, id: int,
+                 props: Optional[Dict[str, Any]] = None, expansion_zoom: Optional[int] = None,
+                 leaves: Optional[List["_Node"]] = None):
+        self.x, self.y, self.count, self.id = x, y, count, id
+        self.props = props
+        self.zoom = math.inf  # last zoom this node was visited at
+        self.expansion_zoom = expansion_zoom
+        self.leaves = leaves  # the points of a maxZoom cluster (shown when overzoomed)
+
+
+class ClusterIndex:
+    def __init__(self, min_zoom: int = 0, max_zoom: int = 16, radius: int = 40, extent: int = 512):
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        self.radius, self.extent = radius, extent
+        self.levels: Dict[int, List[_Node]] = {}
+        self._next_id = 0
+
+    def load(self, features: List[Dict[str, Any]]) -> "ClusterIndex":
+        points: List[_Node] = []
+        for i, feat in enumerate(features):
+            geom = feat.get("geometry") or {}
+            if geom.get("type") != "Point":
+                continue
+            lng, lat = geom["coordinates"][:2]
+            points.append(_Node(lng_x(lng), lat_y(lat), 1, i, props=feat.get("properties") or {}))
+        self._next_id = len(features)
+
+        self.levels[self.max_zoom + 1] = points
+        nodes = points
+        for z in range(self.max_zoom, self.min_zoom - 1, -1):
+            nodes = self._cluster(nodes, z)
+            self.levels[z] = nodes
+        return self
+
+    def _cluster(self, nodes: List[_Node], zoom: int) -> List[_Node]:
+        r = self.radius / (self.extent * (2 ** zoom))
+        grid: Dict[tuple, List[int]] = defaultdict(list)
+        for i, n in enumerate(nodes):
+            grid[(int(n.x / r), int(n.y / r))].append(i)
+
+        out: List[_Node] = []
+        r2 = r * r
+        for n in nodes:
+            if n.zoom <= zoom:
+                continue
+            n.zoom = zoom
+            cx, cy = int(n.x / r), int(n.y / r)
+            neighbours = []
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for j in grid.get((gx, gy), ()):
+                        m = nodes[j]
+                        if m.zoom > zoom and (m.x - n.x) ** 2 + (m.y - n.y) ** 2 <= r2:
+                            neighbours.append(m)
+            if not neighbours:
+                out.append(n)
+                continue
+
+            wx, wy, count = n.x * n.count, n.y * n.count, n.count
+            cluster_id = self._next_id
+            self._next_id += 1
+            for m in neighbours:
+                m.zoom = zoom
+                wx += m.x * m.count
+                wy += m.y * m.count
+                count += m.count
+            leaves = [n] + neighbours if zoom == self.max_zoom else None
+            out.append(_Node(wx / count, wy / count, count, cluster_id, expansion_zoom=zoom + 1, leaves=leaves))
+        return out
+
+    def tiles(self, zoom: int) -> Dict[tuple, List[Dict[str, Any]]]:
+        """Group the nodes of one zoom level into GeoJSON features per tile."""
+        z2 = 2 ** zoom
+        out: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for n in self.levels[zoom]:
+            tx, ty = min(int(n.x * z2), z2 - 1), min(int(n.y * z2), z2 - 1)
+            out[(tx, ty)].append(self._feature(n))
+        return out
+
+    @classmethod
+    def _feature(cls, n: _Node) -> Dict[str, Any]:
+        coords = [round(x_lng(n.x), 6), round(y_lat(n.y), 6)]
+        if n.props is not None:
+            keep = POINT_PROPERTIES if "popupContent" in n.props else POINT_PROPERTIES + POPUP_PROPERTIES
+            props = {k: n.props[k] for k in keep if k in n.props}
+        else:
+            abbrev = f"{round(n.count / 1000)}k" if n.count >= 10000 else (
+                f"{round(n.count / 100) / 10}k" if n.count >= 1000 else n.count)
+            props = {
+                "cluster": True,
+                "cluster_id": n.id,
+                "point_count": n.count,
+                "point_count_abbreviated": abbrev,
+                "expansion_zoom": n.expansion_zoom,
+            }
+            if n.leaves:
+                props["leaves"] = [cls._feature(m) for m in n.leaves]
+        return {"type": "Feature", "geometry": {"type": "Point", "coordinates": coords}, "properties": props}
+
+    def write(self, out_dir: Path) -> Dict[str, Any]:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        tile_list: Dict[str, List[List[int]]] = {}
+        for z in range(self.min_zoom, self.max_zoom + 1):
+            tiles = self.tiles(z)
+            tile_list[str(z)] = sorted([x, y] for x, y in tiles)
+            for (x, y), feats in tiles.items():
+                p = out_dir / str(z) / str(x) / f"{y}.json"
+                p.parent.mkdir(parents=True, exist_ok=True)
+                p.write_text(json.dumps({"type": "FeatureCollection", "features": feats},
+                                        ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+        leaves = self.levels[self.max_zoom + 1]
+        bounds = None
+        if leaves:
+            lngs = [x_lng(n.x) for n in leaves]
+            lats = [y_lat(n.y) for n in leaves]
+            bounds = [min(lngs), min(lats), max(lngs), max(lats)]
+        index = {
+            "minZoom": self.min_zoom,
+            "maxZoom": self.max_zoom,
+            "radius": self.radius,
+            "extent": self.extent,
+            "total_points": len(leaves),
+            "bounds": bounds,
+            "tiles": tile_list,
+        }
+        (out_dir / "index.json").write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        return index
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("build-cluster-index")
+    ap.add_argument("--in", dest="inp", required=True, help="Path to input GeoJSON FeatureCollection")
+    ap.add_argument("--out", dest="out", required=True, help="Output directory for index.json and tiles")
+    ap.add_argument("--min-zoom", type=int, default=0)
+    ap.add_argument("--max-zoom", type=int, default=16)
+    ap.add_argument("--radius", type=int, default=40, help="Cluster radius in pixels")
+    ap.add_argument("--extent", type=int, default=512, help="Tile extent the radius is relative to")
+    args = ap.parse_args()
+
+    inp = Path(args.inp)
+    if not inp.exists():
+        raise SystemExit(f"Input file not found: {inp}")
+    data = json.loads(inp.read_text(encoding="utf-8"))
+    if not isinstance(data, dict) or not isinstance(data.get("features"), list):
+        raise SystemExit("Unsupported input. Expected a GeoJSON FeatureCollection.")
+    if (data.get("metadata") or {}).get("compact"):
+        # to_leaflet_geojson.py --compact: dictionary indices back to strings before tiling
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from to_leaflet_geojson import decode_compact
+        decode_compact(data)
+
+    index = ClusterIndex(args.min_zoom, args.max_zoom, args.radius, args.extent).load(data["features"])
+    summary = index.write(Path(args.out))
+    n_tiles = sum(len(v) for v in summary["tiles"].values())
+    print(f"Wrote {n_tiles} tiles for {summary['total_points']} points → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
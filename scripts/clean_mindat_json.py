@@ -10,7 +10,12 @@ Usage examples:
     --in mindat_data/Iran_Mine_enriched.json \
     --out mindat_data/Iran_Mine_enriched_clean.json
 
+  # pipeline stage: JSONL on stdin → JSONL on stdout, one record at a time
+  mindat download --country Iran --stdout | python scripts/clean_mindat_json.py | mindat merge
+
 Options:
+  --profile               Write cProfile/tracemalloc/peak-RSS reports into --profile-dir
+                          (default: the output file's directory)
   --prefer {nested,top}   When a flattened key collides with an existing key, prefer value
                           coming from the nested dict ('nested') or existing/top-level ('top').
                           Default: nested
@@ -18,14 +23,21 @@ Options:
 Input formats supported:
 - JSON object with a top-level {"results": [...]} list (default output of this repo when format=json)
 - JSON array of objects
+- JSONL, with --in - (stdin; the default)
 Output format mirrors input: if input had "results", output will too; otherwise a JSON array.
+When either side is "-", records are streamed and the output is JSONL.
 """
 from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: the mindat package
+from mindat.utils.io import open_records, write_jsonl
+from mindat.utils.profiling import profile_context
 
 
 def is_empty_value(v: Any) -> bool:
@@ -101,24 +113,41 @@ def clean_records(recs: Iterable[Dict[str, Any]], prefer_nested: bool = True) ->
     return [clean_record(r, prefer_nested=prefer_nested) for r in recs]
 
 
+def iter_clean(recs: Iterable[Dict[str, Any]], prefer_nested: bool = True) -> Iterator[Dict[str, Any]]:
+    for r in recs:
+        yield clean_record(r, prefer_nested=prefer_nested)
+
+
 def main() -> None:
     ap = argparse.ArgumentParser("clean-mindat-json")
-    ap.add_argument("--in", dest="inp", required=True, help="Path to input JSON file")
-    ap.add_argument("--out", dest="out", required=True, help="Path to output JSON file")
+    ap.add_argument("--in", dest="inp", default="-", help="Path to input JSON file, or - for JSONL on stdin")
+    ap.add_argument("--out", dest="out", default="-", help="Path to output JSON file, or - for JSONL on stdout")
     ap.add_argument("--prefer", choices=["nested", "top"], default="nested",
                     help="When flattened keys collide, prefer nested or existing/top-level value")
+    ap.add_argument("--profile", action="store_true", help="Write profiling reports for this run")
+    ap.add_argument("--profile-dir", default=None, help="Where to write profiling reports")
     args = ap.parse_args()
 
+    prefer_nested = args.prefer == "nested"
+    if "-" in (args.inp, args.out):
+        with profile_context(args.profile, args.profile_dir or ".", "clean"):
+            n = write_jsonl(iter_clean(open_records(args.inp), prefer_nested), args.out)
+        print(f"Cleaned {n} records → {'stdout' if args.out == '-' else args.out}", file=sys.stderr)
+        return
+
     inp = Path(args.inp)
     outp = Path(args.out)
     if not inp.exists():
         raise SystemExit(f"Input file not found: {inp}")
 
+    with profile_context(args.profile, args.profile_dir or str(outp.parent), "clean"):
+        run(inp, outp, prefer_nested=prefer_nested)
+
+
+def run(inp: Path, outp: Path, prefer_nested: bool = True) -> None:
     raw_text = inp.read_text(encoding="utf-8")
     data = json.loads(raw_text)
 
-    prefer_nested = args.prefer == "nested"
-
     if isinstance(data, dict) and isinstance(data.get("results"), list):
         cleaned = clean_records(data["results"], prefer_nested=prefer_nested)
         out_data = {"results": cleaned}
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Export mine localities to an MBTiles (SQLite) vector tileset and serve it locally.
+
+Input is either the GeoJSON written by to_leaflet_geojson.py or the merged locality
+data (list or {"results": [...]}); merged data is scored with GeoJSONConverter first.
+
+Per zoom level the exporter:
+- Thins features: below --full-zoom only the highest importance_score locality per
+  grid cell is kept and each tile is capped at --max-per-tile features.
+- Prunes attributes: below --detail-zoom only id/name/importance are kept.
+- Buffers tiles: a kept point near a tile edge is also written, outside the extent,
+  into the neighbouring tiles within --buffer, so its marker is not clipped there.
+- Deduplicates tiles: identical tile blobs are stored once (map + images schema).
+
+Usage examples:
+  python scripts/export_mbtiles.py build \
+    --in scripts/iran_mines.geojson \
+    --out mbtiles/mines.mbtiles
+
+  python scripts/export_mbtiles.py serve --mbtiles mbtiles/mines.mbtiles --port 8081
+  # tiles at http://localhost:8081/{z}/{x}/{y}.pbf, TileJSON at /tiles.json
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import sqlite3
+import struct
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+LAYER_NAME = "mines"
+EXTENT = 4096
+BUFFER = 64  # tile units (of EXTENT) around each tile that still carry points
+
+# Attributes kept below --detail-zoom / at and above it.
+LOW_ZOOM_ATTRS = ("id", "name", "importance_level", "importance_score")
+HIGH_ZOOM_ATTRS = LOW_ZOOM_ATTRS + (
+    "country", "locality_type", "element_count", "geomaterial_count",
+    "elements", "geomaterial_names", "discovered_before",
+)
+
+
+# --- Mapbox Vector Tile (protobuf) encoding -------------------------------------------
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _key(field: int, wire: int) -> bytes:
+    return _varint((field << 3) | wire)
+
+
+def _len_field(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _encode_value(v: Any) -> bytes:
+    if isinstance(v, bool):
+        return _key(7, 0) + _varint(int(v))
+    if isinstance(v, int):
+        return _key(6, 0) + _varint(_zigzag(v))
+    if isinstance(v, float):
+        return _key(3, 1) + struct.pack("<d", v)
+    return _len_field(1, str(v).encode("utf-8"))
+
+
+def encode_tile(features: List[Tuple[int, int, int, Dict[str, Any]]]) -> bytes:
+    """Encode (id, x, y, props) point features, x/y in tile extent units, as one MVT layer."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    feats = bytearray()
+    for fid, x, y, props in features:
+        tags: List[int] = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            tags.append(keys.setdefault(k, len(keys)))
+            tags.append(values.setdefault((type(v), v), len(values)))
+        geom = _varint(9) + _varint(_zigzag(x)) + _varint(_zigzag(y))  # MoveTo(1)
+        body = (_key(1, 0) + _varint(fid)
+                + _len_field(2, b"".join(_varint(t) for t in tags))
+                + _key(3, 0) + _varint(1)  # POINT
+                + _len_field(4, geom))
+        feats += _len_field(2, body)
+
+    layer = bytearray(_key(15, 0) + _varint(2) + _len_field(1, LAYER_NAME.encode("utf-8")))
+    layer += feats
+    for k in keys:
+        layer += _len_field(3, k.encode("utf-8"))
+    for (_, v) in values:
+        layer += _len_field(4, _encode_value(v))
+    layer += _key(5, 0) + _varint(EXTENT)
+    return _len_field(3, bytes(layer))
+
+
+# --- Feature preparation ---------------------------------------------------------------
+
+def _project(lng: float, lat: float) -> Tuple[float, float]:
+    s = min(max(math.sin(lat * math.pi / 180.0), -0.9999), 0.9999)
+    return lng / 360.0 + 0.5, 0.5 - 0.25 * math.log((1 + s) / (1 - s)) / math.pi
+
+
+def _attr(v: Any) -> Any:
+    """Vector tiles only carry scalars; join lists into strings."""
+    if isinstance(v, list):
+        return ",".join(str(x) for x in v)
+    return v
+
+
+def _field_type(v: Any) -> str:
+    """TileJSON vector_layers type of an encoded attribute value."""
+    if isinstance(v, bool):
+        return "Boolean"
+    if isinstance(v, (int, float)):
+        return "Number"
+    return "String"
+
+
+def load_features(path: Path) -> List[Dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from to_leaflet_geojson import GeoJSONConverter, decode_compact
+
+    if isinstance(data, dict) and isinstance(data.get("features"), list):
+        return decode_compact(data)["features"]  # compact mode: indices back to strings
+
+    # Merged locality data: score it the same way the Leaflet converter does
+
+    conv = GeoJSONConverter()
+    if isinstance(data, dict) and isinstance(data.get("results"), list):
+        conv.localities_data = data["results"]
+    elif isinstance(data, list):
+        conv.localities_data = data
+    else:
+        raise SystemExit("Unsupported input. Expected GeoJSON, a list, or {\"results\": [...]}.")
+    for loc in conv.localities_data:
+        for g in loc.get("geomaterials_details") or []:
+            if "id" in g:
+                conv.geomaterials_lookup[g["id"]] = g
+        if "geomaterial_ids" in loc and "geomaterials" not in loc:
+            loc["geomaterials"] = loc["geomaterial_ids"]
+    conv.convert_to_geojson()
+    return conv.geojson_features
+
+
+class MBTilesBuilder:
+    def __init__(self, min_zoom: int = 0, max_zoom: int = 14, full_zoom: int = 10,
+                 detail_zoom: int = 8, max_per_tile: int = 200, grid: int = 64, buffer: int = BUFFER):
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        self.full_zoom, self.detail_zoom = full_zoom, detail_zoom
+        self.max_per_tile, self.grid, self.buffer = max_per_tile, grid, buffer
+        self.stats = {"tiles": 0, "unique_tiles": 0, "features_written": 0}
+        self.field_types: Dict[str, set] = defaultdict(set)  # attribute → vector_layers types written
+
+    def _points(self, features: Iterable[Dict[str, Any]]) -> List[Tuple[float, float, float, int, Dict[str, Any]]]:
+        pts = []
+        for i, f in enumerate(features):
+            geom = f.get("geometry") or {}
+            if geom.get("type") != "Point":
+                continue
+            props = f.get("properties") or {}
+            x, y = _project(*geom["coordinates"][:2])
+            fid = props.get("id")
+            fid = fid if isinstance(fid, int) and fid >= 0 else i
+            pts.append((float(props.get("importance_score") or 0), x, y, fid, props))
+        # highest importance first, so thinning keeps the most significant localities
+        pts.sort(key=lambda p: -p[0])
+        return pts
+
+    def _tiles_for_zoom(self, pts, z: int) -> Dict[Tuple[int, int], bytes]:
+        n = 2 ** z
+        attrs = LOW_ZOOM_ATTRS if z < self.detail_zoom else HIGH_ZOOM_ATTRS
+        thin = z < self.full_zoom
+        buckets: Dict[Tuple[int, int], list] = defaultdict(list)
+        kept: Dict[Tuple[int, int], int] = defaultdict(int)  # points per home tile (the cap)
+        taken = set()
+        margin = self.buffer / EXTENT  # in tile units
+        for _, x, y, fid, props in pts:
+            tx, ty = min(int(x * n), n - 1), min(int(y * n), n - 1)
+            if thin:
+                if kept[(tx, ty)] >= self.max_per_tile:
+                    continue
+                cell = (int(x * n * self.grid), int(y * n * self.grid))
+                if cell in taken:
+                    continue
+                taken.add(cell)
+            kept[(tx, ty)] += 1
+            attrs_ = {k: _attr(props[k]) for k in attrs if k in props}
+            for k, v in attrs_.items():
+                if v is not None:
+                    self.field_types[k].add(_field_type(v))
+            # the home tile, plus every neighbour whose buffer the point falls in
+            fx, fy = x * n, y * n
+            for bx in range(max(int(fx - margin), 0), min(int(fx + margin), n - 1) + 1):
+                for by in range(max(int(fy - margin), 0), min(int(fy + margin), n - 1) + 1):
+                    px = int(round((fx - bx) * EXTENT))
+                    py = int(round((fy - by) * EXTENT))
+                    buckets[(bx, by)].append((fid, px, py, attrs_))
+
+        out = {}
+        for key, feats in buckets.items():
+            self.stats["features_written"] += len(feats)
+            out[key] = gzip.compress(encode_tile(feats), mtime=0)
+        return out
+
+    def build(self, features: List[Dict[str, Any]], out_path: Path) -> Dict[str, int]:
+        pts = self._points(features)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if out_path.exists():
+            out_path.unlink()
+        db = sqlite3.connect(str(out_path))
+        # tiles without points are not stored at all; blobs are stored once, keyed by content
+        # hash. Point tiles carry feature ids, so repeats are rare and the dedup mostly costs
+        # one md5 per tile; stats["unique_tiles"] shows what it saved.
+        db.executescript("""
+            CREATE TABLE metadata (name TEXT, value TEXT);
+            CREATE TABLE map (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT);
+            CREATE TABLE images (tile_id TEXT PRIMARY KEY, tile_data BLOB);
+            CREATE UNIQUE INDEX map_index ON map (zoom_level, tile_column, tile_row);
+            CREATE VIEW tiles AS
+                SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column,
+                       map.tile_row AS tile_row, images.tile_data AS tile_data
+                FROM map JOIN images ON images.tile_id = map.tile_id;
+        """)
+        seen_ids = set()
+        for z in range(self.min_zoom, self.max_zoom + 1):
+            for (tx, ty), blob in self._tiles_for_zoom(pts, z).items():
+                tile_id = hashlib.md5(blob).hexdigest()
+                if tile_id not in seen_ids:
+                    seen_ids.add(tile_id)
+                    db.execute("INSERT INTO images VALUES (?, ?)", (tile_id, blob))
+                # MBTiles uses the TMS row order (y flipped)
+                db.execute("INSERT INTO map VALUES (?, ?, ?, ?)", (z, tx, (2 ** z - 1) - ty, tile_id))
+                self.stats["tiles"] += 1
+        self.stats["unique_tiles"] = len(seen_ids)
+
+        lngs = [f["geometry"]["coordinates"][0] for f in features if (f.get("geometry") or {}).get("type") == "Point"]
+        lats = [f["geometry"]["coordinates"][1] for f in features if (f.get("geometry") or {}).get("type") == "Point"]
+        bounds = [min(lngs), min(lats), max(lngs), max(lats)] if lngs else [-180, -85, 180, 85]
+        fields = {}  # one type per attribute; mixed types are declared as String
+        for k in HIGH_ZOOM_ATTRS:
+            types = self.field_types.get(k)
+            if types:
+                fields[k] = next(iter(types)) if len(types) == 1 else "String"
+        meta = {
+            "name": LAYER_NAME,
+            "format": "pbf",
+            "type": "overlay",
+            "minzoom": str(self.min_zoom),
+            "maxzoom": str(self.max_zoom),
+            "bounds": ",".join(str(round(b, 6)) for b in bounds),
+            "center": f"{(bounds[0] + bounds[2]) / 2:.6f},{(bounds[1] + bounds[3]) / 2:.6f},{self.min_zoom}",
+            "json": json.dumps({"vector_layers": [{
+                "id": LAYER_NAME,
+                "fields": fields,
+                "minzoom": self.min_zoom,
+                "maxzoom": self.max_zoom,
+            }]}),
+        }
+        db.executemany("INSERT INTO metadata VALUES (?, ?)", meta.items())
+        db.commit()
+        db.close()
+        return self.stats
+
+
+# --- Local tile endpoint ---------------------------------------------------------------
+
+def make_handler(mbtiles: Path, host: str, port: int):
+    local = threading.local()  # ThreadingHTTPServer: one read-only connection per handler thread
+
+    class TileHandler(BaseHTTPRequestHandler):
+        @property
+        def db(self) -> sqlite3.Connection:
+            if getattr(local, "db", None) is None:
+                local.db = sqlite3.connect(f"file:{mbtiles}?mode=ro", uri=True)
+            return local.db
+
+        def _send(self, code: int, body: bytes, ctype: str, gzipped: bool = False):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Cache-Control", "public, max-age=3600")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].strip("/")
+            if path == "tiles.json":
+                meta = dict(self.db.execute("SELECT name, value FROM metadata").fetchall())
+                tilejson = {
+                    "tilejson": "2.2.0",
+                    # the address the client used (--host may be 0.0.0.0), else --host:--port
+                    "tiles": [f"http://{self.headers.get('Host') or f'{host}:{port}'}/{{z}}/{{x}}/{{y}}.pbf"],
+                    "minzoom": int(meta.get("minzoom", 0)),
+                    "maxzoom": int(meta.get("maxzoom", 14)),
+                    "bounds": [float(b) for b in meta.get("bounds", "-180,-85,180,85").split(",")],
+                    **json.loads(meta.get("json", "{}")),
+                }
+                return self._send(200, json.dumps(tilejson).encode("utf-8"), "application/json")
+            parts = path.split("/")
+            if len(parts) == 3 and parts[2].endswith(".pbf"):
+                try:
+                    z, x, y = int(parts[0]), int(parts[1]), int(parts[2][:-4])
+                except ValueError:
+                    return self._send(400, b"bad tile address", "text/plain")
+                row = self.db.execute(
+                    "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                    (z, x, (2 ** z - 1) - y)).fetchone()
+                if row is None:
+                    return self._send(204, b"", "application/x-protobuf")
+                return self._send(200, row[0], "application/x-protobuf", gzipped=True)
+            self._send(404, b"not found", "text/plain")
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return TileHandler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser("export-mbtiles")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Build an MBTiles vector tileset")
+    b.add_argument("--in", dest="inp", required=True, help="GeoJSON or merged locality JSON")
+    b.add_argument("--out", dest="out", required=True, help="Output .mbtiles path")
+    b.add_argument("--min-zoom", type=int, default=0)
+    b.add_argument("--max-zoom", type=int, default=14)
+    b.add_argument("--full-zoom", type=int, default=10, help="First zoom with no feature thinning")
+    b.add_argument("--detail-zoom", type=int, default=8, help="First zoom with full attributes")
+    b.add_argument("--max-per-tile", type=int, default=200, help="Feature cap per tile below --full-zoom")
+    b.add_argument("--buffer", type=int, default=BUFFER,
+                   help=f"Tile units (of {EXTENT}) around each tile that still carry edge points")
+
+    s = sub.add_parser("serve", help="Serve tiles from an MBTiles file")
+    s.add_argument("--mbtiles", required=True)
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8081)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        inp = Path(args.inp)
+        if not inp.exists():
+            raise SystemExit(f"Input file not found: {inp}")
+        builder = MBTilesBuilder(args.min_zoom, args.max_zoom, args.full_zoom,
+                                 args.detail_zoom, args.max_per_tile, buffer=args.buffer)
+        stats = builder.build(load_features(inp), Path(args.out))
+        print(f"Wrote {stats['tiles']} tiles ({stats['unique_tiles']} unique, "
+              f"{stats['features_written']} features) → {args.out}")
+    else:
+        mb = Path(args.mbtiles)
+        if not mb.exists():
+            raise SystemExit(f"MBTiles file not found: {mb}")
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(mb, args.host, args.port))
+        print(f"Serving {mb} at http://{args.host}:{args.port}/{{z}}/{{x}}/{{y}}.pbf")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,32 @@
 """
 Locality & Geomaterials Data Merger and Cleaner
 Merges locality data with geomaterials data and removes duplicates
+
+Interactive by default. With --localities it runs without prompts; "-" streams JSONL
+from stdin and/or to stdout (log lines then go to stderr):
+  ... | python scripts/merging_geomaterils_iran_mines.py --localities - --geomaterials geomaterials_data.json
 """
 
+import argparse
 import json
 import os
+import sys
 from datetime import datetime
 from typing import Dict, List, Set, Optional
+from pathlib import Path
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: the mindat package
+from mindat.models import Geomaterial, Locality
+from mindat.utils.io import open_records, write_jsonl
+from mindat.utils.profiling import profile_context
+
+# geomaterial fields kept in geomaterials_details
+ESSENTIAL_GEOMATERIAL_FIELDS = ('id', 'longid', 'name', 'ima_formula', 'entrytype_text')
+
 class DataMergerCleaner:
-    def __init__(self):
+    def __init__(self, log_file=None):
+        self.log_file = log_file or sys.stdout  # stderr when stdout carries records
         self.localities_data = []
         self.geomaterials_data = []
         self.geomaterials_lookup = {}  # id -> geomaterial info
@@ -27,7 +43,7 @@ class DataMergerCleaner:
     def log_message(self, message: str):
         """Log message with timestamp"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] {message}")
+        print(f"[{timestamp}] {message}", file=self.log_file)
     
     def load_localities_file(self, filepath: str) -> bool:
         """Load localities JSON file"""
@@ -39,9 +55,9 @@ class DataMergerCleaner:
                 
             # Handle both direct list and "results" wrapper
             if isinstance(data, dict) and 'results' in data:
-                self.localities_data = data['results']
-            elif isinstance(data, list):
-                self.localities_data = data
+                data = data['results']
+            if isinstance(data, list):
+                self.localities_data = [Locality.from_dict(r) for r in data]
             else:
                 self.log_message("❌ Invalid localities file format")
                 return False
@@ -81,7 +97,7 @@ class DataMergerCleaner:
             # Create lookup dictionary
             for material in self.geomaterials_data:
                 if 'id' in material:
-                    self.geomaterials_lookup[material['id']] = material
+                    self.geomaterials_lookup[material['id']] = Geomaterial.from_dict(material)
             
             self.stats['geomaterials_loaded'] = len(self.geomaterials_data)
             self.log_message(f"✅ Loaded {self.stats['geomaterials_loaded']} geomaterials")
@@ -145,18 +161,17 @@ class DataMergerCleaner:
         
         for material_id in geomaterial_ids:
             if material_id in self.geomaterials_lookup:
-                material_info = self.geomaterials_lookup[material_id].copy()
-                # Only keep essential fields
-                essential_fields = {'id', 'name', 'longid', 'entrytype_text', 'ima_formula'}
-                filtered_material = {k: v for k, v in material_info.items() 
-                                   if k in essential_fields and v not in [None, "", 0, "0"]}
+                material_info = self.geomaterials_lookup[material_id]
+                # Only keep essential fields (read straight off the record, no copy)
+                filtered_material = {k: v for k in ESSENTIAL_GEOMATERIAL_FIELDS
+                                     if (v := material_info.get(k)) not in [None, "", 0, "0"]}
                 if filtered_material:
                     found_materials.append(filtered_material)
             else:
                 missing_ids.append(material_id)
         
-        # Update the locality record
-        result = locality.copy()
+        # Update the locality record (a fresh dict from clean_locality_data: no copy needed)
+        result = locality
         
         if found_materials:
             result['geomaterials_details'] = found_materials
@@ -174,13 +189,9 @@ class DataMergerCleaner:
         
         return result
     
-    def process_data(self):
-        """Main processing function"""
-        self.log_message("🔄 Starting data processing...")
-        
-        processed_count = 0
-        
-        for locality in self.localities_data:
+    def iter_merged(self, localities):
+        """Clean and merge localities one at a time (records without an id are dropped)"""
+        for locality in localities:
             # Clean locality data
             cleaned_locality = self.clean_locality_data(locality)
             
@@ -189,8 +200,15 @@ class DataMergerCleaner:
                 continue
             
             # Merge geomaterials information
-            merged_locality = self.merge_geomaterials_info(cleaned_locality)
-            
+            yield self.merge_geomaterials_info(cleaned_locality)
+    
+    def process_data(self):
+        """Main processing function"""
+        self.log_message("🔄 Starting data processing...")
+        
+        processed_count = 0
+        
+        for merged_locality in self.iter_merged(self.localities_data):
             self.merged_data.append(merged_locality)
             processed_count += 1
             
@@ -218,6 +236,25 @@ class DataMergerCleaner:
             self.log_message(f"❌ Error saving file: {e}")
             return False
     
+    def stream_merged_data(self, localities_file: str = '-', output_file: str = '-') -> bool:
+        """Merge record by record from a JSON/JSONL file or stdin ("-") into JSON lines (file or stdout)"""
+        self.log_message(f"🔄 Streaming merge: {localities_file} → {output_file}")
+        
+        def counted(records):
+            for record in records:
+                self.stats['localities_loaded'] += 1
+                yield record
+        
+        try:
+            self.stats['merged_records'] = write_jsonl(self.iter_merged(counted(open_records(localities_file))),
+                                                       output_file)
+        except (FileNotFoundError, json.JSONDecodeError, IOError) as e:
+            self.log_message(f"❌ Error streaming merged data: {e}")
+            return False
+        self.stats['duplicates_removed'] = self.stats['localities_loaded'] - self.stats['merged_records']
+        self.log_message(f"✅ Processing complete: {self.stats['merged_records']} records streamed")
+        return True
+    
     def generate_stats_report(self) -> str:
         """Generate processing statistics report"""
         report = f"""
@@ -258,6 +295,23 @@ class DataMergerCleaner:
         
         print("="*80)
 
+def run(localities_file: str, geomaterials_file: str, output_file: str) -> bool:
+    """Non-interactive merge; "-" (or a .jsonl output) streams record by record"""
+    streaming = '-' in (localities_file, output_file) or output_file.endswith('.jsonl')
+    merger = DataMergerCleaner(log_file=sys.stderr if output_file == '-' else None)
+    if not merger.load_geomaterials_file(geomaterials_file):
+        return False
+    if streaming:
+        ok = merger.stream_merged_data(localities_file, output_file)
+    else:
+        if not merger.load_localities_file(localities_file):
+            return False
+        merger.process_data()
+        ok = merger.save_merged_data(output_file)
+    if ok:
+        print(merger.generate_stats_report(), file=merger.log_file)
+    return ok
+
 def main():
     print("🔄 Locality & Geomaterials Data Merger and Cleaner")
     print("="*60)
@@ -300,9 +354,24 @@ def main():
         print("❌ Failed to save merged data")
 
 if __name__ == '__main__':
+    ap = argparse.ArgumentParser("mindat-merge")
+    ap.add_argument("--profile", action="store_true",
+                    help="Write cProfile/tracemalloc/peak-RSS reports (prompt time counts as wall time)")
+    ap.add_argument("--profile-dir", default="mindat_data", help="Where to write profiling reports")
+    ap.add_argument("--localities", default=None,
+                    help="Localities JSON/JSONL file, or - for JSONL on stdin (no prompts)")
+    ap.add_argument("--geomaterials", default="geomaterials_data.json", help="Geomaterials JSON file")
+    ap.add_argument("--out", default="-", help="Output file (.jsonl streams), or - for JSONL on stdout")
+    args = ap.parse_args()
     try:
-        main()
+        with profile_context(args.profile, args.profile_dir, "merge"):
+            if args.localities is None:
+                main()
+            elif not run(args.localities, args.geomaterials, args.out):
+                sys.exit(1)
     except KeyboardInterrupt:
-        print("\n⏸️  Process interrupted by user")
+        print("\n⏸️  Process interrupted by user", file=sys.stderr)
+        sys.exit(130)
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
\ No newline at end of file
+        print(f"\n❌ Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
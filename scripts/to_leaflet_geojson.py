@@ -2,23 +2,77 @@
 """
 Advanced GeoJSON Converter for Leaflet Maps
 Converts locality and geomaterials data into feature-rich GeoJSON with intelligent markers
+
+Interactive by default. With --localities it runs without prompts; "-" streams JSONL
+localities from stdin and/or GeoJSONSeq features to stdout (log lines then go to stderr):
+  ... | python scripts/to_leaflet_geojson.py --localities - --geomaterials geomaterials_data.json > map.geojsonl
 """
 
+import argparse
 import json
 import os
 import re
+import sys
 from datetime import datetime
 from typing import Dict, List, Set, Optional, Tuple
+from pathlib import Path
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # repo root: the mindat package
+from mindat.models import Geomaterial, Locality
+from mindat.utils.io import open_records, write_jsonl
+from mindat.utils.profiling import profile_context
+
+# Static style tables (built once at import, not per call)
+ELEMENT_COLORS = {
+    # Metals (brown/orange family)
+    'Cu': '#B87333', 'Fe': '#B87333', 'Pb': '#8C7853', 'Zn': '#71797E',
+    'Ag': '#C0C0C0', 'Au': '#FFD700', 'Pt': '#E5E4E2', 'Ni': '#D4AF37',
+    'Co': '#0047AB', 'Mn': '#9C2542', 'Cr': '#C0C0C0', 'Ti': '#668B8B',
+    'Al': '#848789', 'Mg': '#E0E0E0', 'Ca': '#F5F5DC', 'K': '#8F00FF',
+    'Na': '#FFD700', 'Ba': '#00FF7F', 'Sr': '#00FF00',
+    
+    # Non-metals (blue/purple family)
+    'S': '#FFFF00', 'P': '#FF8000', 'C': '#000000', 'Si': '#A0A0A4',
+    'O': '#FF0000', 'N': '#3050F8', 'H': '#FFFFFF', 'Cl': '#1FF01F',
+    'F': '#90E050', 'Br': '#A62929', 'I': '#940094',
+    
+    # Radioactive (red family)
+    'U': '#8B0000', 'Th': '#DC143C', 'Ra': '#FF1493',
+    
+    # Rare earth (purple family)
+    'Ce': '#FFFFC7', 'La': '#70D4FF', 'Nd': '#C7FFC7'
+}
+
+IMPORTANCE_STYLES = {
+    'very_high': {'radius': 12, 'weight': 3, 'opacity': 0.9},
+    'high': {'radius': 10, 'weight': 2, 'opacity': 0.8},
+    'medium': {'radius': 8, 'weight': 2, 'opacity': 0.7},
+    'low': {'radius': 6, 'weight': 1, 'opacity': 0.6}
+}
+
+# Output formats written feature-by-feature instead of as one FeatureCollection
+STREAMING_EXTENSIONS = {
+    'geojsonseq': ('.geojsonl', '.geojsons', '.geojsonseq', '.ndjson'),
+    'flatgeobuf': ('.fgb',),
+}
 
 class GeoJSONConverter:
-    def __init__(self):
+    # Properties whose repeated strings are replaced by indices into metadata.dictionaries in compact mode
+    DICTIONARY_FIELDS = ('country', 'elements', 'geomaterial_names', 'importance_level')
+
+    def __init__(self, compact: bool = False, precision: int = 5, log_file=None):
+        self.log_file = log_file or sys.stdout  # stderr when stdout carries features
+        self.compact = compact
+        self.precision = precision
+        self.dictionaries = {field: {} for field in self.DICTIONARY_FIELDS}
         self.localities_data = []
         self.geomaterials_data = []
         self.geomaterials_lookup = {}
         self.geojson_features = []
-        self.element_colors = {}
-        self.mineral_categories = {}
+        self.element_colors = ELEMENT_COLORS
+        self.mineral_categories = {}  # geomaterial key -> categorize_mineral() result
         self.locality_types = {
             60: {"name": "Mine", "icon": "⛏️", "color": "#8B4513"},
             10: {"name": "Quarry", "icon": "🏗️", "color": "#A0522D"},
@@ -38,7 +92,7 @@ class GeoJSONConverter:
     def log_message(self, message: str):
         """Log message with timestamp"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] {message}")
+        print(f"[{timestamp}] {message}", file=self.log_file)
     
     def load_data_files(self, localities_file: str, geomaterials_file: str) -> bool:
         """Load both data files"""
@@ -50,9 +104,10 @@ class GeoJSONConverter:
                 localities_data = json.load(f)
             
             if isinstance(localities_data, dict) and 'results' in localities_data:
-                self.localities_data = localities_data['results']
-            elif isinstance(localities_data, list):
-                self.localities_data = localities_data
+                localities_data = localities_data['results']
+            if isinstance(localities_data, list):
+                # slotted records: much smaller than dicts, and cheaper to ship to workers
+                self.localities_data = [Locality.from_dict(r) for r in localities_data]
             else:
                 self.log_message("❌ Invalid localities file format")
                 return False
@@ -63,7 +118,10 @@ class GeoJSONConverter:
             self.log_message(f"❌ Error loading localities: {e}")
             return False
         
-        # Load geomaterials
+        return self.load_geomaterials_file(geomaterials_file)
+    
+    def load_geomaterials_file(self, geomaterials_file: str) -> bool:
+        """Load the geomaterials lookup (localities may then be streamed)"""
         try:
             with open(geomaterials_file, 'r', encoding='utf-8') as f:
                 geomaterials_data = json.load(f)
@@ -80,7 +138,7 @@ class GeoJSONConverter:
             # Create lookup
             for material in self.geomaterials_data:
                 if 'id' in material:
-                    self.geomaterials_lookup[material['id']] = material
+                    self.geomaterials_lookup[material['id']] = Geomaterial.from_dict(material)
             
             self.log_message(f"✅ Loaded {len(self.geomaterials_data)} geomaterials")
             return True
@@ -100,30 +158,19 @@ class GeoJSONConverter:
     
     def get_element_color(self, element: str) -> str:
         """Get color for element (simplified periodic table coloring)"""
-        element_colors = {
-            # Metals (brown/orange family)
-            'Cu': '#B87333', 'Fe': '#B87333', 'Pb': '#8C7853', 'Zn': '#71797E',
-            'Ag': '#C0C0C0', 'Au': '#FFD700', 'Pt': '#E5E4E2', 'Ni': '#D4AF37',
-            'Co': '#0047AB', 'Mn': '#9C2542', 'Cr': '#C0C0C0', 'Ti': '#668B8B',
-            'Al': '#848789', 'Mg': '#E0E0E0', 'Ca': '#F5F5DC', 'K': '#8F00FF',
-            'Na': '#FFD700', 'Ba': '#00FF7F', 'Sr': '#00FF00',
-            
-            # Non-metals (blue/purple family)
-            'S': '#FFFF00', 'P': '#FF8000', 'C': '#000000', 'Si': '#A0A0A4',
-            'O': '#FF0000', 'N': '#3050F8', 'H': '#FFFFFF', 'Cl': '#1FF01F',
-            'F': '#90E050', 'Br': '#A62929', 'I': '#940094',
-            
-            # Radioactive (red family)
-            'U': '#8B0000', 'Th': '#DC143C', 'Ra': '#FF1493',
-            
-            # Rare earth (purple family)
-            'Ce': '#FFFFC7', 'La': '#70D4FF', 'Nd': '#C7FFC7'
-        }
-        
-        return element_colors.get(element, '#808080')  # Gray default
+        return self.element_colors.get(element, '#808080')  # Gray default
     
     def categorize_mineral(self, material: Dict) -> Dict:
-        """Categorize mineral based on formula and type"""
+        """Categorize mineral based on formula and type (cached per geomaterial)"""
+        key = material.get('id')
+        if key is None:
+            key = (material.get('name'), material.get('ima_formula'), material.get('entrytype_text'))
+        cached = self.mineral_categories.get(key)
+        if cached is None:
+            cached = self.mineral_categories[key] = self._categorize_mineral(material)
+        return cached
+    
+    def _categorize_mineral(self, material: Dict) -> Dict:
         name = material.get('name', '').lower()
         formula = material.get('ima_formula', '')
         entry_type = material.get('entrytype_text', 'mineral')
@@ -228,14 +275,7 @@ class GeoJSONConverter:
     def create_marker_style(self, locality: Dict, analysis: Dict) -> Dict:
         """Create marker style based on locality characteristics"""
         # Base style on importance
-        importance_styles = {
-            'very_high': {'radius': 12, 'weight': 3, 'opacity': 0.9},
-            'high': {'radius': 10, 'weight': 2, 'opacity': 0.8},
-            'medium': {'radius': 8, 'weight': 2, 'opacity': 0.7},
-            'low': {'radius': 6, 'weight': 1, 'opacity': 0.6}
-        }
-        
-        base_style = importance_styles.get(analysis['level'], importance_styles['low'])
+        base_style = IMPORTANCE_STYLES.get(analysis['level'], IMPORTANCE_STYLES['low'])
         
         # Color based on dominant element or locality type
         elements = self.extract_elements_from_string(locality.get('elements', ''))
@@ -323,103 +363,162 @@ class GeoJSONConverter:
         
         return "".join(html_parts)
     
-    def convert_to_geojson(self):
-        """Convert data to GeoJSON format"""
-        self.log_message("🗺️ Converting to GeoJSON...")
+    def encode_value(self, field: str, value):
+        """Replace a string (or list of strings) with its index in the field's dictionary"""
+        table = self.dictionaries[field]
+        if isinstance(value, list):
+            return [table.setdefault(v, len(table)) for v in value]
+        if value is None:
+            return None
+        return table.setdefault(value, len(table))
+    
+    def create_compact_properties(self, locality: Dict, elements: List[str],
+                                  geomaterials: List[Dict], analysis: Dict) -> Dict:
+        """Slim properties for compact mode: no HTML, no duplicated coordinates (strings encoded later)"""
+        return {
+            "id": locality.get('id'),
+            "longid": locality.get('longid'),
+            "name": locality.get('txt', 'Unknown Location'),
+            "country": locality.get('country'),
+            "locality_type": locality.get('locality_type', 60),
+            "elements": elements,
+            "description": locality.get('description_short', ''),
+            "geomaterial_count": len(geomaterials),
+            "geomaterial_names": [g.get('name') for g in geomaterials if g.get('name')],
+            "importance_score": analysis['score'],
+            "importance_level": analysis['level'],
+            "date_modified": locality.get('datemodify'),
+            "discovered_before": locality.get('discovered_before'),
+        }
+    
+    def build_feature(self, locality: Dict) -> Optional[Dict]:
+        """Build one GeoJSON feature, or None when the locality has no usable coordinates"""
+        # Skip if no coordinates
+        lat = locality.get('latitude')
+        lng = locality.get('longitude')
         
-        processed = 0
+        if not lat or not lng or lat == 0 or lng == 0:
+            return None
         
-        for locality in self.localities_data:
-            # Skip if no coordinates
-            lat = locality.get('latitude')
-            lng = locality.get('longitude')
-            
-            if not lat or not lng or lat == 0 or lng == 0:
-                continue
-            
-            # Get geomaterials
-            geomaterial_ids = locality.get('geomaterials', [])
-            if isinstance(geomaterial_ids, list):
-                geomaterials = [
-                    self.geomaterials_lookup[gid] 
-                    for gid in geomaterial_ids 
-                    if gid in self.geomaterials_lookup
-                ]
-            else:
-                geomaterials = []
-            
-            # Analyze locality
-            analysis = self.analyze_locality_importance(locality)
-            
-            # Create marker style
-            marker_style = self.create_marker_style(locality, analysis)
-            
-            # Create popup content
-            popup_html = self.create_popup_content(locality, geomaterials, analysis)
-            
-            # Extract elements for statistics
-            elements = self.extract_elements_from_string(locality.get('elements', ''))
-            self.stats['unique_elements'].update(elements)
-            if locality.get('country'):
-                self.stats['unique_countries'].add(locality.get('country'))
-            
-            # Create GeoJSON feature
-            feature = {
+        # Get geomaterials
+        geomaterial_ids = locality.get('geomaterials', [])
+        if isinstance(geomaterial_ids, list):
+            geomaterials = [
+                self.geomaterials_lookup[gid] 
+                for gid in geomaterial_ids 
+                if gid in self.geomaterials_lookup
+            ]
+        else:
+            geomaterials = []
+        
+        # Analyze locality
+        analysis = self.analyze_locality_importance(locality)
+        elements = self.extract_elements_from_string(locality.get('elements', ''))
+        
+        if self.compact:
+            return {
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [lng, lat]
+                    "coordinates": [round(lng, self.precision), round(lat, self.precision)]
                 },
-                "properties": {
-                    # Core identification
-                    "id": locality.get('id'),
-                    "longid": locality.get('longid'),
-                    "name": locality.get('txt', 'Unknown Location'),
-                    "country": locality.get('country'),
-                    
-                    # Location details
-                    "latitude": lat,
-                    "longitude": lng,
-                    "locality_type": locality.get('locality_type', 60),
-                    
-                    # Content
-                    "elements": elements,
-                    "element_count": len(elements),
-                    "description": locality.get('description_short', ''),
-                    
-                    # Geomaterials
-                    "geomaterial_count": len(geomaterials),
-                    "geomaterial_names": [g.get('name') for g in geomaterials if g.get('name')],
-                    
-                    # Analysis
-                    "importance_score": analysis['score'],
-                    "importance_level": analysis['level'],
-                    "importance_factors": analysis['factors'],
-                    
-                    # Dates
-                    "date_added": locality.get('dateadd'),
-                    "date_modified": locality.get('datemodify'),
-                    "discovered_before": locality.get('discovered_before'),
-                    
-                    # Leaflet-specific
-                    "popupContent": popup_html,
-                    "markerStyle": marker_style
-                }
+                "properties": self.create_compact_properties(locality, elements, geomaterials, analysis)
             }
-            
-            self.geojson_features.append(feature)
-            processed += 1
-            
-            if processed % 100 == 0:
-                self.log_message(f"   Processed {processed} localities...")
         
+        # Create marker style
+        marker_style = self.create_marker_style(locality, analysis)
+        
+        # Create popup content
+        popup_html = self.create_popup_content(locality, geomaterials, analysis)
+        
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [lng, lat]
+            },
+            "properties": {
+                # Core identification
+                "id": locality.get('id'),
+                "longid": locality.get('longid'),
+                "name": locality.get('txt', 'Unknown Location'),
+                "country": locality.get('country'),
+                
+                # Location details
+                "latitude": lat,
+                "longitude": lng,
+                "locality_type": locality.get('locality_type', 60),
+                
+                # Content
+                "elements": elements,
+                "element_count": len(elements),
+                "description": locality.get('description_short', ''),
+                
+                # Geomaterials
+                "geomaterial_count": len(geomaterials),
+                "geomaterial_names": [g.get('name') for g in geomaterials if g.get('name')],
+                
+                # Analysis
+                "importance_score": analysis['score'],
+                "importance_level": analysis['level'],
+                "importance_factors": analysis['factors'],
+                
+                # Dates
+                "date_added": locality.get('dateadd'),
+                "date_modified": locality.get('datemodify'),
+                "discovered_before": locality.get('discovered_before'),
+                
+                # Leaflet-specific
+                "popupContent": popup_html,
+                "markerStyle": marker_style
+            }
+        }
+    
+    def convert_chunk(self, localities: List[Dict]) -> List[Dict]:
+        """Convert a slice of localities, keeping input order"""
+        features = []
+        for locality in localities:
+            feature = self.build_feature(locality)
+            if feature is not None:
+                features.append(feature)
+        return features
+    
+    def convert_to_geojson(self, workers: int = 1, chunk_size: int = 500):
+        """Convert data to GeoJSON format (across a process pool when workers > 1)"""
+        self.log_message("🗺️ Converting to GeoJSON...")
+        
+        chunks = [self.localities_data[i:i + chunk_size]
+                  for i in range(0, len(self.localities_data), chunk_size)]
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.geomaterials_lookup, self.compact, self.precision)) as pool:
+                results = pool.map(_convert_chunk, chunks)  # map() yields in submission order
+                self._merge_features(results)
+        else:
+            self._merge_features(self.convert_chunk(chunk) for chunk in chunks)
+        
+        processed = len(self.geojson_features)
         self.stats['localities_processed'] = processed
         self.stats['coordinates_valid'] = processed
         self.log_message(f"✅ Created {len(self.geojson_features)} GeoJSON features")
     
+    def _merge_features(self, chunk_results):
+        """Append converted chunks in order, updating stats and compact dictionaries"""
+        for features in chunk_results:
+            for feature in features:
+                props = feature['properties']
+                self.stats['unique_elements'].update(props.get('elements') or [])
+                if props.get('country'):
+                    self.stats['unique_countries'].add(props['country'])
+                if self.compact:
+                    for field in self.DICTIONARY_FIELDS:
+                        props[field] = self.encode_value(field, props.get(field))
+                self.geojson_features.append(feature)
+            self.log_message(f"   Processed {len(self.geojson_features)} localities...")
+    
     def create_geojson_output(self) -> Dict:
         """Create final GeoJSON structure"""
-        return {
+        output = {
             "type": "FeatureCollection",
             "metadata": {
                 "generated": datetime.now().isoformat(),
@@ -443,6 +542,13 @@ class GeoJSONConverter:
             },
             "features": self.geojson_features
         }
+        if self.compact:
+            # Index -> string tables for the dictionary-encoded properties (decoded client-side)
+            output["metadata"]["compact"] = True
+            output["metadata"]["dictionaries"] = {
+                field: list(table) for field, table in self.dictionaries.items()
+            }
+        return output
     
     def save_geojson(self, output_file: str):
         """Save GeoJSON to file"""
@@ -452,7 +558,10 @@ class GeoJSONConverter:
         
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(geojson_data, f, ensure_ascii=False, indent=2)
+                if self.compact:
+                    json.dump(geojson_data, f, ensure_ascii=False, separators=(',', ':'))
+                else:
+                    json.dump(geojson_data, f, ensure_ascii=False, indent=2)
             
             self.log_message(f"✅ GeoJSON saved successfully")
             return True
@@ -461,12 +570,84 @@ class GeoJSONConverter:
             self.log_message(f"❌ Error saving file: {e}")
             return False
     
+    def iter_features(self):
+        """Convert localities one at a time so streaming writers never hold the full collection"""
+        processed = 0
+        for locality in self.localities_data:
+            feature = self.build_feature(locality)
+            if feature is None:
+                continue
+            props = feature['properties']
+            self.stats['unique_elements'].update(props.get('elements') or [])
+            if props.get('country'):
+                self.stats['unique_countries'].add(props['country'])
+            processed += 1
+            yield feature
+        self.stats['localities_processed'] = processed
+        self.stats['coordinates_valid'] = processed
+    
+    def save_geojsonseq(self, output_file: str):
+        """Stream newline-delimited GeoJSON (one Feature per line, GeoJSONSeq)"""
+        self.log_message(f"💾 Streaming GeoJSONSeq to: {output_file}")
+        
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                for feature in self.iter_features():
+                    f.write(json.dumps(feature, ensure_ascii=False, separators=(',', ':')) + "\n")
+            
+            self.log_message(f"✅ Wrote {self.stats['localities_processed']} features")
+            return True
+            
+        except IOError as e:
+            self.log_message(f"❌ Error saving file: {e}")
+            return False
+    
+    def save_flatgeobuf(self, output_file: str):
+        """Stream features into a spatially indexed FlatGeobuf file"""
+        from mindat.utils.flatgeobuf import FlatGeobufWriter
+        
+        self.log_message(f"💾 Streaming FlatGeobuf to: {output_file}")
+        
+        try:
+            with FlatGeobufWriter(output_file, name='mines') as writer:
+                for feature in self.iter_features():
+                    writer.write_one(feature)
+            
+            self.log_message(f"✅ Wrote {self.stats['localities_processed']} features")
+            return True
+            
+        except IOError as e:
+            self.log_message(f"❌ Error saving file: {e}")
+            return False
+    
+    def stream_geojsonseq(self, localities_file: str = '-', output_file: str = '-') -> bool:
+        """Convert localities as they arrive (JSON/JSONL file or stdin) into GeoJSONSeq (file or stdout)"""
+        self.log_message(f"🗺️ Streaming features: {localities_file} → {output_file}")
+        self.localities_data = open_records(localities_file)  # consumed once by iter_features
+        try:
+            write_jsonl(self.iter_features(), output_file)
+        except (FileNotFoundError, json.JSONDecodeError, IOError) as e:
+            self.log_message(f"❌ Error streaming features: {e}")
+            return False
+        self.log_message(f"✅ Wrote {self.stats['localities_processed']} features")
+        return True
+    
+    def save_output(self, output_file: str, workers: int = 1) -> bool:
+        """Write by extension: .geojsonl/.geojsons → GeoJSONSeq, .fgb → FlatGeobuf, otherwise FeatureCollection"""
+        ext = os.path.splitext(output_file)[1].lower()
+        if ext in STREAMING_EXTENSIONS['geojsonseq']:
+            return self.save_geojsonseq(output_file)
+        if ext in STREAMING_EXTENSIONS['flatgeobuf']:
+            return self.save_flatgeobuf(output_file)
+        self.convert_to_geojson(workers=workers)
+        return self.save_geojson(output_file)
+    
     def generate_summary(self):
         """Generate processing summary"""
         summary = f"""
 🗺️  GEOJSON CONVERSION SUMMARY
 {'='*50}
-📊 Features created:         {len(self.geojson_features):,}
+📊 Features created:         {self.stats['localities_processed']:,}
 🌍 Unique countries:         {len(self.stats['unique_countries']):,}
 🧪 Unique elements:          {len(self.stats['unique_elements']):,}
 📍 Valid coordinates:        {self.stats['coordinates_valid']:,}
@@ -483,11 +664,62 @@ class GeoJSONConverter:
 """
         return summary
 
+def decode_compact(collection: Dict) -> Dict:
+    """Expand the dictionary-encoded properties of a compact FeatureCollection in place (no-op otherwise)"""
+    metadata = collection.get('metadata') or {}
+    if not metadata.get('compact'):
+        return collection
+    dictionaries = metadata.get('dictionaries') or {}
+    for feature in collection.get('features') or []:
+        props = feature.get('properties') or {}
+        for field, table in dictionaries.items():
+            value = props.get(field)
+            if isinstance(value, list):
+                props[field] = [table[i] for i in value]
+            elif value is not None:
+                props[field] = table[value]
+    del metadata['compact']
+    metadata.pop('dictionaries', None)
+    return collection
+
+_worker_converter: Optional[GeoJSONConverter] = None
+
+def _init_worker(geomaterials_lookup: Dict, compact: bool, precision: int):
+    """Process-pool initializer: one converter (and category cache) per worker"""
+    global _worker_converter
+    _worker_converter = GeoJSONConverter(compact=compact, precision=precision)
+    _worker_converter.geomaterials_lookup = geomaterials_lookup
+
+def _convert_chunk(localities: List[Dict]) -> List[Dict]:
+    return _worker_converter.convert_chunk(localities)
+
+def run(localities_file: str, geomaterials_file: str, output_file: str,
+        compact: bool = False, workers: int = 1, precision: int = 5) -> bool:
+    """Non-interactive conversion; GeoJSONSeq output (stdout "-" or .geojsonl) is streamed feature by feature"""
+    converter = GeoJSONConverter(compact=compact, precision=precision,
+                                 log_file=sys.stderr if output_file == '-' else None)
+    if not converter.load_geomaterials_file(geomaterials_file):
+        return False
+    if output_file == '-' or os.path.splitext(output_file)[1].lower() in STREAMING_EXTENSIONS['geojsonseq']:
+        ok = converter.stream_geojsonseq(localities_file, output_file)
+    else:
+        # a FeatureCollection needs every locality first (and .fgb its own writer)
+        converter.localities_data = [Locality.from_dict(r) for r in open_records(localities_file)]
+        ok = converter.save_output(output_file, workers=workers)
+    if ok:
+        print(converter.generate_summary(), file=converter.log_file)
+    return ok
+
 def main():
     print("🗺️ Advanced GeoJSON Converter for Leaflet Maps")
     print("="*60)
     
-    converter = GeoJSONConverter()
+    compact = input("📦 Compact output (no popup HTML, minified)? [y/N]: ").strip().lower() in ('y', 'yes')
+    precision = 5
+    if compact:
+        answer = input("🎯 Coordinate decimals (default: 5, ~1 m): ").strip()
+        precision = int(answer) if answer.isdigit() else 5
+    converter = GeoJSONConverter(compact=compact, precision=precision)
     
     # Get file paths
     localities_file = input("📍 Enter localities JSON file path: ").strip()
@@ -502,15 +734,12 @@ def main():
     if not converter.load_data_files(localities_file, geomaterials_file):
         return
     
-    # Convert to GeoJSON
-    converter.convert_to_geojson()
-    
-    # Save output
-    output_file = input("💾 Enter output GeoJSON file name (default: localities.geojson): ").strip()
+    # Convert and save (.geojsonl/.fgb are streamed feature by feature)
+    output_file = input("💾 Enter output file name (.geojson, .geojsonl or .fgb; default: localities.geojson): ").strip()
     if not output_file:
         output_file = "localities.geojson"
     
-    if converter.save_geojson(output_file):
+    if converter.save_output(output_file, workers=os.cpu_count() or 1):
         print(converter.generate_summary())
         print(f"\n🎉 SUCCESS! GeoJSON saved to: {output_file}")
         print("\n💡 Leaflet Integration Tips:")
@@ -522,9 +751,28 @@ def main():
         print("❌ Failed to save GeoJSON")
 
 if __name__ == '__main__':
+    ap = argparse.ArgumentParser("mindat-geojson")
+    ap.add_argument("--profile", action="store_true",
+                    help="Write cProfile/tracemalloc/peak-RSS reports (prompt time counts as wall time)")
+    ap.add_argument("--profile-dir", default="mindat_data", help="Where to write profiling reports")
+    ap.add_argument("--localities", default=None,
+                    help="Localities JSON/JSONL file, or - for JSONL on stdin (no prompts)")
+    ap.add_argument("--geomaterials", default="geomaterials_data.json", help="Geomaterials JSON file")
+    ap.add_argument("--out", default="-",
+                    help="Output (.geojson, .geojsonl or .fgb), or - for GeoJSONSeq on stdout")
+    ap.add_argument("--compact", action="store_true", help="No popup HTML, minified")
+    ap.add_argument("--precision", type=int, default=5, help="Coordinate decimals in compact mode (5 ≈ 1 m)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="FeatureCollection process-pool workers")
+    args = ap.parse_args()
     try:
-        main()
+        with profile_context(args.profile, args.profile_dir, "geojson"):
+            if args.localities is None:
+                main()
+            elif not run(args.localities, args.geomaterials, args.out, args.compact, args.workers, args.precision):
+                sys.exit(1)
     except KeyboardInterrupt:
-        print("\n⏸️  Process interrupted by user")
+        print("\n⏸️  Process interrupted by user", file=sys.stderr)
+        sys.exit(130)
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
\ No newline at end of file
+        print(f"\n❌ Unexpected error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,73 @@
+import json
+
+from mindat.services.build_service import BuildService
+
+NAMES = {1: "Quartz", 2: "Pyrite", 3: "Gold"}
+
+class Stages:
+    """Stand-ins for the scripts' clean/merge/feature functions that count their calls."""
+    def __init__(self):
+        self.calls = []
+
+    def clean(self, rec):
+        self.calls.append(rec["id"])
+        return dict(rec)
+
+    def merge(self, rec):
+        if rec.get("skip"):
+            return None
+        gms = rec.get("gms", [])
+        return {**rec, "geomaterial_ids": gms, "geomaterials_details": [{"id": g, "name": NAMES[g]} for g in gms]}
+
+    def feature(self, rec):
+        return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [50.0, 30.0]},
+                "properties": {"id": rec["id"], "txt": rec["txt"]}}
+
+def _write(path, recs):
+    path.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+
+def _ids(path):
+    return [f["properties"]["id"] for f in json.loads(path.read_text(encoding="utf-8"))["features"]]
+
+def _build(tmp_path, src, stages, key="v1"):
+    svc = BuildService(tmp_path / "out", stages.clean, stages.merge, stages.feature, key=key)
+    try:
+        return svc.run([src])
+    finally:
+        svc.close()
+
+RECS = [{"id": 1, "txt": "a", "gms": [1, 2]}, {"id": 2, "txt": "b", "gms": [2]},
+        {"id": 3, "txt": "c", "gms": [3]}, {"id": 4, "txt": "d", "skip": True}]
+
+def test_incremental_build(tmp_path):
+    src, out, stages = tmp_path / "raw.jsonl", tmp_path / "out", Stages()
+    _write(src, RECS)
+    stats = _build(tmp_path, src, stages)
+    assert stats["rebuilt"] == 4 and stats["layers_written"] == 3
+    assert _ids(out / "map.geojson") == [1, 2, 3]
+    assert _ids(out / "layers" / "2.geojson") == [1, 2]
+    assert json.loads((out / "layers" / "index.json").read_text())["2"] == {"name": "Pyrite", "features": 2}
+
+    # unchanged input: no stage runs, nothing rewritten
+    stages.calls.clear()
+    stats = _build(tmp_path, src, stages)
+    assert stages.calls == [] and stats["unchanged"] == 4 and stats["layers_written"] == 0
+
+    # 1 changes (leaves layer 1), 3 is gone, an edit of 2 appended later in the file wins
+    _write(src, [{"id": 1, "txt": "a2", "gms": [2]}, RECS[1], RECS[3], {"id": 2, "txt": "b2", "gms": [2]}])
+    stages.calls.clear()
+    stats = _build(tmp_path, src, stages)
+    assert sorted(stages.calls) == [1, 2] and stats["removed"] == 1
+    assert not (out / "layers" / "1.geojson").exists() and not (out / "layers" / "3.geojson").exists()
+    assert stats["layers_written"] == 1 and stats["layers_removed"] == 2
+    layer = json.loads((out / "layers" / "2.geojson").read_text())["features"]
+    assert [f["properties"]["txt"] for f in layer] == ["a2", "b2"]
+    assert [json.loads(line)["id"] for line in (out / "merged.jsonl").read_text().splitlines()] == [1, 2]
+
+def test_key_change_rebuilds_everything(tmp_path):
+    src, stages = tmp_path / "raw.jsonl", Stages()
+    _write(src, RECS)
+    _build(tmp_path, src, stages)
+    stages.calls.clear()
+    stats = _build(tmp_path, src, stages, key="v2")
+    assert stats["full"] and sorted(stages.calls) == [1, 2, 3, 4]
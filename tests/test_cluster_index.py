@@ -0,0 +1,46 @@
+import json
+
+from cli.pipe import load_script
+
+bci = load_script("build_cluster_index")
+
+def _feature(i, lng, lat):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lng, lat]},
+            "properties": {"id": i, "name": f"Mine {i}", "popupContent": f"<b>{i}</b>", "extra": "dropped"}}
+
+FEATURES = [
+    _feature(1, 51.0, 35.0),
+    _feature(2, 51.0000001, 35.0000001),  # same spot: still a cluster at max zoom
+    _feature(3, 51.01, 35.0),             # 1 km away: apart from z12 on
+    _feature(4, -70.0, -30.0),
+]
+
+def _tile_features(out, z):
+    feats = []
+    for x, y in json.loads((out / "index.json").read_text())["tiles"][str(z)]:
+        feats += json.loads((out / str(z) / str(x) / f"{y}.json").read_text())["features"]
+    return feats
+
+def test_write_stops_at_max_zoom(tmp_path):
+    index = bci.ClusterIndex(min_zoom=0, max_zoom=14).load(FEATURES).write(tmp_path)
+
+    assert sorted(map(int, index["tiles"])) == list(range(0, 15))
+    assert not (tmp_path / "15").exists()
+    assert index["total_points"] == 4
+
+    # every zoom accounts for every point exactly once
+    for z in (0, 8, 14):
+        feats = _tile_features(tmp_path, z)
+        assert sum(f["properties"].get("point_count", 1) for f in feats) == 4
+
+    (cluster,) = [f for f in _tile_features(tmp_path, 14) if f["properties"].get("cluster")]
+    props = cluster["properties"]
+    assert props["point_count"] == 2 and props["expansion_zoom"] == 15
+    # its points, for the page to show when it overzooms past max zoom
+    assert sorted(leaf["properties"]["id"] for leaf in props["leaves"]) == [1, 2]
+    assert "extra" not in props["leaves"][0]["properties"]
+
+def test_lower_zoom_clusters_carry_no_leaves(tmp_path):
+    bci.ClusterIndex(min_zoom=0, max_zoom=14).load(FEATURES).write(tmp_path)
+    (cluster,) = [f for f in _tile_features(tmp_path, 5) if f["properties"].get("cluster")]
+    assert cluster["properties"]["point_count"] == 3 and "leaves" not in cluster["properties"]
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from mindat.services.consolidate_service import ConsolidateService
+from mindat.utils.io import iter_records
+from mindat.utils.jsonl_index import JsonlReader
+
+def _rec(i, dm, src):
+    return {"id": i, "datemodify": dm, "src": src}
+
+@pytest.fixture
+def inputs(tmp_path):
+    a, b, c = tmp_path / "a.json", tmp_path / "b.jsonl", tmp_path / "c.jsonl"
+    a.write_text(json.dumps({"results": [
+        _rec(1, "2024-03-01", "a"), _rec(2, "2024-01-01", "a"), _rec(3, "2024-01-01", "a"),
+        {"txt": "no id"}, _rec(5, "2024-01-01", "a"),
+    ]}), encoding="utf-8")
+    b.write_text("".join(json.dumps(r) + "\n" for r in [
+        _rec(1, "2024-02-01", "b"),  # older edit: loses to a
+        _rec(2, "2024-05-01", "b"),  # newer edit: wins
+        _rec(3, "2024-01-01", "b"),  # tie: the later input wins...
+        _rec(4, "2024-01-01", "b"), _rec(4, "2024-01-02", "b2"),  # repeated within one file
+    ]), encoding="utf-8")
+    c.write_text(json.dumps(_rec(3, "2024-01-01", "c")) + "\n", encoding="utf-8")  # ...so c
+    return [a, b, c]
+
+EXPECTED = [_rec(1, "2024-03-01", "a"), _rec(2, "2024-05-01", "b"), _rec(3, "2024-01-01", "c"),
+            _rec(4, "2024-01-02", "b2"), _rec(5, "2024-01-01", "a")]
+
+@pytest.mark.parametrize("run_size, fan_in", [(100_000, 64), (2, 2)])  # in memory / multi-pass merge
+def test_newest_wins(tmp_path, inputs, run_size, fan_in):
+    out = tmp_path / "all.json"
+    stats = ConsolidateService(run_size=run_size, fan_in=fan_in, tmp_dir=tmp_path).run(inputs, out)
+    assert list(iter_records(out)) == EXPECTED
+    assert stats["read"] == 11 and stats["no_id"] == 1 and stats["written"] == 5
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("consolidate-")] == []
+
+def test_jsonl_output_with_index(tmp_path, inputs):
+    out = tmp_path / "all.jsonl"
+    ConsolidateService(run_size=3).run(inputs, out, save_format="jsonl", index=True)
+    assert list(iter_records(out)) == EXPECTED
+    with JsonlReader(out) as r:
+        assert r.get(3)["src"] == "c" and len(r) == 5
@@ -0,0 +1,32 @@
+from argparse import Namespace
+
+import pytest
+
+from cli import download
+from cli.prompts import PromptResult
+from mindat.config import load_config
+
+class _Built(Exception):
+    pass
+
+def _run(tmp_path, monkeypatch, answer, page_size=None):
+    calls = {}
+    def build_client(cfg, metrics=None, tune=False):
+        calls.update(page_size=cfg.page_size, tune=tune)
+        raise _Built  # stop before any HTTP
+    monkeypatch.setattr(download, "build_client", build_client)
+    monkeypatch.setattr(download.Questioner, "ask", lambda self: answer)
+    args = Namespace(country=None, stdout=False, page_size=page_size, metrics_port=None)
+    with pytest.raises(_Built):
+        download.run(args, load_config(str(tmp_path / "missing.yaml")), None)
+    return calls
+
+def test_prompted_page_size_is_fixed(tmp_path, monkeypatch):
+    assert _run(tmp_path, monkeypatch, PromptResult("Iran", "Mine", 250)) == {"page_size": 250, "tune": False}
+
+def test_blank_prompt_leaves_page_size_to_the_tuner(tmp_path, monkeypatch):
+    assert _run(tmp_path, monkeypatch, PromptResult("Iran", "Mine", None)) == {"page_size": 100, "tune": True}
+
+def test_page_size_flag_wins_over_the_prompt(tmp_path, monkeypatch):
+    got = _run(tmp_path, monkeypatch, PromptResult("Iran", "Mine", 250), page_size=50)
+    assert got == {"page_size": 50, "tune": False}
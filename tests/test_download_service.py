@@ -0,0 +1,77 @@
+import json
+import sqlite3
+
+from mindat.services.download_service import DownloadService
+from mindat.utils.dlq import DeadLetterQueue
+from mindat.utils.seen import SeenSet
+from mindat.utils.sinks import GeoJsonSink, SqliteSink
+
+LISTING = [{"id": i, "txt": f"Mine {i}", "country": "Iran", "latitude": 30.0 + i, "longitude": 50.0,
+            "datemodify": "2024-01-01"} for i in (1, 2, 3)]
+
+class FakeClient:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.detail_calls = []
+
+    def get_locality_detail(self, loc_id, expand_geomaterials=False):
+        self.detail_calls.append(loc_id)
+        if loc_id in self.failing:
+            raise ConnectionError("boom")
+        return {"id": loc_id, "geomaterials": [{"id": 3314}]}
+
+    def list_locality_minerals(self, loc_id):
+        return [{"mineral": 3314}]
+
+class FakeRepo:
+    def iter_mines_in_country(self, country, on_count=None):
+        return iter([dict(loc) for loc in LISTING])
+
+def _service(tmp_path, client, **kw):
+    return DownloadService(client, FakeRepo(), tmp_path, save_format="jsonl",
+                           seen=SeenSet(tmp_path / "seen.sqlite"),
+                           dlq=DeadLetterQueue(tmp_path / "dlq.sqlite"), **kw)
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def test_retry_marks_patched_records_seen(tmp_path):
+    svc = _service(tmp_path, FakeClient(failing={2}))
+    out = svc.download_country_mines("Iran", retry_failed=False)
+    assert 2 not in svc.seen and len(svc.dlq) == 1
+
+    svc.client = FakeClient()
+    assert svc.retry_dead_letters(out) == (1, 0)
+    assert 2 in svc.seen and len(svc.dlq) == 0
+    assert [r["id"] for r in _lines(out)] == [1, 2, 3]
+    assert _lines(out)[1]["detail"]["id"] == 2
+
+    # the next run skips it instead of enriching and appending it again
+    svc.client = client = FakeClient()
+    svc.download_country_mines("Iran")
+    assert client.detail_calls == [] and len(_lines(out)) == 3
+
+def test_retry_still_failing_stays_unseen(tmp_path):
+    svc = _service(tmp_path, FakeClient(failing={2}))
+    out = svc.download_country_mines("Iran")
+    assert svc.retry_dead_letters(out) == (0, 1)
+    assert 2 not in svc.seen and 1 in svc.seen
+
+def test_end_of_run_retry_updates_the_sinks(tmp_path):
+    class FlakyClient(FakeClient):  # fails once, so the end-of-run retry succeeds
+        def get_locality_detail(self, loc_id, expand_geomaterials=False):
+            if loc_id == 2 and self.failing:
+                self.failing.clear()
+                raise ConnectionError("boom")
+            return super().get_locality_detail(loc_id, expand_geomaterials)
+
+    db, geo = tmp_path / "out.sqlite", tmp_path / "out.geojson"
+    svc = _service(tmp_path, FlakyClient(failing={2}), sinks=[SqliteSink(db), GeoJsonSink(geo)])
+    svc.download_country_mines("Iran")
+
+    assert 2 in svc.seen and len(svc.dlq) == 0
+    (record,) = sqlite3.connect(db).execute("SELECT record FROM localities WHERE id = 2").fetchone()
+    assert json.loads(record)["detail"]["id"] == 2
+    features = json.loads(geo.read_text(encoding="utf-8"))["features"]
+    assert [f["properties"]["id"] for f in features] == [1, 2, 3]
+    assert features[1]["properties"]["geomaterial_count"] == 1
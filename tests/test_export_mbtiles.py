@@ -0,0 +1,103 @@
+import gzip
+import json
+import sqlite3
+import struct
+
+from cli.pipe import load_script
+
+mbt = load_script("export_mbtiles")
+
+def _varint(buf, pos):
+    n = shift = 0
+    while True:
+        b = buf[pos]; pos += 1
+        n |= (b & 0x7F) << shift; shift += 7
+        if not b & 0x80:
+            return n, pos
+
+def _fields(buf):
+    """(field, value) pairs of one protobuf message (varint, 64-bit and length-delimited)."""
+    pos, out = 0, []
+    while pos < len(buf):
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            v, pos = _varint(buf, pos)
+        elif wire == 1:
+            v, pos = buf[pos:pos + 8], pos + 8
+        else:
+            n, pos = _varint(buf, pos)
+            v, pos = buf[pos:pos + n], pos + n
+        out.append((field, v))
+    return out
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+def _decode(tile: bytes):
+    """The single layer of a tile: (name, extent, [(id, (x, y), {key: value})])."""
+    ((field, layer),) = _fields(tile)
+    assert field == 3
+    f = _fields(layer)
+    keys = [v.decode() for k, v in f if k == 3]
+    values = []
+    for k, v in f:
+        if k == 4:
+            ((vf, raw),) = _fields(v)
+            values.append({1: lambda r: r.decode(), 3: lambda r: struct.unpack("<d", r)[0],
+                           6: _unzigzag, 7: bool}[vf](raw))
+    feats = []
+    for k, v in f:
+        if k == 2:
+            ff = dict(_fields(v))
+            tags, pos, tag_ids = ff[2], 0, []
+            while pos < len(tags):
+                t, pos = _varint(tags, pos); tag_ids.append(t)
+            geom, pos, cmds = ff[4], 0, []
+            while pos < len(geom):
+                c, pos = _varint(geom, pos); cmds.append(c)
+            assert ff[3] == 1 and cmds[0] == 9  # POINT, MoveTo(1)
+            props = {keys[a]: values[b] for a, b in zip(tag_ids[::2], tag_ids[1::2])}
+            feats.append((ff[1], (_unzigzag(cmds[1]), _unzigzag(cmds[2])), props))
+    name = next(v.decode() for k, v in f if k == 1)
+    extent = next(v for k, v in f if k == 5)
+    return name, extent, feats
+
+def test_encode_tile_round_trip():
+    tile = mbt.encode_tile([(7, 10, 4090, {"name": "Mine", "score": 2.5, "n": -3, "ok": True, "gone": None}),
+                            (8, -20, 5, {"name": "Mine", "n": 4})])
+    name, extent, feats = _decode(tile)
+    assert (name, extent) == (mbt.LAYER_NAME, mbt.EXTENT)
+    assert feats == [(7, (10, 4090), {"name": "Mine", "score": 2.5, "n": -3, "ok": True}),
+                     (8, (-20, 5), {"name": "Mine", "n": 4})]
+
+def _feature(i, lng, lat):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lng, lat]},
+            "properties": {"id": i, "name": f"Mine {i}", "importance_score": 10.0 - i, "importance_level": 1,
+                           "elements": ["Fe", "S"], "geomaterial_count": 2, "discovered_before": i % 2 == 0}}
+
+def test_build(tmp_path):
+    out = tmp_path / "mines.mbtiles"
+    features = [_feature(1, 51.0, 35.0), _feature(2, 51.001, 35.001), _feature(3, -70.0, -30.0)]
+    stats = mbt.MBTilesBuilder(min_zoom=0, max_zoom=6, full_zoom=4, detail_zoom=3).build(features, out)
+
+    db = sqlite3.connect(out)
+    assert db.execute("SELECT COUNT(*) FROM tiles").fetchone()[0] == stats["tiles"]
+    assert db.execute("SELECT COUNT(*) FROM images").fetchone()[0] == stats["unique_tiles"] <= stats["tiles"]
+    meta = dict(db.execute("SELECT name, value FROM metadata"))
+    fields = json.loads(meta["json"])["vector_layers"][0]["fields"]
+    assert fields == {"id": "Number", "name": "String", "importance_level": "Number",
+                      "importance_score": "Number", "geomaterial_count": "Number",
+                      "elements": "String", "discovered_before": "Boolean"}
+
+    # z0: one tile; thinned to one point per grid cell, attributes pruned
+    (blob,) = db.execute("SELECT tile_data FROM tiles WHERE zoom_level = 0").fetchone()
+    _, _, feats = _decode(gzip.decompress(blob))
+    assert sorted(f[0] for f in feats) == [1, 3]
+    assert set(feats[0][2]) == {"id", "name", "importance_score", "importance_level"}
+    # z6 (TMS row): full detail
+    x, y = 41, 25  # tile of (51.0, 35.0) at z6
+    (blob,) = db.execute("SELECT tile_data FROM tiles WHERE zoom_level = 6 AND tile_column = ? AND tile_row = ?",
+                         (x, 2 ** 6 - 1 - y)).fetchone()
+    feats = {f[0]: f[2] for f in _decode(gzip.decompress(blob))[2]}
+    assert set(feats) == {1, 2} and feats[1]["elements"] == "Fe,S" and feats[1]["discovered_before"] is False
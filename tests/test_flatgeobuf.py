@@ -0,0 +1,48 @@
+import struct
+
+import pytest
+
+from mindat.utils.flatgeobuf import MAGIC, FlatGeobufWriter, _level_bounds
+
+NODE = 40  # packed R-tree node: 4 doubles + uint64 offset
+
+def _write(path, n):
+    with FlatGeobufWriter(path) as w:
+        for i in range(n):
+            w.write_one({"type": "Feature", "geometry": {"type": "Point", "coordinates": [50 + i / 10, 30.0]},
+                         "properties": {"id": i, "name": f"Mine {i}", "area": 1.5, "active": i % 2 == 0}})
+    return path
+
+@pytest.mark.parametrize("n, levels", [(1, [1, 1]), (2, [2, 1]), (16, [16, 1]), (17, [17, 2, 1]),
+                                       (300, [300, 19, 2, 1])])
+def test_level_bounds(n, levels):
+    bounds = _level_bounds(n, 16)
+    assert [end - start for start, end in bounds] == levels
+    assert bounds[-1][0] == 0  # root first, leaves last
+
+@pytest.mark.parametrize("n, nodes", [(1, 2), (17, 20)])
+def test_index_size(tmp_path, n, nodes):
+    data = _write(tmp_path / "out.fgb", n).read_bytes()
+    assert data[:8] == MAGIC
+    (header_len,) = struct.unpack_from("<I", data, 8)
+    index_start = 12 + header_len
+    # features follow the index: the first leaf's offset 0 points at a size-prefixed feature
+    features = data[index_start + nodes * NODE:]
+    sizes = []
+    while features:
+        (size,) = struct.unpack_from("<I", features)
+        sizes.append(size); features = features[4 + size:]
+    assert len(sizes) == n
+    root = struct.unpack_from("<dddd", data, index_start)
+    assert root == (50.0, 30.0, 50 + (n - 1) / 10, 30.0)
+
+@pytest.mark.parametrize("n", [1, 2, 17, 300])
+def test_round_trip(tmp_path, n):
+    pyogrio = pytest.importorskip("pyogrio")
+    path = str(_write(tmp_path / "out.fgb", n))
+    meta, _, geometry, fields = pyogrio.raw.read(path)
+    assert list(meta["fields"]) == ["id", "name", "area", "active"]
+    assert sorted(fields[0]) == list(range(n))
+    # a bbox query goes through the spatial index
+    hits = pyogrio.read_bounds(path, bbox=(49.95, 29.0, 50.05, 31.0))[0]
+    assert len(hits) == 1
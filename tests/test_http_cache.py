@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+
+import pytest
+
+from mindat.config import load_config
+from mindat.errors import MindatHTTPError
+from mindat.http import HttpSession
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    cfg = load_config(str(tmp_path / "missing.yaml"))
+    s = HttpSession("https://api.example", cfg.retries, cfg.timeouts, "key", cache_size=2)
+    s.calls = []
+    s.release = threading.Event()
+    s.release.set()
+
+    def fetch(url, params, window=None):
+        s.calls.append((url, params))
+        s.release.wait(5)
+        if "fail" in url:
+            raise MindatHTTPError(f"HTTP 500 {url}")
+        return json.dumps({"url": url, "params": params}).encode(), url
+    monkeypatch.setattr(s, "_fetch", fetch)
+    return s
+
+def test_concurrent_identical_gets_share_one_call(session):
+    session.release.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(session.get_json("https://api.example/a", {"p": 1})))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)  # let every thread find the in-flight call
+    session.release.set()
+    for t in threads:
+        t.join()
+    assert len(session.calls) == 1 and len(results) == 8
+    assert results[0] == results[1] and results[0] is not results[1]  # each caller gets its own copy
+    counters = session.metrics.counters
+    assert counters["cache_misses"] == 1 and counters["coalesced"] == 7
+
+def test_responses_are_memoized_in_a_bounded_lru(session):
+    for url in ("a", "b", "a", "c", "b"):
+        session.get_json(f"https://api.example/{url}")
+    # a, b fetched; a hit; c evicts b (a was used more recently); b fetched again
+    assert [u for u, _ in session.calls] == ["https://api.example/" + u for u in ("a", "b", "c", "b")]
+    assert session.metrics.counters["cache_hits"] == 1
+
+def test_params_are_part_of_the_key(session):
+    session.get_json("https://api.example/a", {"page": 1, "size": 10})
+    session.get_json("https://api.example/a", {"size": 10, "page": 1})
+    session.get_json("https://api.example/a", {"page": 2, "size": 10})
+    assert len(session.calls) == 2
+
+def test_errors_reach_every_waiter_and_are_not_cached(session):
+    session.release.clear()
+    errors = []
+    def get():
+        try:
+            session.get_json("https://api.example/fail")
+        except MindatHTTPError as e:
+            errors.append(e)
+    threads = [threading.Thread(target=get) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    session.release.set()
+    for t in threads:
+        t.join()
+    assert len(errors) == 3 and len(session.calls) == 1
+    with pytest.raises(MindatHTTPError):
+        session.get_json("https://api.example/fail")
+    assert len(session.calls) == 2
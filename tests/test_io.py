@@ -0,0 +1,36 @@
+import json
+
+from mindat.utils.io import JsonAccumulator, iter_records, patch_records
+
+def _rec(i, **kw):
+    return {"id": i, "txt": f"Mine {i}", **kw}
+
+def test_patch_keeps_the_accumulator_layout(tmp_path):
+    out = tmp_path / "out.json"
+    acc = JsonAccumulator(out)
+    for i in (1, 2, 3):
+        acc.write(_rec(i))
+    patched = []
+    assert patch_records(out, {2: {"detail": {"id": 2}}}, patched.append) == 1
+    assert patched == [_rec(2, detail={"id": 2})]
+
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == '{"results": [' and lines[-1] == "]}"
+    assert [json.loads(line.rstrip(",")) for line in lines[1:-1]] == [_rec(1), _rec(2, detail={"id": 2}), _rec(3)]
+    # reloaded, the patched record is unchanged, so writing it again is a no-op
+    assert JsonAccumulator(out).write(_rec(2, detail={"id": 2})) is False
+
+def test_patch_jsonl(tmp_path):
+    out = tmp_path / "out.jsonl"
+    out.write_text("".join(json.dumps(_rec(i)) + "\n" for i in (1, 2)), encoding="utf-8")
+    assert patch_records(out, {1: {"locality_minerals": []}, 9: {"detail": {}}}) == 1
+    assert list(iter_records(out)) == [_rec(1, locality_minerals=[]), _rec(2)]
+    assert not out.with_suffix(".tmp").exists()
+
+def test_accumulator_dedups_by_id(tmp_path):
+    out = tmp_path / "out.json"
+    acc = JsonAccumulator(out)
+    assert acc.write(_rec(1, datemodify="a")) and acc.write(_rec(2))
+    assert acc.write(_rec(1, datemodify="a")) is False
+    assert acc.write(_rec(1, datemodify="b"))
+    assert [r["datemodify"] if r["id"] == 1 else None for r in iter_records(out)] == ["b", None]
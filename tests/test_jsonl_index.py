@@ -0,0 +1,87 @@
+import json
+
+from mindat.utils.io import JsonlWriter, patch_records
+from mindat.utils.jsonl_index import ENTRY, HEADER, MAGIC, append_entry, index_path, JsonlReader
+
+def _rec(i, **kw):
+    return {"id": i, "txt": f"Mine {i}", **kw}
+
+def _entries(path):
+    raw = index_path(path).read_bytes()
+    assert raw.startswith(MAGIC)
+    covered = HEADER.unpack_from(raw)[1]
+    return covered, [e[0] for e in ENTRY.iter_unpack(raw[HEADER.size:])]
+
+def _get_all(path, ids):
+    with JsonlReader(path) as r:
+        return {i: (r.get(i) or {}).get("id") for i in ids}
+
+def test_sidecar_follows_appends(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    w = JsonlWriter(out, index=True)
+    for i in (1, 2, 3):
+        w.write(_rec(i))
+    covered, ids = _entries(out)
+    assert covered == out.stat().st_size and ids == [1, 2, 3]
+    before = index_path(out).read_bytes()
+    assert _get_all(out, [1, 2, 3]) == {1: 1, 2: 2, 3: 3}
+    assert index_path(out).read_bytes() == before  # trusted as is, not rebuilt or extended
+
+def test_repeated_id_last_line_wins(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    w = JsonlWriter(out, index=True)
+    w.write(_rec(1, datemodify="a")); w.write(_rec(2)); w.write(_rec(1, datemodify="b"))
+    with JsonlReader(out) as r:
+        assert r.get(1)["datemodify"] == "b" and len(r) == 2
+
+def test_lines_appended_without_the_index_are_picked_up(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    JsonlWriter(out, index=True).write(_rec(1))
+    plain = JsonlWriter(out)  # index off, or another writer
+    plain.write(_rec(2)); plain.write(_rec(3))
+    JsonlWriter(out, index=True).write(_rec(4))
+    covered, ids = _entries(out)
+    assert covered == out.stat().st_size and ids == [1, 2, 3, 4]
+    assert _get_all(out, [1, 2, 3, 4]) == {1: 1, 2: 2, 3: 3, 4: 4}
+
+def test_entry_written_before_a_crash_is_dropped(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    w = JsonlWriter(out, index=True)
+    w.write(_rec(1))
+    # a torn line whose entry made it to the sidecar, but not the header move
+    torn = b'{"id": 2, "tx'
+    with out.open("ab") as f:
+        offset = f.tell(); f.write(torn)
+    with index_path(out).open("ab") as f:
+        f.write(ENTRY.pack(2, offset, len(torn) + 5))
+    with out.open("ab") as f:
+        f.write(b"\n")
+    w.write(_rec(3))
+    assert _entries(out)[1] == [1, 3]
+    with JsonlReader(out) as r:
+        assert 2 not in r and r.get(3)["id"] == 3
+
+def test_rewritten_file_rebuilds_the_sidecar(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    w = JsonlWriter(out, index=True)
+    for i in (1, 2, 3):
+        w.write(_rec(i))
+    patch_records(out, {2: {"detail": {"id": 2, "name": "a longer record than before"}}})
+    w.write(_rec(4))
+    assert _entries(out)[1] == [1, 2, 3, 4]
+    with JsonlReader(out) as r:
+        assert r.get(2)["detail"]["id"] == 2 and r.get(3)["id"] == 3
+
+def test_old_format_sidecar_is_rebuilt(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    out.write_text(json.dumps(_rec(1)) + "\n", encoding="utf-8")
+    index_path(out).write_bytes(ENTRY.pack(1, 0, 5))  # no header
+    JsonlWriter(out, index=True).write(_rec(2))
+    assert _entries(out) == (out.stat().st_size, [1, 2])
+
+def test_append_entry_without_a_sidecar_builds_one(tmp_path):
+    out = tmp_path / "loc.jsonl"
+    line = json.dumps(_rec(7)).encode()
+    out.write_bytes(line + b"\n")
+    append_entry(out, 7, 0, len(line))
+    assert _entries(out) == (len(line) + 1, [7])
@@ -0,0 +1,44 @@
+import json
+import pickle
+
+import pytest
+
+from mindat.models import Geomaterial, Locality, LocalityMineral, json_default
+
+RAW = {
+    "id": 12, "txt": "Sar Cheshmeh", "country": "Iran", "latitude": 29.94, "longitude": 55.87,
+    "unknown_field": {"x": 1}, "datemodify": "2024-01-01",
+    "geomaterials": [3314, {"id": 3337, "name": "Pyrite", "entrytype_text": "mineral", "new_key": True}],
+    "detail": {"id": 12, "txt": "Sar Cheshmeh", "geomaterials": [{"id": 3314, "name": "Quartz"}]},
+    "locality_minerals": [{"id": 1, "locality": 12, "geomaterial": 3314, "status": "confirmed"}],
+}
+
+def test_round_trip_is_byte_for_byte():
+    loc = Locality.from_dict(json.loads(json.dumps(RAW)))
+    assert json.dumps(loc, default=json_default) == json.dumps(RAW)
+    assert loc.to_dict() == RAW and loc == RAW
+
+def test_nested_records_are_decoded():
+    loc = Locality.from_dict(RAW)
+    assert isinstance(loc["detail"], Locality)
+    assert isinstance(loc["geomaterials"][1], Geomaterial) and loc["geomaterials"][0] == 3314
+    assert isinstance(loc["locality_minerals"][0], LocalityMineral)
+    assert loc["geomaterials"][1]["new_key"] is True  # unknown keys go to extra
+
+def test_dict_interface():
+    loc = Locality.from_dict(RAW)
+    assert loc.get("missing") is None and "unknown_field" in loc and "level" not in loc
+    with pytest.raises(KeyError):
+        loc["level"]
+    loc["ancestors"] = [1, 2]; loc["added"] = "x"; loc.txt = "renamed"
+    assert list(loc.keys())[-2:] == ["ancestors", "added"]
+    assert loc.to_dict()["txt"] == "renamed"
+
+def test_repeated_values_are_shared():
+    a = Locality.from_dict(json.loads(json.dumps(RAW)))
+    b = Locality.from_dict(json.loads(json.dumps(RAW)))
+    assert a.country is b.country and a._keys is b._keys
+
+def test_pickle():
+    loc = Locality.from_dict(RAW)
+    assert pickle.loads(pickle.dumps(loc)).to_dict() == RAW
@@ -0,0 +1,45 @@
+from mindat.page_tuner import PageSizeTuner
+
+EP = "localities"
+
+def _page(t, size, secs_per_item, cap=None):
+    got = min(size, cap) if cap else size
+    t.observe(EP, size, got, got * secs_per_item, has_next=True)
+
+def test_climbs_while_throughput_improves():
+    t = PageSizeTuner(initial=100, max_size=1000)
+    # bigger pages amortise a fixed 0.5 s per request
+    for _ in range(20):
+        size = t.size_for(EP)
+        t.observe(EP, size, size, 0.5 + size * 0.001, has_next=True)
+    assert t.size_for(EP) == 1000
+
+def test_settles_on_the_best_measured_size():
+    t = PageSizeTuner(initial=100)
+    for _ in range(20):
+        size = t.size_for(EP)
+        # a fixed 0.5 s per request, until pages above 150 get slow on the server
+        t.observe(EP, size, size, 0.5 + size * (0.001 if size <= 150 else 0.05), has_next=True)
+    assert t.size_for(EP) == 150
+
+def test_short_full_page_reveals_the_cap():
+    t = PageSizeTuner(initial=500)
+    _page(t, 500, 0.001, cap=200)
+    assert t.snapshot()[EP]["cap"] == 200
+    for _ in range(10):
+        _page(t, t.size_for(EP), 0.001, cap=200)
+    assert t.size_for(EP) == 200
+
+def test_last_page_is_ignored():
+    t = PageSizeTuner(initial=100)
+    t.observe(EP, 100, 7, 0.1, has_next=False)
+    assert t.size_for(EP) == 100 and t.snapshot()[EP]["cap"] is None
+
+def test_state_survives_runs(tmp_path):
+    path = tmp_path / "page_sizes.json"
+    t = PageSizeTuner(path, initial=100)
+    for _ in range(3):
+        _page(t, t.size_for(EP), 0.001)
+    chosen = t.size_for(EP)
+    t.save()
+    assert PageSizeTuner(path, initial=100).size_for(EP) == chosen != 100
@@ -0,0 +1,36 @@
+import json
+from argparse import Namespace
+
+from cli import pipe
+
+GEOMATERIALS = {"results": [
+    {"id": 3314, "name": "Quartz", "entrytype_text": "mineral", "elements": "-O-Si-"},
+    {"id": 3337, "name": "Pyrite", "entrytype_text": "mineral", "elements": "-Fe-S-"},
+]}
+
+def _locality(i):
+    return {"id": i, "txt": f"Mine {i}", "country": "Iran", "latitude": 30.0 + i / 100,
+            "longitude": 50.0 + i / 100, "elements": "-Fe-S-", "geomaterials": [3314, 3337]}
+
+def _args(tmp_path, **kw):
+    base = dict(config=str(tmp_path / "missing.yaml"), profile=False, compact=False,
+                precision=5, workers=1)
+    base.update(kw)
+    return Namespace(**base)
+
+def test_geojson_stage_with_worker_pool(tmp_path):
+    # more than one 500-locality chunk, so convert_to_geojson really uses the process pool
+    src, gm, out = tmp_path / "merged.jsonl", tmp_path / "gm.json", tmp_path / "map.geojson"
+    src.write_text("".join(json.dumps(_locality(i)) + "\n" for i in range(1, 1201)), encoding="utf-8")
+    gm.write_text(json.dumps(GEOMATERIALS), encoding="utf-8")
+
+    rc = pipe.geojson(_args(tmp_path, inp=str(src), geomaterials=str(gm), out=str(out), workers=2))
+
+    assert rc == 0
+    features = json.loads(out.read_text(encoding="utf-8"))["features"]
+    assert sorted(f["properties"]["id"] for f in features) == list(range(1, 1201))
+
+def test_load_script_is_importable_by_name():
+    mod = pipe.load_script("to_leaflet_geojson")
+    # what pickle does for the pool's initializer and chunk function
+    assert __import__(mod.__name__)._convert_chunk is mod._convert_chunk
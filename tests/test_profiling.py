@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from mindat.utils.profiling import profiled
+
+def _line(marker: str) -> str:
+    src = Path(__file__).read_text(encoding="utf-8").splitlines()
+    return f"{Path(__file__).name}:{next(i for i, s in enumerate(src, 1) if s.endswith('# ' + marker))}"
+
+def test_report_shows_growth_during_the_block(tmp_path):
+    before = [bytes(1000) for _ in range(2000)]  # BEFORE
+    kept = []
+    with profiled(tmp_path / "run", top=5):
+        kept.append([bytes(1000) for _ in range(3000)])  # KEPT
+        tmp = [bytes(1000) for _ in range(5000)]  # FREED
+        del tmp
+
+    report = (tmp_path / "run.profile.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "run.prof").exists()
+    section = report.split("growth during the run", 1)[1].split("cProfile", 1)[0]
+    rows = section.strip().splitlines()[1:]
+    assert _line("KEPT") in rows[0] and rows[0].lstrip().startswith("+")
+    # live before the block, or freed within it: not growth (the 5 MB list is not reported)
+    assert _line("BEFORE") not in section
+    assert all(float(row.split()[0]) < 100 for row in rows[1:])
+    assert before and kept
@@ -0,0 +1,83 @@
+import json
+import sqlite3
+
+import pytest
+
+from cli.common import build_sinks
+from mindat.config import load_config
+from mindat.utils.sinks import GeoJsonSink, Sink, SqliteSink, StreamSink, ThreadedSink
+
+def _item(i, lat=30.0, **kw):
+    return {"id": i, "txt": f"Mine {i}", "country": "Iran", "latitude": lat, "longitude": 50.0,
+            "elements": "-Fe-S-", **kw}
+
+def _line(item):
+    return json.dumps(item).encode()
+
+def _ids(path):
+    return [f["properties"]["id"] for f in json.loads(path.read_text(encoding="utf-8"))["features"]]
+
+def test_geojson_sink_upserts_by_id(tmp_path):
+    path = tmp_path / "map.geojson"
+    sink = GeoJsonSink(path)
+    for item in (_item(1), _item(2), _item(3)):
+        sink.write(item, _line(item))
+    sink.close()
+    assert _ids(path) == [1, 2, 3]
+
+    # next run: 2 changed, 3 lost its coordinates, 4 is new, 1 is skipped (seen) but kept
+    sink = GeoJsonSink(path)
+    for item in (_item(2, txt="renamed"), _item(3, lat=None), _item(4)):
+        sink.write(item, _line(item))
+    sink.write(_item(2, txt="again"), _line(_item(2, txt="again")))  # written twice in one run
+    assert not path.with_name("map.geojson.tmp").exists()  # nothing half-written before close
+    sink.close()
+    features = json.loads(path.read_text(encoding="utf-8"))["features"]
+    assert sorted(f["properties"]["id"] for f in features) == [1, 2, 4]
+    assert [f["properties"]["name"] for f in features if f["properties"]["id"] == 2] == ["again"]
+    assert features[0]["properties"]["elements"] == ["Fe", "S"]
+
+def test_sqlite_sink_upserts(tmp_path):
+    path = tmp_path / "out.sqlite"
+    sink = SqliteSink(path, commit_every=1)
+    sink.write(_item(1), _line(_item(1)))
+    sink.write(_item(1, txt="new"), _line(_item(1, txt="new")))
+    sink.close()
+    rows = sqlite3.connect(path).execute("SELECT id, txt, json_extract(record, '$.txt') FROM localities").fetchall()
+    assert rows == [(1, "new", "new")]
+
+def test_threaded_sink_reraises_the_writer_error():
+    class Broken(Sink):
+        closed = False
+        def write(self, item, line):
+            raise ValueError("disk full")
+        def close(self):
+            Broken.closed = True
+    sink = ThreadedSink(Broken(), maxsize=1)
+    sink.write({"id": 1}, b"{}")
+    with pytest.raises(ValueError, match="disk full"):
+        sink.close()
+    assert Broken.closed
+
+def test_stream_sink_writes_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with path.open("wb") as f:
+        sink = StreamSink(f)
+        for i in (1, 2):
+            sink.write(_item(i), _line(_item(i)))
+        sink.close()
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [1, 2]
+
+def test_build_sinks(tmp_path):
+    cfg = load_config(str(tmp_path / "missing.yaml"))
+    cfg.save.dir, cfg.save.sink_threads = str(tmp_path), False
+    primary = tmp_path / "Iran.jsonl"
+    sinks = build_sinks(cfg, ["sqlite", f"geojson={tmp_path / 'map.geojson'}"], "Iran", primary)
+    assert [type(s) for s in sinks] == [SqliteSink, GeoJsonSink]
+    assert sinks[0].path == tmp_path / "Iran.sqlite"
+    for s in sinks:
+        s.close()
+    with pytest.raises(SystemExit):
+        build_sinks(cfg, ["jsonl"], "Iran", primary)  # would overwrite the primary output
+    with pytest.raises(SystemExit):
+        build_sinks(cfg, ["parquet"], "Iran", primary)
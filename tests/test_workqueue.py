@@ -0,0 +1,57 @@
+import pytest
+
+from mindat.workqueue.sqlite_queue import SqliteWorkQueue
+
+EXPIRED = -1.0  # a lease that has already run out, so tests need not sleep
+
+@pytest.fixture
+def q(tmp_path):
+    q = SqliteWorkQueue(tmp_path / "queue.sqlite")
+    yield q
+    q.close()
+
+def test_put_is_idempotent(q):
+    assert q.put([{"id": i} for i in (1, 2, 3)]) == 3
+    assert q.put([{"id": i} for i in (2, 3, 4)]) == 1
+    assert q.stats()["pending"] == 4
+
+def test_lease_is_exclusive_until_it_expires(q):
+    q.put([{"id": 1}, {"id": 2}])
+    (t,) = q.claim("a", 1, lease_seconds=60)
+    assert (t.id, t.payload, t.attempts) == (1, {"id": 1}, 1)
+    assert [t.id for t in q.claim("b", 5, lease_seconds=60)] == [2]  # 1 is still leased to a
+    assert q.claim("c", 5, lease_seconds=60) == []
+
+def test_expired_lease_is_reclaimed_and_the_old_holder_cannot_complete(q):
+    q.put([{"id": 1}])
+    q.claim("a", 1, lease_seconds=EXPIRED)
+    assert q.stats()["expired"] == 1
+    (t,) = q.claim("b", 1, lease_seconds=60)
+    assert t.attempts == 2
+    assert q.complete("a", 1, {"id": 1, "by": "a"}) is False
+    assert q.complete("b", 1, {"id": 1, "by": "b"}) is True
+    assert list(q.results()) == [{"id": 1, "by": "b"}]
+
+def test_extend_keeps_the_lease(q):
+    q.put([{"id": 1}])
+    q.claim("a", 1, lease_seconds=EXPIRED)
+    assert q.extend("b", [1], 60) == 0  # not b's
+    assert q.extend("a", [1], 60) == 1
+    assert q.claim("b", 1, lease_seconds=60) == []
+
+def test_fail_retries_then_parks(q):
+    q.put([{"id": 1}])
+    for attempt in (1, 2):
+        (t,) = q.claim("a", 1, lease_seconds=60)
+        assert t.attempts == attempt
+        q.fail("a", 1, "boom", max_attempts=2)
+    assert q.stats()["failed"] == 1 and q.claim("a", 1, lease_seconds=60) == []
+
+def test_expired_task_out_of_attempts_is_parked(q):
+    # a task that kills every worker never reaches fail(): its leases just expire
+    q.put([{"id": 1}, {"id": 2}])
+    for _ in range(2):
+        q.claim("a", 1, lease_seconds=EXPIRED, max_attempts=2)
+    assert [t.id for t in q.claim("b", 5, lease_seconds=60, max_attempts=2)] == [2]
+    stats = q.stats()
+    assert stats["failed"] == 1 and stats["leased"] == 1